@@ -0,0 +1,746 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the DigiPOD recommendations on a synthetic perioperative cohort.
+
+Generates N synthetic surgical patients in the OMOP schema of the configured database (see digipod.env): adult and
+elderly persons with one surgery each, an inpatient stay around the surgery, an intensive care stay after the
+surgery for a share of them, delirium screenings per shift (ICU scores during the intensive care stay, normal ward
+scores afterwards), daily Faces Anxiety Scale assessments and a random sample of the procedures, measurements,
+observations and conditions that the recommendations refer to.
+
+Every recommendation in recommendation/ is then executed in a fresh worker process, reporting per recommendation:
+
+- the wall-clock time of the anchor materialization and of the execution,
+- the number of SQL statements executed,
+- the peak resident set size of the worker process,
+- the number of result rows written.
+
+The recommendations are only evaluated for the synthetic persons (their person_id range, see
+`ScopedPatientsActiveDuringPeriod`), such that other persons in the OMOP schema do not distort the measurements.
+
+The synthetic persons (and the result runs of the benchmark) are deleted afterwards unless --keep is given. As
+the benchmark writes to (and deletes from) the OMOP and result schemas, the name of the configured database must be
+confirmed with --database, and only databases on the local host are accepted.
+
+Usage:
+
+    python benchmarks/recommendations.py \
+        --database digipod_benchmark \
+        --persons 1000 10000 100000 \
+        --output recommendations.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import importlib
+import json
+import multiprocessing
+import os
+import pkgutil
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from sqlalchemy import Connection, event, text
+
+current_dir = os.path.dirname(__file__)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(current_dir))))
+
+os.environ.setdefault(
+    "ENV_FILE", os.path.join(os.path.dirname(current_dir), "digipod.env")
+)
+
+from execution_engine.omop.vocabulary import (  # noqa: E402
+    OMOP_SURGICAL_PROCEDURE,
+    standard_vocabulary,
+)
+
+from digipod.terminology.vocabulary import DigiPOD  # noqa: E402
+
+standard_vocabulary.register(DigiPOD)
+
+from execution_engine.clients import omopdb  # noqa: E402
+from execution_engine.omop import cohort  # noqa: E402
+from execution_engine.omop.criterion.concept import ConceptCriterion  # noqa: E402
+from execution_engine.omop.db.omop.schema import (  # noqa: E402
+    SCHEMA_NAME as OMOP_SCHEMA_NAME,
+)
+from execution_engine.settings import get_config, update_config  # noqa: E402
+
+import digipod.recommendation  # noqa: E402
+from digipod.concepts import (  # noqa: E402
+    DELIRIUM_DETECTION_SCORE_SCORE,
+    DELIRIUM_OBSERVATION_SCALE_SCORE,
+    DELIRIUM_RATING_SCALE_SCORE,
+    INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE,
+    NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE,
+    OMOP_GENDER_FEMALE,
+    OMOP_GENDER_MALE,
+    OMOP_INPATIENT_VISIT,
+    OMOP_INTENSIVE_CARE,
+    FourAT,
+)
+from digipod.criterion.anchors import materialize_anchors  # noqa: E402
+from digipod.criterion.registry import iterate_criteria  # noqa: E402
+from digipod.criterion.scope import set_person_scope  # noqa: E402
+from digipod.criterion.scores import (  # noqa: E402
+    DELIRIUM_SCORE_CONCEPTS,
+    FOUR_AT_SCORE,
+    ICU_SCORE_CONCEPTS,
+    NEGATIVE,
+    NORMALWARD_SCORE_CONCEPTS,
+    POSITIVE,
+    WEAKLY_POSITIVE,
+)
+from digipod.runner.engine import build_engine  # noqa: E402
+from digipod.runner.results import delete_runs  # noqa: E402
+from digipod.runner.sink import copy_result_writer  # noqa: E402
+from digipod.terminology.vocabulary import FACES_ANXIETY_SCALE_SCORE  # noqa: E402
+
+update_config(multiprocessing_use=False)
+
+# person_source_value prefix of the synthetic persons
+PERSON_PREFIX = "digipod-benchmark-"
+
+# type concept of all generated rows (EHR)
+EHR_TYPE_CONCEPT_ID = 32817
+
+# hours of the delirium screenings (one per shift)
+SHIFT_HOURS = [7, 15, 23]
+
+# cut-off of the delirium scores (as in the score classifications of criterion/non_pharma_measures.py): the score
+# values are drawn from [0, 2 * cut-off), the qualitative result (value_as_concept_id) is positive from the cut-off
+# on, weakly positive one point below (if the cut-off is above 1) and negative otherwise
+DELIRIUM_SCORE_CUTOFFS = {
+    NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE.concept_id: 2,
+    INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE.concept_id: 4,
+    DELIRIUM_RATING_SCALE_SCORE.concept_id: 12,
+    DELIRIUM_OBSERVATION_SCALE_SCORE.concept_id: 3,
+    DELIRIUM_DETECTION_SCORE_SCORE.concept_id: 8,
+    FourAT.concept_id: 4,
+    FOUR_AT_SCORE.concept_id: 4,
+}
+
+# cut-off of the scores with a qualitative result only (CAM, 3D-CAM, CAM-ICU)
+DEFAULT_DELIRIUM_SCORE_CUTOFF = 1
+
+# table of the documented items per domain
+DOMAIN_TABLES = {
+    "Procedure": "procedure_occurrence",
+    "Measurement": "measurement",
+    "Observation": "observation",
+    "Condition": "condition_occurrence",
+}
+
+# hosts of local database servers (no host: connection via a local socket)
+LOCAL_HOSTS = {None, "", "localhost", "127.0.0.1", "::1"}
+
+# tables that are cleaned up (in this order) before the persons are deleted
+CLEANUP_TABLES = [
+    "measurement",
+    "observation",
+    "procedure_occurrence",
+    "condition_occurrence",
+    "visit_occurrence",
+]
+
+
+def discover_recommendations() -> dict[str, cohort.Recommendation]:
+    """
+    Get all recommendations defined in the modules of the recommendation package, by "<module>.<variable>".
+
+    Modules that cannot be imported are skipped (with a message on stderr).
+    """
+    recommendations: dict[str, cohort.Recommendation] = {}
+
+    for module_info in pkgutil.iter_modules(digipod.recommendation.__path__):
+        if module_info.ispkg:
+            continue
+
+        try:
+            module = importlib.import_module(
+                f"digipod.recommendation.{module_info.name}"
+            )
+        except Exception as e:
+            print(f"Skipping {module_info.name}: {e!r}", file=sys.stderr)
+            continue
+
+        seen: set[int] = set()
+
+        for name, obj in vars(module).items():
+            if isinstance(obj, cohort.Recommendation) and id(obj) not in seen:
+                seen.add(id(obj))
+                recommendations[f"{module_info.name}.{name}"] = obj
+
+    return recommendations
+
+
+def referenced_concepts(
+    recommendations: list[cohort.Recommendation],
+) -> dict[str, list[int]]:
+    """
+    Get the concept ids (per domain, see DOMAIN_TABLES) of all concept criteria of the recommendations, except
+    for the surgery and the delirium score and Faces Anxiety Scale concepts, which are generated separately.
+    """
+    excluded = {OMOP_SURGICAL_PROCEDURE, FACES_ANXIETY_SCALE_SCORE.concept_id} | {
+        c.concept_id for c in DELIRIUM_SCORE_CONCEPTS
+    }
+    concepts: dict[str, set[int]] = {domain: set() for domain in DOMAIN_TABLES}
+
+    for recommendation in recommendations:
+        for criterion in iterate_criteria(recommendation):
+            if not isinstance(criterion, ConceptCriterion):
+                continue
+
+            concept = criterion.concept
+
+            if concept.domain_id in concepts and concept.concept_id not in excluded:
+                concepts[concept.domain_id].add(concept.concept_id)
+
+    return {domain: sorted(ids) for domain, ids in concepts.items()}
+
+
+def delete_cohort(con: Connection) -> None:
+    """
+    Delete the synthetic persons and all their rows from the OMOP schema.
+    """
+    persons = (
+        f"SELECT person_id FROM {OMOP_SCHEMA_NAME}.person "  # nosec -- constant schema name
+        "WHERE person_source_value LIKE :pattern"
+    )
+    params = {"pattern": PERSON_PREFIX + "%"}
+
+    for table in CLEANUP_TABLES:
+        con.execute(
+            text(
+                f"DELETE FROM {OMOP_SCHEMA_NAME}.{table} "  # nosec -- constant names
+                f"WHERE person_id IN ({persons})"
+            ),
+            params,
+        )
+
+    con.execute(
+        text(
+            f"DELETE FROM {OMOP_SCHEMA_NAME}.person "  # nosec
+            "WHERE person_source_value LIKE :pattern"
+        ),
+        params,
+    )
+
+
+def generate_cohort(
+    con: Connection,
+    n_persons: int,
+    start_datetime: datetime.datetime,
+    end_datetime: datetime.datetime,
+    item_concepts: dict[str, list[int]],
+    args: argparse.Namespace,
+) -> tuple[int, int]:
+    """
+    Generate n_persons synthetic surgical patients (see module docstring) with surgeries in the observation window.
+
+    All rows are generated in SQL (INSERT ... SELECT over generate_series), seeded with args.seed.
+
+    :return: The (inclusive) person_id range of the synthetic persons.
+    :raises RuntimeError: If other persons have person_ids within that range.
+    """
+    schema = OMOP_SCHEMA_NAME
+
+    con.execute(text("SELECT setseed(:seed)"), {"seed": args.seed})
+
+    con.execute(
+        text(
+            f"INSERT INTO {schema}.person "  # nosec -- constant schema name
+            "(gender_concept_id, year_of_birth, month_of_birth, day_of_birth, birth_datetime, "
+            " race_concept_id, ethnicity_concept_id, person_source_value) "
+            "SELECT CASE WHEN random() < 0.5 THEN :female ELSE :male END, "
+            "  extract(year FROM b)::int, extract(month FROM b)::int, extract(day FROM b)::int, b, 0, 0, "
+            "  :prefix || g "
+            "FROM ("
+            "  SELECT g, CASE WHEN random() < :elderly_share "
+            "    THEN timestamp '1925-01-01' + random() * interval '30 years' "
+            "    ELSE timestamp '1955-01-01' + random() * interval '48 years' END AS b "
+            "  FROM generate_series(1, :n) g"
+            ") p"
+        ),
+        {
+            "female": OMOP_GENDER_FEMALE,
+            "male": OMOP_GENDER_MALE,
+            "prefix": PERSON_PREFIX,
+            "elderly_share": args.elderly_share,
+            "n": n_persons,
+        },
+    )
+
+    # one surgery per person, followed by an inpatient stay of los_days (icu_days of which on the ICU)
+    con.execute(
+        text(
+            "CREATE TEMPORARY TABLE benchmark_cohort ON COMMIT DROP AS "
+            "SELECT person_id, surgery_start, "
+            "  surgery_start + (1 + floor(random() * 5)) * interval '1 hour' AS surgery_end, "
+            "  icu, icu_days, icu_days + 2 + floor(random() * 7)::int AS los_days "
+            "FROM ("
+            "  SELECT person_id, "
+            "    CAST(:start AS timestamptz) + random() * (CAST(:end AS timestamptz) - CAST(:start AS timestamptz) "
+            "      - interval '14 days') AS surgery_start, "
+            "    random() < :icu_share AS icu, "
+            "    1 + floor(random() * 3)::int AS icu_days "
+            f"  FROM {schema}.person "  # nosec
+            "  WHERE person_source_value LIKE :pattern"
+            ") c"
+        ),
+        {
+            "start": start_datetime,
+            "end": end_datetime,
+            "icu_share": args.icu_share,
+            "pattern": PERSON_PREFIX + "%",
+        },
+    )
+
+    con.execute(
+        text(
+            f"INSERT INTO {schema}.procedure_occurrence "  # nosec
+            "(person_id, procedure_concept_id, procedure_date, procedure_datetime, "
+            " procedure_end_date, procedure_end_datetime, procedure_type_concept_id) "
+            "SELECT person_id, :surgery, surgery_start::date, surgery_start, "
+            "  surgery_end::date, surgery_end, :ehr "
+            "FROM benchmark_cohort"
+        ),
+        {"surgery": OMOP_SURGICAL_PROCEDURE, "ehr": EHR_TYPE_CONCEPT_ID},
+    )
+
+    con.execute(
+        text(
+            f"INSERT INTO {schema}.visit_occurrence "  # nosec
+            "(person_id, visit_concept_id, visit_start_date, visit_start_datetime, "
+            " visit_end_date, visit_end_datetime, visit_type_concept_id) "
+            "SELECT person_id, :inpatient, s::date, s, e::date, e, :ehr "
+            "FROM ("
+            "  SELECT person_id, surgery_start - interval '1 day' AS s, "
+            "    surgery_end + los_days * interval '1 day' AS e "
+            "  FROM benchmark_cohort"
+            ") v "
+            "UNION ALL "
+            "SELECT person_id, :icu, surgery_end::date, surgery_end, e::date, e, :ehr "
+            "FROM ("
+            "  SELECT person_id, surgery_end, surgery_end + icu_days * interval '1 day' AS e "
+            "  FROM benchmark_cohort WHERE icu"
+            ") v"
+        ),
+        {
+            "inpatient": OMOP_INPATIENT_VISIT,
+            "icu": OMOP_INTENSIVE_CARE,
+            "ehr": EHR_TYPE_CONCEPT_ID,
+        },
+    )
+
+    # delirium screenings per shift: ICU scores during the intensive care stay, normal ward scores afterwards, with
+    # the score value and the qualitative result (see DELIRIUM_SCORE_CUTOFFS)
+    con.execute(
+        text(
+            f"INSERT INTO {schema}.measurement "  # nosec
+            "(person_id, measurement_concept_id, measurement_date, measurement_datetime, value_as_number, "
+            " value_as_concept_id, measurement_type_concept_id) "
+            "SELECT person_id, concept_id, t::date, t, v, "
+            "  CASE WHEN v >= cutoff THEN :positive "
+            "    WHEN v = cutoff - 1 AND cutoff > 1 THEN :weakly_positive "
+            "    ELSE :negative END, "
+            "  :ehr "
+            "FROM ("
+            "  SELECT person_id, concept_id, t, cutoff, floor(random() * 2 * cutoff) AS v "
+            "  FROM ("
+            "    SELECT c.person_id, c.surgery_end, "
+            "      CASE WHEN c.icu AND d < c.icu_days "
+            "        THEN (CAST(:icu_concepts AS integer[]))[1 + floor(random() * :n_icu)::int] "
+            "        ELSE (CAST(:ward_concepts AS integer[]))[1 + floor(random() * :n_ward)::int] "
+            "      END AS concept_id, "
+            "      date_trunc('day', c.surgery_end) + d * interval '1 day' + h * interval '1 hour' "
+            "        + random() * interval '1 hour' AS t "
+            "    FROM benchmark_cohort c "
+            "    CROSS JOIN generate_series(0, :postop_days - 1) d "
+            "    CROSS JOIN unnest(CAST(:shift_hours AS integer[])) h "
+            "    WHERE d < c.los_days AND random() < :screening_share"
+            "  ) s "
+            "  CROSS JOIN LATERAL ("
+            "    SELECT coalesce((CAST(:cutoffs AS integer[]))["
+            "      array_position(CAST(:cutoff_concepts AS integer[]), s.concept_id)], :default_cutoff) AS cutoff"
+            "  ) co "
+            "  WHERE t > surgery_end"
+            ") sv"
+        ),
+        {
+            "cutoff_concepts": list(DELIRIUM_SCORE_CUTOFFS),
+            "cutoffs": list(DELIRIUM_SCORE_CUTOFFS.values()),
+            "default_cutoff": DEFAULT_DELIRIUM_SCORE_CUTOFF,
+            "positive": POSITIVE.value.concept_id,
+            "weakly_positive": WEAKLY_POSITIVE.value.concept_id,
+            "negative": NEGATIVE.value.concept_id,
+            "icu_concepts": [c.concept_id for c in ICU_SCORE_CONCEPTS],
+            "n_icu": len(ICU_SCORE_CONCEPTS),
+            "ward_concepts": [c.concept_id for c in NORMALWARD_SCORE_CONCEPTS],
+            "n_ward": len(NORMALWARD_SCORE_CONCEPTS),
+            "postop_days": args.postop_days,
+            "shift_hours": SHIFT_HOURS,
+            "screening_share": args.screening_share,
+            "ehr": EHR_TYPE_CONCEPT_ID,
+        },
+    )
+
+    # daily Faces Anxiety Scale assessments (late morning)
+    con.execute(
+        text(
+            f"INSERT INTO {schema}.measurement "  # nosec
+            "(person_id, measurement_concept_id, measurement_date, measurement_datetime, value_as_number, "
+            " measurement_type_concept_id) "
+            "SELECT person_id, :faces, t::date, t, 1 + floor(random() * 5), :ehr "
+            "FROM ("
+            "  SELECT c.person_id, date_trunc('day', c.surgery_end) + (d + 1) * interval '1 day' "
+            "    + interval '10 hours' + random() * interval '2 hours' AS t "
+            "  FROM benchmark_cohort c "
+            "  CROSS JOIN generate_series(0, :postop_days - 1) d "
+            "  WHERE d < c.los_days AND random() < :faces_share"
+            ") s"
+        ),
+        {
+            "faces": FACES_ANXIETY_SCALE_SCORE.concept_id,
+            "postop_days": args.postop_days,
+            "faces_share": args.faces_share,
+            "ehr": EHR_TYPE_CONCEPT_ID,
+        },
+    )
+
+    # documented items: a random sample of the referenced concepts during the stay (conditions: before the surgery)
+    item_columns = {
+        "Procedure": (
+            "(person_id, procedure_concept_id, procedure_date, procedure_datetime, "
+            " procedure_end_date, procedure_end_datetime, procedure_type_concept_id) "
+            "SELECT person_id, concept_id, t::date, t, t::date, t + interval '30 minutes', :ehr"
+        ),
+        "Measurement": (
+            "(person_id, measurement_concept_id, measurement_date, measurement_datetime, value_as_number, "
+            " measurement_type_concept_id) "
+            "SELECT person_id, concept_id, t::date, t, floor(random() * 31), :ehr"
+        ),
+        "Observation": (
+            "(person_id, observation_concept_id, observation_date, observation_datetime, "
+            " observation_type_concept_id) "
+            "SELECT person_id, concept_id, t::date, t, :ehr"
+        ),
+        "Condition": (
+            "(person_id, condition_concept_id, condition_start_date, condition_start_datetime, "
+            " condition_type_concept_id) "
+            "SELECT person_id, concept_id, t::date, t, :ehr"
+        ),
+    }
+
+    for domain, table in DOMAIN_TABLES.items():
+        concept_ids = item_concepts.get(domain, [])
+
+        if not concept_ids or args.items_per_person <= 0:
+            continue
+
+        if domain == "Condition":
+            item_time = "c.surgery_start - random() * interval '365 days'"
+        else:
+            item_time = (
+                "c.surgery_start - interval '2 days' "
+                "+ random() * ((c.los_days + 2) * interval '1 day')"
+            )
+
+        con.execute(
+            text(
+                f"INSERT INTO {schema}.{table} {item_columns[domain]} "  # nosec -- constant names
+                "FROM ("
+                "  SELECT c.person_id, "
+                "    (CAST(:concepts AS integer[]))[1 + floor(random() * :n_concepts)::int] AS concept_id, "
+                f"    {item_time} AS t "
+                "  FROM benchmark_cohort c "
+                "  CROSS JOIN generate_series(1, :k)"
+                ") s"
+            ),
+            {
+                "concepts": concept_ids,
+                "n_concepts": len(concept_ids),
+                # split the items per person evenly between the domains
+                "k": max(args.items_per_person // len(DOMAIN_TABLES), 1),
+                "ehr": EHR_TYPE_CONCEPT_ID,
+            },
+        )
+
+    for table in ["person", "visit_occurrence"] + list(DOMAIN_TABLES.values()):
+        con.execute(text(f"ANALYZE {schema}.{table}"))  # nosec
+
+    first, last, n_in_range = con.execute(
+        text(
+            "WITH synthetic AS ("
+            "  SELECT min(person_id) AS first, max(person_id) AS last "
+            f"  FROM {schema}.person "  # nosec
+            "  WHERE person_source_value LIKE :pattern"
+            ") "
+            "SELECT first, last, "
+            f"  (SELECT count(*) FROM {schema}.person p WHERE p.person_id BETWEEN first AND last) "  # nosec
+            "FROM synthetic"
+        ),
+        {"pattern": PERSON_PREFIX + "%"},
+    ).one()
+
+    if n_in_range != n_persons:
+        raise RuntimeError(
+            f"The person_id range {first}-{last} of the synthetic persons contains {n_in_range - n_persons} "
+            "other persons"
+        )
+
+    return first, last
+
+
+def peak_rss_mb() -> float:
+    """
+    Get the peak resident set size of the current process in MiB (ru_maxrss is in KiB on Linux).
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_recommendation(
+    name: str,
+    start_datetime: datetime.datetime,
+    end_datetime: datetime.datetime,
+    use_copy: bool,
+    person_id_range: tuple[int, int],
+) -> dict[str, Any]:
+    """
+    Execute one recommendation (in a fresh worker process) for the persons in the given person_id range and
+    measure it.
+    """
+    recommendation = discover_recommendations()[name]
+    engine = build_engine()
+    engine.register_recommendation(recommendation)
+    set_person_scope(id_range=person_id_range)
+
+    rss_before = peak_rss_mb()
+    n_statements = 0
+
+    def count_statement(*args: Any) -> None:
+        nonlocal n_statements
+        n_statements += 1
+
+    with omopdb.connect() as con:
+        db_engine = con.engine
+
+    event.listen(db_engine, "before_cursor_execute", count_statement)
+
+    try:
+        t0 = time.perf_counter()
+        with omopdb.begin() as con:
+            materialize_anchors(con)
+        anchor_seconds = time.perf_counter() - t0
+        anchor_statements, n_statements = n_statements, 0
+
+        with copy_result_writer() if use_copy else contextlib.nullcontext():
+            t0 = time.perf_counter()
+            run_id = engine.execute(
+                recommendation,
+                start_datetime=start_datetime,
+                end_datetime=end_datetime,
+            )
+            execute_seconds = time.perf_counter() - t0
+        execute_statements = n_statements
+    finally:
+        event.remove(db_engine, "before_cursor_execute", count_statement)
+
+    with omopdb.connect() as con:
+        rows_written = con.execute(
+            text(
+                f"SELECT count(*) FROM {get_config().omop.db_result_schema}.result_interval "  # nosec
+                "WHERE run_id = :run_id"
+            ),
+            {"run_id": run_id},
+        ).scalar_one()
+
+    return {
+        "run_id": run_id,
+        "anchor_seconds": anchor_seconds,
+        "anchor_statements": anchor_statements,
+        "execute_seconds": execute_seconds,
+        "execute_statements": execute_statements,
+        "baseline_rss_mb": rss_before,
+        "peak_rss_mb": peak_rss_mb(),
+        "rows_written": rows_written,
+    }
+
+
+def main() -> None:
+    """
+    Generate the synthetic cohort for all requested sizes, execute all recommendations and write the results as JSON.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the DigiPOD recommendations on a synthetic cohort."
+    )
+    parser.add_argument(
+        "--database",
+        required=True,
+        help="Name of the configured database (see digipod.env), as confirmation that the synthetic cohort may be "
+        "written to (and deleted from) it",
+    )
+    parser.add_argument(
+        "--persons",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000],
+        help="Cohort sizes",
+    )
+    parser.add_argument(
+        "--recommendations",
+        nargs="+",
+        default=None,
+        help="Only run recommendations whose name contains one of these strings (default: all)",
+    )
+    parser.add_argument(
+        "--start",
+        type=datetime.datetime.fromisoformat,
+        default=datetime.datetime.fromisoformat("2024-01-01T00:00:00+01:00"),
+        help="Start of the observation window (ISO 8601)",
+    )
+    parser.add_argument(
+        "--end",
+        type=datetime.datetime.fromisoformat,
+        default=datetime.datetime.fromisoformat("2024-12-31T23:59:59+01:00"),
+        help="End of the observation window (ISO 8601)",
+    )
+    parser.add_argument(
+        "--elderly-share",
+        type=float,
+        default=0.5,
+        help="Share of persons aged 70 or older",
+    )
+    parser.add_argument(
+        "--icu-share",
+        type=float,
+        default=0.3,
+        help="Share of persons with an intensive care stay after the surgery",
+    )
+    parser.add_argument(
+        "--postop-days",
+        type=int,
+        default=5,
+        help="Number of postoperative days with delirium screenings and anxiety assessments",
+    )
+    parser.add_argument(
+        "--screening-share",
+        type=float,
+        default=0.8,
+        help="Share of shifts with a delirium screening",
+    )
+    parser.add_argument(
+        "--faces-share",
+        type=float,
+        default=0.7,
+        help="Share of postoperative days with a Faces Anxiety Scale assessment",
+    )
+    parser.add_argument(
+        "--items-per-person",
+        type=int,
+        default=20,
+        help="Number of documented items (procedures, measurements, ...) per person",
+    )
+    parser.add_argument(
+        "--seed", type=float, default=0.5, help="Random seed (between -1 and 1)"
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per recommendation")
+    parser.add_argument(
+        "--no-copy",
+        action="store_true",
+        help="Write the result intervals with INSERT statements instead of COPY",
+    )
+    parser.add_argument(
+        "--output", help="Output file (JSON); defaults to stdout", default=None
+    )
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="Do not delete the synthetic persons and the result runs",
+    )
+    args = parser.parse_args()
+
+    with omopdb.connect() as con:
+        url = con.engine.url
+
+    if url.database != args.database:
+        parser.error(
+            f"--database {args.database} does not match the configured database {url.database}"
+        )
+    if url.host not in LOCAL_HOSTS:
+        parser.error(
+            f"Refusing to generate the synthetic cohort on the remote host {url.host}"
+        )
+
+    recommendations = discover_recommendations()
+
+    if args.recommendations:
+        recommendations = {
+            name: rec
+            for name, rec in recommendations.items()
+            if any(pattern in name for pattern in args.recommendations)
+        }
+
+    concepts = referenced_concepts(list(recommendations.values()))
+    context = multiprocessing.get_context("spawn")
+    results = []
+    run_ids = []
+
+    for n_persons in args.persons:
+        with omopdb.begin() as con:
+            delete_cohort(con)
+            person_id_range = generate_cohort(
+                con, n_persons, args.start, args.end, concepts, args
+            )
+
+        for name in recommendations:
+            for repetition in range(args.repeat):
+                # one worker per run, such that the peak RSS is that of this run only
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    result = pool.submit(
+                        run_recommendation,
+                        name,
+                        args.start,
+                        args.end,
+                        not args.no_copy,
+                        person_id_range,
+                    ).result()
+
+                run_ids.append(result["run_id"])
+
+                print(
+                    f"{n_persons:>9} persons  {name:<70} "
+                    f"{result['execute_seconds']:>9.2f} s  {result['execute_statements']:>5} statements  "
+                    f"{result['peak_rss_mb']:>8.1f} MiB  {result['rows_written']:>9} rows",
+                    file=sys.stderr,
+                )
+
+                results.append(
+                    {
+                        "persons": n_persons,
+                        "recommendation": name,
+                        "repetition": repetition,
+                        **result,
+                    }
+                )
+
+    if not args.keep:
+        with omopdb.begin() as con:
+            delete_runs(con, run_ids)
+            delete_cohort(con)
+
+    output = json.dumps(results, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 import os
+import re
 from glob import glob
 from typing import Any
 
 import pandas as pd
 import pytest
+from psycopg import sql
 from pytest_postgresql.janitor import DatabaseJanitor
 
 # add each module in _fixtures as a pytest plugin (i.e. fixture)
@@ -26,6 +28,20 @@ def set_pandas_display_options() -> None:
     pd.set_option("display.width", 1000)
 
 
+def pytest_addoption(parser):  # type: ignore
+    """
+    Add the command line options of the test suite.
+    """
+    parser.addoption(
+        "--db-isolation",
+        choices=["truncate", "savepoint"],
+        default="truncate",
+        help="Isolation of the tests that use the database: truncate the person and result tables after each test "
+        "(default) or run each test in a transaction that is rolled back afterwards (the execution engine's "
+        "connections are bound to that transaction, committing releases a SAVEPOINT)",
+    )
+
+
 def postgres_janitor() -> DatabaseJanitor:
     """
     Create a janitor for postgresql.
@@ -60,8 +76,10 @@ def init_postgres(config):  # type: ignore
     This function is called by pytest before the tests are run.
     - Set the environment variables that are used by the OMOPSQLClient
     - Drops the test database if it exists
-    - Create the test database
+    - Create the test database: as a copy of the template database of the current seed (see `seed_hash`) if it
+      exists, otherwise empty (the db_setup fixture seeds it and saves it as template database)
     """
+    from digipod.tests._fixtures.omop_fixture import TEMPLATE_COMMENT, seed_hash
 
     def getvalue(name):  # type: ignore
         return config.getoption(name) or config.getini(name)
@@ -72,21 +90,53 @@ def init_postgres(config):  # type: ignore
     os.environ["CELIDA_EE_OMOP__PORT"] = str(getvalue("postgresql_port"))
     os.environ["CELIDA_EE_OMOP__DATABASE"] = getvalue("postgresql_dbname")
 
+    dbname = getvalue("postgresql_dbname")
+    template_prefix = f"{dbname}_template_"
+    template = template_prefix + seed_hash()[:16]
+
     janitor = postgres_janitor()
 
-    # Drop the database if it already exists (e.g. from a previous interrupted test run)
     with janitor.cursor() as cur:
-        db_exists = cur.execute(
-            """SELECT EXISTS(
-            SELECT datname FROM pg_catalog.pg_database WHERE datname = %(dbname)s
-        )""",
-            params={"dbname": getvalue("postgresql_dbname")},
-        ).fetchone()[0]
-
-    if db_exists:
+        databases = dict(
+            cur.execute(
+                "SELECT datname, shobj_description(oid, 'pg_database') FROM pg_catalog.pg_database "
+                "WHERE datname = %(dbname)s OR starts_with(datname, %(prefix)s)",
+                params={"dbname": dbname, "prefix": template_prefix},
+            ).fetchall()
+        )
+
+    # Drop the database if it already exists (e.g. from a previous interrupted test run)
+    if dbname in databases:
         janitor.drop()
 
-    janitor.init()
+    from_template = template in databases
+
+    if from_template:
+        with janitor.cursor() as cur:
+            cur.execute(
+                sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(
+                    sql.Identifier(dbname), sql.Identifier(template)
+                )
+            )
+    else:
+        # template databases of outdated seeds (only those created by the db_setup fixture)
+        outdated = [
+            name
+            for name, comment in sorted(databases.items())
+            if comment == TEMPLATE_COMMENT
+            and re.fullmatch(re.escape(template_prefix) + "[0-9a-f]{16}", name)
+        ]
+
+        with janitor.cursor() as cur:
+            for name in outdated:
+                cur.execute(
+                    sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(name))
+                )
+
+        janitor.init()
+
+    os.environ["DIGIPOD_TEST_TEMPLATE_DB"] = template
+    os.environ["DIGIPOD_TEST_DB_FROM_TEMPLATE"] = "1" if from_template else "0"
 
 
 def pytest_sessionstart(session):  # type: ignore
@@ -3,6 +3,8 @@ from execution_engine.omop.vocabulary import SNOMEDCT, standard_vocabulary
 from execution_engine.util import logic
 from execution_engine.util.value import ValueNumber, ValueScalar
 
+from digipod.criterion.registry import intern_criterion
+
 
 class Deglutition(RelativeTime):
     """
@@ -25,8 +27,8 @@ class Deglutition(RelativeTime):
         if self._value == ValueNumber(
             value=0, unit=standard_vocabulary.get_standard_unit_concept("d")
         ):
-            return OnFacesAnxietyScaleAssessmentDay()
+            return intern_criterion(OnFacesAnxietyScaleAssessmentDay())
         elif self._value == ValueScalar(value_max=0):
-            return BeforeDailyFacesAnxietyScaleAssessment()
+            return intern_criterion(BeforeDailyFacesAnxietyScaleAssessment())
         else:
             raise NotImplementedError("Not Implemented")
@@ -3,6 +3,7 @@ from execution_engine.omop.vocabulary import standard_vocabulary
 from execution_engine.util import logic
 from execution_engine.util.value import ValueNumber, ValueScalar
 
+from digipod.criterion.registry import intern_criterion
 from digipod.terminology.vocabulary import FACES_ANXIETY_SCALE_SCORE, DigiPOD
 
 
@@ -27,8 +28,8 @@ class OnDayOfFacesAnxietyScaleAssessment(RelativeTime):
         if self._value == ValueNumber(
             value=0, unit=standard_vocabulary.get_standard_unit_concept("d")
         ):
-            return OnFacesAnxietyScaleAssessmentDay()
+            return intern_criterion(OnFacesAnxietyScaleAssessmentDay())
         elif self._value == ValueScalar(value_max=0):
-            return BeforeDailyFacesAnxietyScaleAssessment()
+            return intern_criterion(BeforeDailyFacesAnxietyScaleAssessment())
         else:
             raise NotImplementedError("Not Implemented")
@@ -3,6 +3,7 @@ from execution_engine.omop.vocabulary import LOINC
 from execution_engine.util import logic
 from execution_engine.util.value.value import ValueScalar
 
+from digipod.criterion.registry import intern_criterion
 from digipod.terminology.vocabulary import DigiPOD
 
 
@@ -26,7 +27,7 @@ class PostOperative(RelativeTime):
 
         from digipod.criterion import PostOperativePatients
 
-        return PostOperativePatients()
+        return intern_criterion(PostOperativePatients())
 
 
 class IntraOrPostOperative(RelativeTime):
@@ -49,4 +50,4 @@ class IntraOrPostOperative(RelativeTime):
 
         from digipod.criterion import IntraOrPostOperativePatients
 
-        return IntraOrPostOperativePatients()
+        return intern_criterion(IntraOrPostOperativePatients())
@@ -2,6 +2,7 @@ from execution_engine.converter.time_from_event.abstract import TimeFromEvent
 from execution_engine.util import logic
 
 from digipod.criterion import PatientsBeforeFirstDexAdministration
+from digipod.criterion.registry import intern_criterion
 from digipod.terminology import vocabulary
 from digipod.terminology.vocabulary import DigiPOD
 
@@ -20,4 +21,4 @@ class BeforeDexmedetomidineAdministration(TimeFromEvent):
         """
         Returns the criterion that returns the intervals during the enclosed criterion/combination is evaluated.
         """
-        return PatientsBeforeFirstDexAdministration()
+        return intern_criterion(PatientsBeforeFirstDexAdministration())
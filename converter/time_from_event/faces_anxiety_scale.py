@@ -2,6 +2,7 @@ from execution_engine.converter.time_from_event.abstract import TimeFromEvent
 from execution_engine.util import logic
 from execution_engine.util.value import ValueScalar
 
+from digipod.criterion.registry import intern_criterion
 from digipod.terminology.vocabulary import FACES_ANXIETY_SCALE_SCORE, DigiPOD
 
 
@@ -24,4 +25,4 @@ class BeforeDailyFacesAnxietyScaleAssessment(TimeFromEvent):
             BeforeDailyFacesAnxietyScaleAssessment,
         )
 
-        return BeforeDailyFacesAnxietyScaleAssessment()
+        return intern_criterion(BeforeDailyFacesAnxietyScaleAssessment())
@@ -4,6 +4,7 @@ from execution_engine.util import logic
 from execution_engine.util.value.value import ValueScalar
 
 from digipod.criterion import PostOperativePatientsUntilDay0
+from digipod.criterion.registry import intern_criterion
 from digipod.terminology import vocabulary
 
 #  $loinc#67782-3 "Surgical operation date"
@@ -91,7 +92,7 @@ class IntraPostOperative(TimeFromEvent):
 
         from digipod.criterion.intraop_patients import IntraOperativePatients
 
-        return IntraOperativePatients()
+        return intern_criterion(IntraOperativePatients())
 
 
 class PostOperative(TimeFromEvent):
@@ -114,7 +115,7 @@ class PostOperative(TimeFromEvent):
 
         from digipod.criterion.postop_patients import PostOperativePatients
 
-        return PostOperativePatients()
+        return intern_criterion(PostOperativePatients())
 
 
 class PreOrIntraOperative(TimeFromEvent):
@@ -174,15 +175,17 @@ class PreOrIntraOperativeDigipod(TimeFromEvent):
                 PreOperativePatientsBeforeEndOfSurgery,
             )
 
-            return PreOperativePatientsBeforeEndOfSurgery(
-                max_days_before_surgery=-self._value.value_min // 24
+            return intern_criterion(
+                PreOperativePatientsBeforeEndOfSurgery(
+                    max_days_before_surgery=-self._value.value_min // 24
+                )
             )
         elif (
             self._value.value_min is None
             and self._value.value_max == 1
             and self._value.unit.concept_code == "d"
         ):
-            return PostOperativePatientsUntilDay0()
+            return intern_criterion(PostOperativePatientsUntilDay0())
 
         raise NotImplementedError(
             "Currently, only pre/intraoperative patients before end of surgery are implemented"
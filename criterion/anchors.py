@@ -0,0 +1,176 @@
+"""
+Per-run staging of anchor events that are shared by many criteria.
+
+Several criteria (e.g. all subclasses of SurgicalPatients) derive their intervals from the same per-person
+anchor event, such as the first surgery of each person. Without staging, every single criterion computes that
+anchor again from the (very large) source table. An Anchor can be materialized once per execution run into an
+indexed, unlogged table in the result schema; afterwards, all criteria that use the anchor join against that
+table instead of rescanning the source table.
+
+If the anchors have not been materialized (e.g. in the unit tests, where data changes from test to test), the
+criteria fall back to computing the anchor inline as a subquery.
+"""
+
+import logging
+from typing import Callable
+
+from execution_engine.settings import get_config
+from sqlalchemy import Column, Connection, MetaData, Table, text
+from sqlalchemy.sql import FromClause, Select
+
+
+class Anchor:
+    """
+    A per-person anchor event (or set of events) that is shared by several criteria.
+
+    The anchor is defined by a query that returns rows with the given columns (typically at most one row per
+    person).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        columns: Callable[[], list[Column]],
+        query: Callable[[], Select],
+        prepare: Callable[[Connection], None] | None = None,
+    ) -> None:
+        """
+        :param name: The name of the anchor (used as table name, prefixed with "digipod_").
+        :param columns: Callable returning the column definitions of the staging table (including the primary
+            key).
+        :param query: Callable returning the query that computes the anchor from the source table(s).
+        :param prepare: Optional callable that prepares the source table(s) before the anchor is materialized (e.g.
+            creates an index the query relies on).
+        """
+        self.name = name
+        self._columns = columns
+        self._query = query
+        self._prepare = prepare
+        self._table: Table | None = None
+        self._materialized = False
+
+    @property
+    def materialized(self) -> bool:
+        """
+        Whether the anchor is currently read from the staging table.
+        """
+        return self._materialized
+
+    @property
+    def table(self) -> Table:
+        """
+        The staging table of this anchor.
+        """
+        if self._table is None:
+            schema = get_config().omop.db_result_schema
+            self._table = Table(
+                f"digipod_{self.name}",
+                MetaData(schema=schema),
+                *self._columns(),
+                prefixes=["UNLOGGED"],
+            )
+        return self._table
+
+    def query(self) -> Select:
+        """
+        Get the query that computes the anchor from the source table(s).
+        """
+        return self._query()
+
+    def source(self) -> FromClause:
+        """
+        Get the selectable that criteria should use to read the anchor.
+
+        Returns the staging table if the anchor has been materialized, otherwise an inline subquery.
+        """
+        if self._materialized:
+            return self.table.alias(self.name)
+
+        return self.query().subquery(self.name)
+
+    def materialize(self, con: Connection) -> int:
+        """
+        (Re)create the staging table of this anchor and fill it from the source table(s).
+
+        :param con: The database connection (within a transaction).
+        :return: The number of rows in the staging table.
+        """
+        table = self.table
+        query = self.query()
+
+        if self._prepare is not None:
+            self._prepare(con)
+
+        table.drop(con, checkfirst=True)
+        table.create(con)
+        con.execute(table.insert().from_select([c.name for c in table.columns], query))
+        con.execute(text(f"ANALYZE {table.schema}.{table.name}"))  # nosec
+
+        n_rows = con.execute(
+            text(f"SELECT count(*) FROM {table.schema}.{table.name}")  # nosec
+        ).scalar_one()
+
+        logging.info(f'Materialized anchor "{self.name}" ({n_rows} rows)')
+
+        self._materialized = True
+
+        return n_rows
+
+    def activate(self) -> None:
+        """
+        Use the (already existing) staging table without refreshing it, e.g. in worker processes.
+        """
+        self._materialized = True
+
+    def reset(self) -> None:
+        """
+        Compute the anchor inline again.
+        """
+        self._materialized = False
+
+
+_anchors: dict[str, Anchor] = {}
+
+
+def register_anchor(anchor: Anchor) -> Anchor:
+    """
+    Register an anchor such that it is materialized by `materialize_anchors`.
+    """
+    if anchor.name in _anchors:
+        raise ValueError(f'Anchor "{anchor.name}" already registered')
+
+    _anchors[anchor.name] = anchor
+
+    return anchor
+
+
+def registered_anchors() -> list[Anchor]:
+    """
+    Get all registered anchors (in registration order).
+    """
+    return list(_anchors.values())
+
+
+def materialize_anchors(con: Connection) -> None:
+    """
+    Materialize all registered anchors. Should be called once per execution run, before any criterion is
+    executed.
+    """
+    for anchor in registered_anchors():
+        anchor.materialize(con)
+
+
+def activate_anchors() -> None:
+    """
+    Read all registered anchors from their (previously materialized) staging tables.
+    """
+    for anchor in registered_anchors():
+        anchor.activate()
+
+
+def reset_anchors() -> None:
+    """
+    Compute all registered anchors inline again.
+    """
+    for anchor in registered_anchors():
+        anchor.reset()
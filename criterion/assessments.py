@@ -5,6 +5,7 @@ from execution_engine.omop.criterion.procedure_occurrence import ProcedureOccurr
 from execution_engine.util.types import Timing
 from execution_engine.util.value import ValueConcept
 
+from digipod.criterion.checklist import AssessmentChecklist
 from digipod.terminology.vocabulary import (
     OPTIMIZABLE_PREOPERATIVE_RISK_FACTOR,
     PREOPERATIVE_RISK_FACTOR_OPTIMIZATION,
@@ -500,6 +501,41 @@ hypovolemiaRiskAssessment = ProcedureOccurrence(
     value=None,
 )
 
+# all risk factor assessments of the preoperative screening bundle, evaluated in a single query
+preoperativeRiskFactorScreening = AssessmentChecklist(
+    required=[
+        c.concept
+        for c in (
+            cardiacAssessment,
+            neurologicalAssessment,
+            cardiovascularEvaluation,
+            diabetesScreening,
+            anemiaScreening,
+            depressedMoodAssessment,
+            painAssessment,
+            anxietyAssessment,
+            cognitiveFunctionAssessment,
+            dementiaAssessment,
+            frailtyAssessment,
+            sensoryImpairmentAssessment,
+            nutritionalAssessment,
+            medicationAdministrationAssessment,
+            electrolytesMeasurement,
+            swallowingFunctionEvaluation,
+            anticholinergicBurdenScale,
+        )
+    ],
+    any_of=[
+        c.concept
+        for c in (
+            preAnestheticAssessment,
+            dehydrationRiskAssessment,
+            impairedNutritionRiskAssessment,
+            hypovolemiaRiskAssessment,
+        )
+    ],
+)
+
 optimizablePreopRiskFactorPresent = Observation(
     static=False,
     value_required=False,
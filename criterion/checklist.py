@@ -0,0 +1,287 @@
+"""
+Checklists of assessments that must all (or at least some) be documented.
+
+Assessment bundles (e.g. the preoperative risk factor screening of recommendation 4.1) are expressed as an And()
+of many single-concept criteria, each of which is a separate query followed by an n-way interval combination. An
+`AssessmentChecklist` instead fetches all member concepts with one `<domain>_concept_id IN (...)` scan per domain
+table, groups the documented items by person and decides in SQL whether the checklist is fulfilled.
+"""
+
+from typing import Any, Self
+
+from execution_engine.omop.concepts import Concept
+from execution_engine.omop.criterion.abstract import (
+    Criterion,
+    column_interval_type,
+    observation_end_datetime,
+    observation_start_datetime,
+)
+from execution_engine.omop.db.omop.tables import (
+    Measurement,
+    Observation,
+    Person,
+    ProcedureOccurrence,
+)
+from execution_engine.util.interval import IntervalType
+from sqlalchemy import distinct, func, literal, select, union_all
+from sqlalchemy.sql import ColumnElement, FromClause, Select
+
+# table, concept column and datetime column of the supported domains
+_DOMAIN_TABLES = {
+    "Procedure": (
+        ProcedureOccurrence.__table__,
+        "procedure_concept_id",
+        "procedure_datetime",
+    ),
+    "Measurement": (
+        Measurement.__table__,
+        "measurement_concept_id",
+        "measurement_datetime",
+    ),
+    "Observation": (
+        Observation.__table__,
+        "observation_concept_id",
+        "observation_datetime",
+    ),
+}
+
+# domains whose undocumented items yield NO_DATA as single criteria (undocumented procedures yield NEGATIVE)
+_NO_DATA_DOMAINS = {"Measurement", "Observation"}
+
+
+class AssessmentChecklist(Criterion):
+    """
+    Select patients (during the whole observation window) in whom all required items and at least `min_any_of` of
+    the optional items were documented at least once during the observation window.
+
+    Equivalent to `And(*required, MinCount(*any_of, threshold=min_any_of))` of single-concept criteria with a count
+    timing (at least once), but evaluated in one query. `coverage_query()` returns the number of covered items per
+    person.
+
+    As for the single-concept criteria, an undocumented Measurement (or Observation) item yields NO_DATA, while an
+    undocumented Procedure item yields NEGATIVE. A checklist that is not fulfilled is thus NEGATIVE if a required
+    Procedure item is missing or the optional items cannot reach `min_any_of` even with the undocumented
+    Measurement (or Observation) items, and NO_DATA otherwise.
+    """
+
+    def __init__(
+        self,
+        required: list[Concept],
+        any_of: list[Concept] | None = None,
+        min_any_of: int = 1,
+    ) -> None:
+        super().__init__()
+        any_of = any_of or []
+
+        if not required and not any_of:
+            raise ValueError("At least one item is required")
+
+        for concept in required + any_of:
+            if concept.domain_id not in _DOMAIN_TABLES:
+                raise ValueError(f"Unsupported domain of {concept}")
+
+        if any_of and not 1 <= min_any_of <= len(any_of):
+            raise ValueError(f"min_any_of must be between 1 and {len(any_of)}")
+
+        # the items span several domains, the domain only determines the defaults of the base class
+        self._set_omop_variables_from_domain("Procedure")
+        self._value_required = False  # we don't care for any specific value
+        self._required = list(required)
+        self._any_of = list(any_of)
+        self._min_any_of = min_any_of if any_of else 0
+
+    @staticmethod
+    def _concept_ids(concepts: list[Concept], no_data: bool | None = None) -> list[int]:
+        """
+        Get the distinct concept ids of the given items (only of the NO_DATA domains or the other domains, if
+        no_data is given).
+        """
+        return sorted(
+            {
+                c.concept_id
+                for c in concepts
+                if no_data is None or (c.domain_id in _NO_DATA_DOMAINS) == no_data
+            }
+        )
+
+    def description(self) -> str:
+        """
+        Get a description of the criterion.
+        """
+        required = ", ".join(c.concept_name for c in self._required)
+        any_of = ", ".join(c.concept_name for c in self._any_of)
+
+        return (
+            f"AssessmentChecklist[all of: {required}; {self._min_any_of} of: {any_of}]"
+        )
+
+    def dict(self) -> dict[str, Any]:
+        """
+        Get a dictionary representation of the object.
+        """
+        return {
+            "required": [c.model_dump() for c in self._required],
+            "any_of": [c.model_dump() for c in self._any_of],
+            "min_any_of": self._min_any_of,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """
+        Create a criterion from a dictionary representation.
+        """
+        return cls(
+            required=[Concept(**c) for c in data["required"]],
+            any_of=[Concept(**c) for c in data["any_of"]],
+            min_any_of=data["min_any_of"] or 1,
+        )
+
+    def _query_documented_items(self) -> FromClause:
+        """
+        Get the distinct (person_id, concept_id) pairs of all items documented during the observation window, with
+        one scan per domain table.
+        """
+        queries = []
+
+        for domain, (table, c_concept, c_datetime) in _DOMAIN_TABLES.items():
+            concept_ids = sorted(
+                {
+                    c.concept_id
+                    for c in self._required + self._any_of
+                    if c.domain_id == domain
+                }
+            )
+
+            if not concept_ids:
+                continue
+
+            queries.append(
+                select(table.c.person_id, table.c[c_concept].label("concept_id")).where(
+                    table.c[c_concept].in_(concept_ids),
+                    table.c[c_datetime].between(
+                        observation_start_datetime, observation_end_datetime
+                    ),
+                )
+            )
+
+        return union_all(*queries).subquery("documented_item")
+
+    def coverage_query(self) -> Select:
+        """
+        Get the coverage of the checklist per person.
+
+        :return: A query returning (person_id, n_required, n_required_negative, n_any_of, n_any_of_no_data) - the
+            number of distinct required and optional items that were documented during the observation window, in
+            total and of the domains whose undocumented items yield NEGATIVE and NO_DATA, respectively (persons
+            without any documented item are omitted).
+        """
+        items = self._query_documented_items()
+
+        def n_covered(concept_ids: list[int]) -> Any:
+            if not concept_ids:
+                return literal(0)
+
+            return func.count(distinct(items.c.concept_id)).filter(
+                items.c.concept_id.in_(concept_ids)
+            )
+
+        return select(
+            items.c.person_id,
+            n_covered(self._concept_ids(self._required)).label("n_required"),
+            n_covered(self._concept_ids(self._required, no_data=False)).label(
+                "n_required_negative"
+            ),
+            n_covered(self._concept_ids(self._any_of)).label("n_any_of"),
+            n_covered(self._concept_ids(self._any_of, no_data=True)).label(
+                "n_any_of_no_data"
+            ),
+        ).group_by(items.c.person_id)
+
+    def _interval_type_conditions(
+        self,
+        n_required: ColumnElement,
+        n_required_negative: ColumnElement,
+        n_any_of: ColumnElement,
+        n_any_of_no_data: ColumnElement,
+    ) -> dict[IntervalType, ColumnElement]:
+        """
+        Get the condition of each result (POSITIVE, NEGATIVE, NO_DATA) on the coverage of the checklist.
+        """
+        n_undocumented_no_data = (
+            len(self._concept_ids(self._any_of, no_data=True)) - n_any_of_no_data
+        )
+
+        positive = (n_required >= len(self._concept_ids(self._required))) & (
+            n_any_of >= self._min_any_of
+        )
+        negative = (
+            n_required_negative < len(self._concept_ids(self._required, no_data=False))
+        ) | (n_any_of + n_undocumented_no_data < self._min_any_of)
+
+        return {
+            IntervalType.POSITIVE: positive,
+            IntervalType.NEGATIVE: negative,
+            IntervalType.NO_DATA: ~positive & ~negative,
+        }
+
+    def _create_query(self) -> Select:
+        """
+        Get the SQL Select query for data required by this criterion.
+
+        Persons without any documented item are only selected if that yields NO_DATA (the gaps of the criterion are
+        NEGATIVE).
+        """
+        coverage = self.coverage_query().cte("coverage")
+        conditions = self._interval_type_conditions(
+            coverage.c.n_required,
+            coverage.c.n_required_negative,
+            coverage.c.n_any_of,
+            coverage.c.n_any_of_no_data,
+        )
+
+        queries = [
+            select(
+                coverage.c.person_id,
+                column_interval_type(interval_type),
+                observation_start_datetime.label("interval_start"),
+                observation_end_datetime.label("interval_end"),
+            ).where(condition)
+            for interval_type, condition in conditions.items()
+        ]
+
+        if self._undocumented_interval_type() == IntervalType.NO_DATA:
+            person = Person.__table__.alias("p")
+            queries.append(
+                select(
+                    person.c.person_id,
+                    column_interval_type(IntervalType.NO_DATA),
+                    observation_start_datetime.label("interval_start"),
+                    observation_end_datetime.label("interval_end"),
+                ).where(person.c.person_id.not_in(select(coverage.c.person_id)))
+            )
+
+        result = union_all(*queries).subquery("checklist")
+
+        query = select(
+            result.c.person_id,
+            result.c.interval_type,
+            result.c.interval_start,
+            result.c.interval_end,
+        )
+
+        query = self._filter_base_persons(query, c_person_id=result.c.person_id)
+        query = self._filter_datetime(query)
+
+        return query
+
+    def _undocumented_interval_type(self) -> IntervalType:
+        """
+        Get the result of the checklist for a person without any documented item.
+        """
+        if (
+            self._concept_ids(self._required, no_data=False)
+            or len(self._concept_ids(self._any_of, no_data=True)) < self._min_any_of
+        ):
+            return IntervalType.NEGATIVE
+
+        return IntervalType.NO_DATA
@@ -0,0 +1,118 @@
+"""
+Criteria on sets of concepts (including their descendants).
+
+A concept set is evaluated with a single `<domain>_concept_id IN (...)` query instead of one query per concept.
+The descendants of the concepts are selected from the `concept_ancestor` table by a subquery of that query (i.e.
+from the vocabulary at execution time), so adding concepts to a set does not add queries.
+"""
+
+from typing import Any, Self
+
+from execution_engine.omop.concepts import Concept
+from execution_engine.omop.criterion.abstract import Criterion, column_interval_type
+from execution_engine.omop.db.omop.schema import SCHEMA_NAME as OMOP_SCHEMA_NAME
+from execution_engine.util.interval import IntervalType
+from sqlalchemy import BigInteger, Column, MetaData, Table, func, or_, select
+from sqlalchemy.sql import ColumnElement, Select
+
+_concept_ancestor = Table(
+    "concept_ancestor",
+    MetaData(schema=OMOP_SCHEMA_NAME),
+    Column("ancestor_concept_id", BigInteger),
+    Column("descendant_concept_id", BigInteger),
+)
+
+
+def descendants_of(concept_ids: list[int]) -> Select:
+    """
+    Get a query for all descendants of the given concepts (from concept_ancestor).
+
+    :param concept_ids: The ids of the ancestor concepts.
+    :return: A query returning the ids of the descendants (descendant_concept_id).
+    """
+    return select(_concept_ancestor.c.descendant_concept_id).where(
+        _concept_ancestor.c.ancestor_concept_id.in_(concept_ids)
+    )
+
+
+class ConditionConceptSet(Criterion):
+    """
+    Select patients during the condition occurrences of any concept of a concept set (including descendants).
+
+    Equivalent to an Or() of a ConditionOccurrence per concept (and descendant), but evaluated in one query.
+    """
+
+    def __init__(
+        self, concepts: list[Concept], include_descendants: bool = True
+    ) -> None:
+        super().__init__()
+        if not concepts:
+            raise ValueError("At least one concept is required")
+
+        self._set_omop_variables_from_domain("Condition")
+        self._value_required = False  # we don't care for any specific value
+        self._concepts = list(concepts)
+        self._include_descendants = include_descendants
+
+    def description(self) -> str:
+        """
+        Get a description of the criterion.
+        """
+        names = ", ".join(c.concept_name for c in self._concepts)
+        return f"ConditionConceptSet[{names}]"
+
+    def dict(self) -> dict[str, Any]:
+        """
+        Get a dictionary representation of the object.
+        """
+        return {
+            "concepts": [c.model_dump() for c in self._concepts],
+            "include_descendants": self._include_descendants,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """
+        Create a criterion from a dictionary representation.
+        """
+        return cls(
+            concepts=[Concept(**c) for c in data["concepts"]],
+            include_descendants=data["include_descendants"],
+        )
+
+    def concept_ids(self) -> list[int]:
+        """
+        Get the ids of the concepts of the set (without descendants).
+        """
+        return sorted({c.concept_id for c in self._concepts})
+
+    def _concept_filter(self, c_concept_id: ColumnElement) -> ColumnElement:
+        """
+        Get the condition that a concept id is in the set (or a descendant of a concept of the set, if enabled).
+        """
+        concept_ids = self.concept_ids()
+        condition = c_concept_id.in_(concept_ids)
+
+        if self._include_descendants:
+            condition = or_(condition, c_concept_id.in_(descendants_of(concept_ids)))
+
+        return condition
+
+    def _create_query(self) -> Select:
+        """
+        Get the SQL Select query for data required by this criterion.
+        """
+        query = select(
+            self._table.c.person_id,
+            column_interval_type(IntervalType.POSITIVE),
+            self._table.c.condition_start_datetime.label("interval_start"),
+            func.coalesce(
+                self._table.c.condition_end_datetime,
+                self._table.c.condition_start_datetime,
+            ).label("interval_end"),
+        ).where(self._concept_filter(self._table.c.condition_concept_id))
+
+        query = self._filter_base_persons(query)
+        query = self._filter_datetime(query)
+
+        return query
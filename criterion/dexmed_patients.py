@@ -55,9 +55,7 @@ class PatientsBeforeFirstDexAdministration(FirstDexmedetomidineAdministration):
             column_interval_type(IntervalType.POSITIVE),
             observation_start_datetime.label("interval_start"),
             subquery.c.drug_exposure_start_datetime.label("interval_end"),
-        ).where(
-            subquery.c.rn == 1
-        )  # Filter only the first administration per person
+        )
 
         query = self._filter_base_persons(query, c_person_id=subquery.c.person_id)
         query = self._filter_datetime(query)
@@ -82,9 +80,7 @@ class PatientsAfterFirstDexAdministration(FirstDexmedetomidineAdministration):
             column_interval_type(IntervalType.POSITIVE),
             subquery.c.drug_exposure_start_datetime.label("interval_start"),
             observation_end_datetime.label("interval_end"),
-        ).where(
-            subquery.c.rn == 1
-        )  # Filter only the first administration per person
+        )
 
         query = self._filter_base_persons(query, c_person_id=subquery.c.person_id)
         query = self._filter_datetime(query)
@@ -0,0 +1,179 @@
+"""
+Query strategies for extracting the first event (e.g. the first surgery) per person.
+
+The strategy can be selected per deployment via the environment variable DIGIPOD_FIRST_EVENT_STRATEGY:
+
+- "row_number" (default): numbers all matching rows per person with a window function and keeps the first one.
+  Requires a full sort of all matching rows per person.
+- "distinct_on": PostgreSQL's DISTINCT ON (person_id) ... ORDER BY person_id, <datetime>. Can use an index on
+  (<concept_id>, person_id, <datetime>) to avoid the sort.
+- "lateral": one LATERAL (... ORDER BY <datetime> LIMIT 1) subquery per person of the person table. Performs one
+  index probe per person on an index (<concept_id>, person_id, <datetime>); best if only a small fraction of the
+  rows of the table matches the concept.
+
+Without the index (<concept_id>, person_id, <datetime>), "distinct_on" and "lateral" are slower than the default.
+The OMOP CDM does not define it, so `ensure_first_event_index()` creates it on the source table when one of these
+strategies is configured (called before the anchors are materialized).
+
+See benchmarks/first_event.py for a comparison of plans and runtimes.
+"""
+
+import logging
+import os
+from enum import StrEnum
+
+from execution_engine.omop.db.omop.tables import Person
+from sqlalchemy import Connection, Table, func, select, text, true
+from sqlalchemy.sql import FromClause, Select
+
+FIRST_EVENT_STRATEGY_ENV = "DIGIPOD_FIRST_EVENT_STRATEGY"
+
+
+class FirstEventStrategy(StrEnum):
+    """
+    Query strategy for extracting the first event per person.
+    """
+
+    ROW_NUMBER = "row_number"
+    DISTINCT_ON = "distinct_on"
+    LATERAL = "lateral"
+
+
+def get_first_event_strategy() -> FirstEventStrategy:
+    """
+    Get the first event strategy configured for this deployment.
+    """
+    value = os.environ.get(FIRST_EVENT_STRATEGY_ENV, FirstEventStrategy.ROW_NUMBER)
+
+    try:
+        return FirstEventStrategy(value.lower())
+    except ValueError:
+        raise ValueError(
+            f"Invalid value for {FIRST_EVENT_STRATEGY_ENV}: {value!r} "
+            f"(expected one of {', '.join(s.value for s in FirstEventStrategy)})"
+        ) from None
+
+
+def first_event_index_name(table: Table) -> str:
+    """
+    Get the name of the index (<concept_id>, person_id, <datetime>) created by `ensure_first_event_index()`.
+    """
+    return f"ix_{table.name}_digipod_first_event"
+
+
+def ensure_first_event_index(
+    con: Connection,
+    table: Table,
+    concept_column: str,
+    datetime_column: str,
+    strategy: FirstEventStrategy | None = None,
+) -> bool:
+    """
+    Create the index (<concept_id>, person_id, <datetime>) used by the "distinct_on" and "lateral" strategies, if
+    one of them is configured and the index does not exist yet.
+
+    The index is created once per source table; this may take a while on large tables. The default strategy
+    "row_number" does not use the index and nothing is created.
+
+    :param con: The database connection (within a transaction).
+    :param table: The source table of the events (not an alias).
+    :param concept_column: The name of the concept id column.
+    :param datetime_column: The name of the column that defines the order of the events.
+    :param strategy: The query strategy. If None, the strategy configured for this deployment is used.
+    :return: Whether the strategy uses the index.
+    """
+    if strategy is None:
+        strategy = get_first_event_strategy()
+
+    if strategy == FirstEventStrategy.ROW_NUMBER:
+        return False
+
+    index_name = first_event_index_name(table)
+
+    logging.info(f"Ensuring index {index_name} for first event strategy {strategy}")
+
+    con.execute(
+        text(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table.fullname} "  # nosec
+            f"({concept_column}, person_id, {datetime_column})"
+        )
+    )
+
+    return True
+
+
+def query_first_event(
+    table: FromClause,
+    concept_column: str,
+    concept_id: int,
+    datetime_column: str,
+    columns: list[str],
+    strategy: FirstEventStrategy | None = None,
+    persons: FromClause | None = None,
+) -> Select:
+    """
+    Get a query that returns the first event (ordered by datetime_column) per person.
+
+    :param table: The table containing the events (must have a person_id column).
+    :param concept_column: The name of the concept id column to filter on.
+    :param concept_id: The concept id of the events.
+    :param datetime_column: The name of the column that defines the order of the events.
+    :param columns: The names of the columns to return (in addition to person_id).
+    :param strategy: The query strategy. If None, the strategy configured for this deployment is used.
+    :param persons: The table driving the "lateral" strategy (defaults to the OMOP person table).
+    :return: A query returning one row (person_id, *columns) per person that has at least one event.
+    """
+    if strategy is None:
+        strategy = get_first_event_strategy()
+
+    c_concept = table.c[concept_column]
+    c_datetime = table.c[datetime_column]
+
+    match strategy:
+        case FirstEventStrategy.ROW_NUMBER:
+            subquery = (
+                select(
+                    table.c.person_id,
+                    *[table.c[c] for c in columns],
+                    func.row_number()
+                    .over(partition_by=table.c.person_id, order_by=c_datetime)
+                    .label("rn"),
+                )
+                .where(c_concept == concept_id)
+                .subquery("numbered_events")
+            )
+
+            return select(
+                subquery.c.person_id, *[subquery.c[c] for c in columns]
+            ).where(
+                subquery.c.rn == 1
+            )  # Filter only the first event per person
+
+        case FirstEventStrategy.DISTINCT_ON:
+            return (
+                select(table.c.person_id, *[table.c[c] for c in columns])
+                .where(c_concept == concept_id)
+                .order_by(table.c.person_id, c_datetime)
+                .distinct(table.c.person_id)
+            )
+
+        case FirstEventStrategy.LATERAL:
+            if persons is None:
+                persons = Person.__table__.alias("p")
+
+            first_event = (
+                select(*[table.c[c] for c in columns])
+                .where(
+                    table.c.person_id == persons.c.person_id,
+                    c_concept == concept_id,
+                )
+                .order_by(c_datetime)
+                .limit(1)
+                .lateral("first_event")
+            )
+
+            return select(
+                persons.c.person_id, *[first_event.c[c] for c in columns]
+            ).select_from(persons.join(first_event, true()))
+
+    raise ValueError(f"Unknown first event strategy: {strategy}")
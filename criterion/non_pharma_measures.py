@@ -1,4 +1,5 @@
 from execution_engine.omop.concepts import Concept
+from execution_engine.omop.criterion.abstract import Criterion
 from execution_engine.omop.criterion.condition_occurrence import ConditionOccurrence
 from execution_engine.omop.criterion.device_exposure import DeviceExposure
 from execution_engine.omop.criterion.measurement import Measurement
@@ -15,11 +16,21 @@ from digipod.criterion import (
     PatientsBeforeFirstDexAdministration,
     PostOperativePatients,
 )
+from digipod.criterion.concept_set import ConditionConceptSet
 from digipod.criterion.patients import AgeLimitPatient
 from digipod.criterion.preop_patients import (
     PreOperativePatientsBeforeSurgery,
     PreOperativePatientsUntilTwoHoursBeforeDayOfSurgery,
 )
+from digipod.criterion.registry import intern_criterion
+from digipod.criterion.scores import (
+    FOUR_AT_SCORE,
+    NEGATIVE,
+    POSITIVE,
+    WEAKLY_POSITIVE,
+    restrict_before_first_dex_administration,
+    score_classification,
+)
 from digipod.terminology import custom_concepts
 
 COGNITIVE_STIMULATION = Concept(
@@ -182,6 +193,61 @@ MOUTH_CARE_MANAGEMENT = Concept(
     invalid_reason=None,
 )
 
+DEMENTIA = Concept(
+    concept_id=4182210,
+    concept_name="Dementia",
+    concept_code="52448006",
+    domain_id="Condition",
+    vocabulary_id="SNOMED",
+    concept_class_id="Disorder",
+    standard_concept="S",
+    invalid_reason=None,
+)
+
+VASCULAR_DEMENTIA = Concept(
+    concept_id=1568087,
+    concept_name="Vascular dementia",
+    concept_code="F01",
+    domain_id="Condition",
+    vocabulary_id="ICD10CM",
+    concept_class_id="3-char nonbill code",
+    standard_concept=None,
+    invalid_reason=None,
+)
+
+DEMENTIA_IN_OTHER_DISEASES = Concept(
+    concept_id=1568088,
+    concept_name="Dementia in other diseases classified elsewhere",
+    concept_code="F02",
+    domain_id="Condition",
+    vocabulary_id="ICD10CM",
+    concept_class_id="3-char nonbill code",
+    standard_concept=None,
+    invalid_reason=None,
+)
+
+DEMENTIA_IN_OTHER_DISEASES_UNSPECIFIED_SEVERITY = Concept(
+    concept_id=1568089,
+    concept_name="Dementia in other diseases classified elsewhere, unspecified severity",
+    concept_code="F02.8",
+    domain_id="Condition",
+    vocabulary_id="ICD10CM",
+    concept_class_id="4-char nonbill code",
+    standard_concept=None,
+    invalid_reason=None,
+)
+
+DEMENTIA_UNSPECIFIED = Concept(
+    concept_id=35207114,
+    concept_name="Unspecified dementia",
+    concept_code="F03",
+    domain_id="Condition",
+    vocabulary_id="ICD10CM",
+    concept_class_id="3-char nonbill code",
+    standard_concept=None,
+    invalid_reason=None,
+)
+
 
 def IntraOrPostOperative(arg: logic.BaseExpr) -> logic.TemporalMinCount:
     """
@@ -193,7 +259,7 @@ def IntraOrPostOperative(arg: logic.BaseExpr) -> logic.TemporalMinCount:
         start_time=None,
         end_time=None,
         interval_type=None,
-        interval_criterion=IntraOrPostOperativePatients(),
+        interval_criterion=intern_criterion(IntraOrPostOperativePatients()),
         threshold=1,
     )
 
@@ -208,7 +274,7 @@ def PostOperative(arg: logic.BaseExpr) -> logic.TemporalMinCount:
         start_time=None,
         end_time=None,
         interval_type=None,
-        interval_criterion=PostOperativePatients(),
+        interval_criterion=intern_criterion(PostOperativePatients()),
         threshold=1,
     )
 
@@ -224,7 +290,9 @@ def PreOperativeUntilTwoHoursBeforeDayOfSurgery(
         start_time=None,
         end_time=None,
         interval_type=None,
-        interval_criterion=PreOperativePatientsUntilTwoHoursBeforeDayOfSurgery(),
+        interval_criterion=intern_criterion(
+            PreOperativePatientsUntilTwoHoursBeforeDayOfSurgery()
+        ),
         threshold=1,
     )
 
@@ -238,7 +306,7 @@ def PreOperativeBeforeSurgery(arg: logic.BaseExpr) -> logic.TemporalMinCount:
         start_time=None,
         end_time=None,
         interval_type=None,
-        interval_criterion=PreOperativePatientsBeforeSurgery(),
+        interval_criterion=intern_criterion(PreOperativePatientsBeforeSurgery()),
         threshold=1,
     )
 
@@ -253,7 +321,8 @@ def OnFacesScaleAssessmentDayPostOp(arg: logic.BaseExpr) -> logic.TemporalMinCou
         end_time=None,
         interval_type=None,
         interval_criterion=And(
-            PostOperativePatients(), OnFacesAnxietyScaleAssessmentDay()
+            intern_criterion(PostOperativePatients()),
+            intern_criterion(OnFacesAnxietyScaleAssessmentDay()),
         ),
         threshold=1,
     )
@@ -269,7 +338,8 @@ def PreFacesScalePostOp(arg: logic.BaseExpr) -> logic.TemporalMinCount:
         end_time=None,
         interval_type=None,
         interval_criterion=And(
-            PostOperativePatients(), BeforeDailyFacesAnxietyScaleAssessment()
+            intern_criterion(PostOperativePatients()),
+            intern_criterion(BeforeDailyFacesAnxietyScaleAssessment()),
         ),
         threshold=1,
     )
@@ -286,9 +356,9 @@ def PreFacesScaleOnAssessmentDayPostOp(arg: logic.BaseExpr) -> logic.TemporalMin
         end_time=None,
         interval_type=None,
         interval_criterion=And(
-            PostOperativePatients(),
-            OnFacesAnxietyScaleAssessmentDay(),
-            BeforeDailyFacesAnxietyScaleAssessment(),
+            intern_criterion(PostOperativePatients()),
+            intern_criterion(OnFacesAnxietyScaleAssessmentDay()),
+            intern_criterion(BeforeDailyFacesAnxietyScaleAssessment()),
         ),
         threshold=1,
     )
@@ -299,12 +369,18 @@ def BeforeFirstDexAdministration(arg: logic.BaseExpr) -> logic.TemporalMinCount:
     Applies a constraint for criterion occurring before the first administration
     of dexametheasone
     """
+    # fetch only the rows before the first administration (the interval criterion still defines the result)
+    arg = restrict_before_first_dex_administration(arg)
+
+    if isinstance(arg, Criterion):
+        arg = intern_criterion(arg)
+
     return TemporalMinCount(
         arg,
         start_time=None,
         end_time=None,
         interval_type=None,
-        interval_criterion=PatientsBeforeFirstDexAdministration(),
+        interval_criterion=intern_criterion(PatientsBeforeFirstDexAdministration()),
         threshold=1,
     )
 
@@ -312,16 +388,7 @@ def BeforeFirstDexAdministration(arg: logic.BaseExpr) -> logic.TemporalMinCount:
 dementia = ConditionOccurrence(
     static=False,
     value_required=False,
-    concept=Concept(
-        concept_id=4182210,
-        concept_name="Dementia",
-        concept_code="52448006",
-        domain_id="Condition",
-        vocabulary_id="SNOMED",
-        concept_class_id="Disorder",
-        standard_concept="S",
-        invalid_reason=None,
-    ),
+    concept=DEMENTIA,
     value=None,
     timing=None,
 )
@@ -329,16 +396,7 @@ dementia = ConditionOccurrence(
 vascularDementia = ConditionOccurrence(
     static=False,
     value_required=False,
-    concept=Concept(
-        concept_id=1568087,
-        concept_name="Vascular dementia",
-        concept_code="F01",
-        domain_id="Condition",
-        vocabulary_id="ICD10CM",
-        concept_class_id="3-char nonbill code",
-        standard_concept=None,
-        invalid_reason=None,
-    ),
+    concept=VASCULAR_DEMENTIA,
     value=None,
     timing=None,
 )
@@ -346,16 +404,7 @@ vascularDementia = ConditionOccurrence(
 dementiaInOtherDiseases = ConditionOccurrence(
     static=False,
     value_required=False,
-    concept=Concept(
-        concept_id=1568088,
-        concept_name="Dementia in other diseases classified elsewhere",
-        concept_code="F02",
-        domain_id="Condition",
-        vocabulary_id="ICD10CM",
-        concept_class_id="3-char nonbill code",
-        standard_concept=None,
-        invalid_reason=None,
-    ),
+    concept=DEMENTIA_IN_OTHER_DISEASES,
     value=None,
     timing=None,
 )
@@ -363,16 +412,7 @@ dementiaInOtherDiseases = ConditionOccurrence(
 dementiaInOtherDiseasesUnspecSeverity = ConditionOccurrence(
     static=False,
     value_required=False,
-    concept=Concept(
-        concept_id=1568089,
-        concept_name="Dementia in other diseases classified elsewhere, unspecified severity",
-        concept_code="F02.8",
-        domain_id="Condition",
-        vocabulary_id="ICD10CM",
-        concept_class_id="4-char nonbill code",
-        standard_concept=None,
-        invalid_reason=None,
-    ),
+    concept=DEMENTIA_IN_OTHER_DISEASES_UNSPECIFIED_SEVERITY,
     value=None,
     timing=None,
 )
@@ -380,35 +420,25 @@ dementiaInOtherDiseasesUnspecSeverity = ConditionOccurrence(
 dementiaUnspecified = ConditionOccurrence(
     static=False,
     value_required=False,
-    concept=Concept(
-        concept_id=35207114,
-        concept_name="Unspecified dementia",
-        concept_code="F03",
-        domain_id="Condition",
-        vocabulary_id="ICD10CM",
-        concept_class_id="3-char nonbill code",
-        standard_concept=None,
-        invalid_reason=None,
-    ),
+    concept=DEMENTIA_UNSPECIFIED,
     value=None,
     timing=None,
 )
 
-anyDementiaBeforeDayOfSurgery = Or(
-    PreOperativeUntilTwoHoursBeforeDayOfSurgery(dementia),
-    PreOperativeUntilTwoHoursBeforeDayOfSurgery(vascularDementia),
-    PreOperativeUntilTwoHoursBeforeDayOfSurgery(dementiaInOtherDiseases),
-    PreOperativeUntilTwoHoursBeforeDayOfSurgery(dementiaInOtherDiseasesUnspecSeverity),
-    PreOperativeUntilTwoHoursBeforeDayOfSurgery(dementiaUnspecified),
+# all dementia codes (and their descendants) in a single condition_occurrence query
+anyDementia = ConditionConceptSet(
+    [
+        DEMENTIA,
+        VASCULAR_DEMENTIA,
+        DEMENTIA_IN_OTHER_DISEASES,
+        DEMENTIA_IN_OTHER_DISEASES_UNSPECIFIED_SEVERITY,
+        DEMENTIA_UNSPECIFIED,
+    ]
 )
 
-anyDementiaBeforeSurgery = Or(
-    PreOperativeBeforeSurgery(dementia),
-    PreOperativeBeforeSurgery(vascularDementia),
-    PreOperativeBeforeSurgery(dementiaInOtherDiseases),
-    PreOperativeBeforeSurgery(dementiaInOtherDiseasesUnspecSeverity),
-    PreOperativeBeforeSurgery(dementiaUnspecified),
-)
+anyDementiaBeforeDayOfSurgery = PreOperativeUntilTwoHoursBeforeDayOfSurgery(anyDementia)
+
+anyDementiaBeforeSurgery = PreOperativeBeforeSurgery(anyDementia)
 
 
 asaGt2 = Measurement(
@@ -528,639 +558,157 @@ facesAnxietyScoreAssessed = Measurement(
     value=None,
 )
 
-nudescGte2 = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE,
-    forward_fill=False,
-    value=ValueScalar(unit=None, value=None, value_min=2.0, value_max=None),
-    timing=None,
+nudescGte2 = score_classification(
+    custom_concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE,
+    ValueScalar(unit=None, value=None, value_min=2.0, value_max=None),
 )
 
-nudescLt2 = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE,
-    forward_fill=False,
-    value=ValueScalar(unit=None, value=None, value_min=None, value_max=1.99998),
-    timing=None,
+nudescLt2 = score_classification(
+    custom_concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE,
+    ValueScalar(unit=None, value=None, value_min=None, value_max=1.99998),
 )
 
-nudescPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9191,
-            "concept_name": "Positive",
-            "concept_code": "10828004",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+nudescPositive = score_classification(
+    custom_concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE, POSITIVE
 )
 
-nudescNegative = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9189,
-            "concept_name": "Negative",
-            "concept_code": "260385009",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+nudescNegative = score_classification(
+    custom_concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE, NEGATIVE
 )
 
-nudescWeaklyPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 4127785,
-            "concept_name": "Weakly positive",
-            "concept_code": "260408008",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+nudescWeaklyPositive = score_classification(
+    custom_concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE, WEAKLY_POSITIVE
 )
 
-icdscGte4 = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE,
-    forward_fill=False,
-    value=ValueScalar(unit=None, value=None, value_min=4.0, value_max=None),
-    timing=None,
+icdscGte4 = score_classification(
+    custom_concepts.INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE,
+    ValueScalar(unit=None, value=None, value_min=4.0, value_max=None),
 )
 
-icdscPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9191,
-            "concept_name": "Positive",
-            "concept_code": "10828004",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+icdscPositive = score_classification(
+    custom_concepts.INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE, POSITIVE
 )
 
-icdscLt4 = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE,
-    forward_fill=False,
-    value=ValueScalar(unit=None, value=None, value_min=None, value_max=3.99996),
-    timing=None,
+icdscLt4 = score_classification(
+    custom_concepts.INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE,
+    ValueScalar(unit=None, value=None, value_min=None, value_max=3.99996),
 )
 
-icdscNegative = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9189,
-            "concept_name": "Negative",
-            "concept_code": "260385009",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+icdscNegative = score_classification(
+    custom_concepts.INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE, NEGATIVE
 )
 
-icdscWeaklyPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 4127785,
-            "concept_name": "Weakly positive",
-            "concept_code": "260408008",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+icdscWeaklyPositive = score_classification(
+    custom_concepts.INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE, WEAKLY_POSITIVE
 )
 
-camPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.CONFUSION_ASSESSMENT_METHOD_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9191,
-            "concept_name": "Positive",
-            "concept_code": "10828004",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+camPositive = score_classification(
+    custom_concepts.CONFUSION_ASSESSMENT_METHOD_SCORE, POSITIVE
 )
 
-camNegative = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.CONFUSION_ASSESSMENT_METHOD_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9189,
-            "concept_name": "Negative",
-            "concept_code": "260385009",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+camNegative = score_classification(
+    custom_concepts.CONFUSION_ASSESSMENT_METHOD_SCORE, NEGATIVE
 )
 
-drsGte12 = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_RATING_SCALE_SCORE,
-    forward_fill=False,
-    value=ValueScalar(unit=None, value=None, value_min=12.0, value_max=None),
-    timing=None,
+drsGte12 = score_classification(
+    custom_concepts.DELIRIUM_RATING_SCALE_SCORE,
+    ValueScalar(unit=None, value=None, value_min=12.0, value_max=None),
 )
 
-drsPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_RATING_SCALE_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9191,
-            "concept_name": "Positive",
-            "concept_code": "10828004",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+drsPositive = score_classification(
+    custom_concepts.DELIRIUM_RATING_SCALE_SCORE, POSITIVE
 )
 
-drsLt12 = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_RATING_SCALE_SCORE,
-    forward_fill=False,
-    value=ValueScalar(unit=None, value=None, value_min=None, value_max=11.99988),
-    timing=None,
+drsLt12 = score_classification(
+    custom_concepts.DELIRIUM_RATING_SCALE_SCORE,
+    ValueScalar(unit=None, value=None, value_min=None, value_max=11.99988),
 )
 
-drsNegative = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_RATING_SCALE_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9189,
-            "concept_name": "Negative",
-            "concept_code": "260385009",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+drsNegative = score_classification(
+    custom_concepts.DELIRIUM_RATING_SCALE_SCORE, NEGATIVE
 )
 
-drsWeaklyPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_RATING_SCALE_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 4127785,
-            "concept_name": "Weakly positive",
-            "concept_code": "260408008",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+drsWeaklyPositive = score_classification(
+    custom_concepts.DELIRIUM_RATING_SCALE_SCORE, WEAKLY_POSITIVE
 )
 
-dosGte3 = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_OBSERVATION_SCALE_SCORE,
-    forward_fill=False,
-    value=ValueScalar(unit=None, value=None, value_min=3.0, value_max=None),
-    timing=None,
+dosGte3 = score_classification(
+    custom_concepts.DELIRIUM_OBSERVATION_SCALE_SCORE,
+    ValueScalar(unit=None, value=None, value_min=3.0, value_max=None),
 )
 
-dosPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_OBSERVATION_SCALE_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9191,
-            "concept_name": "Positive",
-            "concept_code": "10828004",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+dosPositive = score_classification(
+    custom_concepts.DELIRIUM_OBSERVATION_SCALE_SCORE, POSITIVE
 )
 
-dosLt3 = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_OBSERVATION_SCALE_SCORE,
-    forward_fill=False,
-    value=ValueScalar(unit=None, value=None, value_min=None, value_max=2.99997),
-    timing=None,
+dosLt3 = score_classification(
+    custom_concepts.DELIRIUM_OBSERVATION_SCALE_SCORE,
+    ValueScalar(unit=None, value=None, value_min=None, value_max=2.99997),
 )
 
-dosNegative = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_OBSERVATION_SCALE_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9189,
-            "concept_name": "Negative",
-            "concept_code": "260385009",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+dosNegative = score_classification(
+    custom_concepts.DELIRIUM_OBSERVATION_SCALE_SCORE, NEGATIVE
 )
 
-dosWeaklyPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_OBSERVATION_SCALE_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 4127785,
-            "concept_name": "Weakly positive",
-            "concept_code": "260408008",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+dosWeaklyPositive = score_classification(
+    custom_concepts.DELIRIUM_OBSERVATION_SCALE_SCORE, WEAKLY_POSITIVE
 )
 
-tdcamPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.THREE_MINUTE_DIAGNOSTIC_INTERVIEW_FOR_CAM_DEFINED_DELIRIUM_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9191,
-            "concept_name": "Positive",
-            "concept_code": "10828004",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+tdcamPositive = score_classification(
+    custom_concepts.THREE_MINUTE_DIAGNOSTIC_INTERVIEW_FOR_CAM_DEFINED_DELIRIUM_SCORE,
+    POSITIVE,
 )
 
-tdcamNegative = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.THREE_MINUTE_DIAGNOSTIC_INTERVIEW_FOR_CAM_DEFINED_DELIRIUM_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9189,
-            "concept_name": "Negative",
-            "concept_code": "260385009",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+tdcamNegative = score_classification(
+    custom_concepts.THREE_MINUTE_DIAGNOSTIC_INTERVIEW_FOR_CAM_DEFINED_DELIRIUM_SCORE,
+    NEGATIVE,
 )
 
-
-camicuPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.CONFUSION_ASSESSMENT_METHOD_FOR_THE_INTENSIVE_CARE_UNIT_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9191,
-            "concept_name": "Positive",
-            "concept_code": "10828004",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+camicuPositive = score_classification(
+    custom_concepts.CONFUSION_ASSESSMENT_METHOD_FOR_THE_INTENSIVE_CARE_UNIT_SCORE,
+    POSITIVE,
 )
 
-camicuNegative = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.CONFUSION_ASSESSMENT_METHOD_FOR_THE_INTENSIVE_CARE_UNIT_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9189,
-            "concept_name": "Negative",
-            "concept_code": "260385009",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+camicuNegative = score_classification(
+    custom_concepts.CONFUSION_ASSESSMENT_METHOD_FOR_THE_INTENSIVE_CARE_UNIT_SCORE,
+    NEGATIVE,
 )
 
-ddsGte7 = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_DETECTION_SCORE_SCORE,
-    forward_fill=False,
-    value=ValueScalar(unit=None, value=None, value_min=7.0, value_max=None),
-    timing=None,
+ddsGte7 = score_classification(
+    custom_concepts.DELIRIUM_DETECTION_SCORE_SCORE,
+    ValueScalar(unit=None, value=None, value_min=7.0, value_max=None),
 )
 
-ddsLt8 = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_DETECTION_SCORE_SCORE,
-    forward_fill=False,
-    value=ValueScalar(unit=None, value=None, value_min=None, value_max=7.99992),
-    timing=None,
+ddsLt8 = score_classification(
+    custom_concepts.DELIRIUM_DETECTION_SCORE_SCORE,
+    ValueScalar(unit=None, value=None, value_min=None, value_max=7.99992),
 )
 
-ddsPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_DETECTION_SCORE_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9191,
-            "concept_name": "Positive",
-            "concept_code": "10828004",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+ddsPositive = score_classification(
+    custom_concepts.DELIRIUM_DETECTION_SCORE_SCORE, POSITIVE
 )
 
-ddsNegative = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_DETECTION_SCORE_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9189,
-            "concept_name": "Negative",
-            "concept_code": "260385009",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+ddsNegative = score_classification(
+    custom_concepts.DELIRIUM_DETECTION_SCORE_SCORE, NEGATIVE
 )
 
-ddsWeaklyPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=custom_concepts.DELIRIUM_DETECTION_SCORE_SCORE,
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 4127785,
-            "concept_name": "Weakly positive",
-            "concept_code": "260408008",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
+ddsWeaklyPositive = score_classification(
+    custom_concepts.DELIRIUM_DETECTION_SCORE_SCORE, WEAKLY_POSITIVE
 )
 
-FourAtGte4 = Measurement(
-    static=False,
-    value_required=True,
-    concept=Concept(
-        concept_id=3662221,
-        concept_name="4AT (4 A's Test) score",
-        concept_code="1239211000000103",
-        domain_id="Measurement",
-        vocabulary_id="SNOMED",
-        concept_class_id="Observable Entity",
-        standard_concept=None,
-        invalid_reason=None,
-    ),
-    forward_fill=False,
-    value=ValueScalar(unit=None, value=None, value_min=4.0, value_max=None),
-    timing=None,
+FourAtGte4 = score_classification(
+    FOUR_AT_SCORE, ValueScalar(unit=None, value=None, value_min=4.0, value_max=None)
 )
 
-FourAtLt4 = Measurement(
-    static=False,
-    value_required=True,
-    concept=Concept(
-        concept_id=3662221,
-        concept_name="4AT (4 A's Test) score",
-        concept_code="1239211000000103",
-        domain_id="Measurement",
-        vocabulary_id="SNOMED",
-        concept_class_id="Observable Entity",
-        standard_concept=None,
-        invalid_reason=None,
-    ),
-    forward_fill=False,
-    value=ValueScalar(unit=None, value=None, value_min=None, value_max=3.99996),
-    timing=None,
+FourAtLt4 = score_classification(
+    FOUR_AT_SCORE, ValueScalar(unit=None, value=None, value_min=None, value_max=3.99996)
 )
 
-FourAtPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=Concept(
-        concept_id=3662221,
-        concept_name="4AT (4 A's Test) score",
-        concept_code="1239211000000103",
-        domain_id="Measurement",
-        vocabulary_id="SNOMED",
-        concept_class_id="Observable Entity",
-        standard_concept=None,
-        invalid_reason=None,
-    ),
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9191,
-            "concept_name": "Positive",
-            "concept_code": "10828004",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
-)
+FourAtPositive = score_classification(FOUR_AT_SCORE, POSITIVE)
 
-FourAtNegative = Measurement(
-    static=False,
-    value_required=True,
-    concept=Concept(
-        concept_id=3662221,
-        concept_name="4AT (4 A's Test) score",
-        concept_code="1239211000000103",
-        domain_id="Measurement",
-        vocabulary_id="SNOMED",
-        concept_class_id="Observable Entity",
-        standard_concept=None,
-        invalid_reason=None,
-    ),
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 9189,
-            "concept_name": "Negative",
-            "concept_code": "260385009",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
-)
+FourAtNegative = score_classification(FOUR_AT_SCORE, NEGATIVE)
 
-FourAtWeaklyPositive = Measurement(
-    static=False,
-    value_required=True,
-    concept=Concept(
-        concept_id=3662221,
-        concept_name="4AT (4 A's Test) score",
-        concept_code="1239211000000103",
-        domain_id="Measurement",
-        vocabulary_id="SNOMED",
-        concept_class_id="Observable Entity",
-        standard_concept=None,
-        invalid_reason=None,
-    ),
-    forward_fill=False,
-    value=ValueConcept(
-        value={
-            "concept_id": 4127785,
-            "concept_name": "Weakly positive",
-            "concept_code": "260408008",
-            "domain_id": "Meas Value",
-            "vocabulary_id": "SNOMED",
-            "concept_class_id": "Qualifier Value",
-            "standard_concept": "S",
-            "invalid_reason": None,
-        }
-    ),
-    timing=None,
-)
+FourAtWeaklyPositive = score_classification(FOUR_AT_SCORE, WEAKLY_POSITIVE)
 
 
 anyPositiveDeliriumTest = Or(
@@ -1,3 +1,7 @@
+import datetime
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
 from execution_engine.omop.criterion.abstract import (
     SQL_ONE_SECOND,
     Criterion,
@@ -6,132 +10,163 @@ from execution_engine.omop.criterion.abstract import (
     observation_start_datetime,
 )
 from execution_engine.omop.criterion.concept import ConceptCriterion
+from execution_engine.omop.db.omop.tables import Measurement as MeasurementTable
 from execution_engine.omop.db.omop.tables import Person
 from execution_engine.omop.vocabulary import SNOMEDCT, standard_vocabulary
 from execution_engine.util.interval import IntervalType
-from sqlalchemy import Interval, func, select
-from sqlalchemy.sql import Select
+from sqlalchemy import Column, func, literal_column, select
+from sqlalchemy.sql import ColumnElement, FromClause, Select
 
+from digipod.criterion.anchors import Anchor, register_anchor
 from digipod.terminology.vocabulary import FACES_ANXIETY_SCALE_SCORE
 
+SQL_ONE_DAY = literal_column("interval '1 day'")
 
-class AfterDailyFacesAnxietyScaleAssessment(Criterion):
-    """
-    Select patients who are after the assessment and documentation of the Faces Anxiety Scale score of the day.
-    """
 
-    def description(self) -> str:
-        """
-        Get a string representation.
-        """
-        return "AfterDailyFacesAnxietyScaleAssessment"
+def _faces_anxiety_day_columns() -> list[Column]:
+    table = MeasurementTable.__table__
 
-    def __init__(self) -> None:
-        super().__init__()
-        self._set_omop_variables_from_domain(FACES_ANXIETY_SCALE_SCORE.domain_id)
+    return [
+        Column("person_id", table.c.person_id.type, primary_key=True),
+        Column("day", table.c.measurement_datetime.type, primary_key=True),
+        Column("first_assessment_datetime", table.c.measurement_datetime.type),
+        Column("last_assessment_datetime", table.c.measurement_datetime.type),
+    ]
 
-    def _create_query(self) -> Select:
-        """
-        Get the SQL Select query for data required by this criterion.
-        """
 
-        query = select(
-            self._table.c.person_id,
-            column_interval_type(IntervalType.POSITIVE),
-            self._table.c.measurement_datetime.label("interval_start"),
-            (
-                func.date_trunc("day", self._table.c.measurement_datetime)
-                + func.cast(func.concat(1, "day"), Interval)
-                - SQL_ONE_SECOND
-            ).label("interval_end"),
-        ).where(
-            self._table.c.procedure_concept_id == FACES_ANXIETY_SCALE_SCORE.concept_id
+def _query_faces_anxiety_days() -> Select:
+    # mapped attributes (instead of table.c[...] lookups) such that invalid column references are caught by the
+    # type checker instead of failing when the query is executed
+    assessments = (
+        select(
+            MeasurementTable.person_id,
+            func.date_trunc("day", MeasurementTable.measurement_datetime).label("day"),
+            MeasurementTable.measurement_datetime,
         )
-
-        query = self._filter_base_persons(query)
-        query = self._filter_datetime(query)
-
-        return query
+        .where(
+            MeasurementTable.measurement_concept_id
+            == FACES_ANXIETY_SCALE_SCORE.concept_id
+        )
+        .subquery("assessment")
+    )
+
+    return select(
+        assessments.c.person_id,
+        assessments.c.day,
+        func.min(assessments.c.measurement_datetime).label("first_assessment_datetime"),
+        func.max(assessments.c.measurement_datetime).label("last_assessment_datetime"),
+    ).group_by(assessments.c.person_id, assessments.c.day)
+
+
+# the first and last Faces Anxiety Scale assessment per person and day
+FACES_ANXIETY_DAYS = register_anchor(
+    Anchor(
+        name="faces_anxiety_day",
+        columns=_faces_anxiety_day_columns,
+        query=_query_faces_anxiety_days,
+    )
+)
 
 
-class BeforeDailyFacesAnxietyScaleAssessment(Criterion):
+class FacesAnxietyDay(NamedTuple):
     """
-    Select patients who are before the assessment and documentation of the Faces Anxiety Scale score of the day.
+    The columns of the Faces Anxiety Scale assessment day anchor.
+
+    The columns are looked up by name once (in `of()`), the criteria use the typed attributes.
     """
 
-    def description(self) -> str:
+    person_id: ColumnElement
+    day: ColumnElement
+    first_assessment_datetime: ColumnElement
+    last_assessment_datetime: ColumnElement
+
+    @classmethod
+    def of(cls, days: FromClause) -> "FacesAnxietyDay":
         """
-        Get a string representation.
+        Get the columns of the anchor selectable (staging table or inline subquery).
         """
-        return "BeforeDailyFacesAnxietyScaleAssessment"
+        return cls(*(days.c[name] for name in cls._fields))
+
+
+class FacesAnxietyScaleAssessmentDayCriterion(Criterion, ABC):
+    """
+    Base class of criteria that select a part of the days on which the Faces Anxiety Scale score was assessed.
+
+    The criteria are projections of the (person, day, first and last assessment) anchor, which is staged once per
+    run.
+    """
+
+    # all windows are within one day
+    max_window = datetime.timedelta(days=1)
 
     def __init__(self) -> None:
         super().__init__()
         self._set_omop_variables_from_domain(FACES_ANXIETY_SCALE_SCORE.domain_id)
         self._value_required = False  # we don't care for any specific value
 
+    def description(self) -> str:
+        """
+        Get a string representation.
+        """
+        return self.__class__.__name__
+
+    @abstractmethod
+    def _interval(self, day: FacesAnxietyDay) -> tuple[ColumnElement, ColumnElement]:
+        """
+        Get the start and end of the selected interval of an assessment day.
+        """
+        raise NotImplementedError()
+
     def _create_query(self) -> Select:
         """
         Get the SQL Select query for data required by this criterion.
         """
+        day = FacesAnxietyDay.of(FACES_ANXIETY_DAYS.source())
+        interval_start, interval_end = self._interval(day)
 
         query = select(
-            self._table.c.person_id,
+            day.person_id,
             column_interval_type(IntervalType.POSITIVE),
-            func.date_trunc("day", self._table.c.measurement_datetime).label(
-                "interval_start"
-            ),
-            self._table.c.measurement_datetime.label("interval_end"),
-        ).where(
-            self._table.c.measurement_concept_id == FACES_ANXIETY_SCALE_SCORE.concept_id
+            interval_start.label("interval_start"),
+            interval_end.label("interval_end"),
         )
 
-        query = self._filter_base_persons(query)
+        query = self._filter_base_persons(query, c_person_id=day.person_id)
         query = self._filter_datetime(query)
 
         return query
 
 
-class OnFacesAnxietyScaleAssessmentDay(Criterion):
+def _end_of_day(day: FacesAnxietyDay) -> ColumnElement:
+    return day.day + SQL_ONE_DAY - SQL_ONE_SECOND
+
+
+class AfterDailyFacesAnxietyScaleAssessment(FacesAnxietyScaleAssessmentDayCriterion):
     """
-    Select patients on the day of assessment and documentation of the Faces Anxiety Scale score.
+    Select patients who are after the assessment and documentation of the Faces Anxiety Scale score of the day.
     """
 
-    def description(self) -> str:
-        """
-        Get a string representation.
-        """
-        return "OnFacesAnxietyScaleAssessmentDay"
+    def _interval(self, day: FacesAnxietyDay) -> tuple[ColumnElement, ColumnElement]:
+        return day.first_assessment_datetime, _end_of_day(day)
 
-    def __init__(self) -> None:
-        super().__init__()
-        self._set_omop_variables_from_domain(FACES_ANXIETY_SCALE_SCORE.domain_id)
-        self._value_required = False  # we don't care for any specific value
 
-    def _create_query(self) -> Select:
-        """
-        Get the SQL Select query for data required by this criterion.
-        """
+class BeforeDailyFacesAnxietyScaleAssessment(FacesAnxietyScaleAssessmentDayCriterion):
+    """
+    Select patients who are before the assessment and documentation of the Faces Anxiety Scale score of the day
+    (until the last assessment of the day).
+    """
 
-        query = select(
-            self._table.c.person_id,
-            column_interval_type(IntervalType.POSITIVE),
-            func.date_trunc("day", self._table.c.measurement_datetime).label(
-                "interval_start"
-            ),
-            (
-                func.date_trunc("day", self._table.c.measurement_datetime)
-                + func.cast(func.concat(1, "day"), Interval)
-                - SQL_ONE_SECOND
-            ).label("interval_end"),
-        ).where(
-            self._table.c.measurement_concept_id == FACES_ANXIETY_SCALE_SCORE.concept_id
-        )
+    def _interval(self, day: FacesAnxietyDay) -> tuple[ColumnElement, ColumnElement]:
+        return day.day, day.last_assessment_datetime
 
-        query = self._filter_base_persons(query)
-        query = self._filter_datetime(query)
 
-        return query
+class OnFacesAnxietyScaleAssessmentDay(FacesAnxietyScaleAssessmentDayCriterion):
+    """
+    Select patients on the day of assessment and documentation of the Faces Anxiety Scale score.
+    """
+
+    def _interval(self, day: FacesAnxietyDay) -> tuple[ColumnElement, ColumnElement]:
+        return day.day, _end_of_day(day)
 
 
 class Deglutition(ConceptCriterion):
@@ -15,10 +15,12 @@ from execution_engine.omop.db.omop.tables import (
 )
 from execution_engine.omop.vocabulary import OMOP_SURGICAL_PROCEDURE
 from execution_engine.util.interval import IntervalType
-from sqlalchemy import func, select
-from sqlalchemy.sql import Select
+from sqlalchemy import Column, Connection, select
+from sqlalchemy.sql import FromClause, Select
 
 from digipod.concepts import Dexmedetomidine
+from digipod.criterion.anchors import Anchor, register_anchor
+from digipod.criterion.first_event import ensure_first_event_index, query_first_event
 
 
 class AgeLimitPatient(Criterion):
@@ -29,6 +31,9 @@ class AgeLimitPatient(Criterion):
     _static = True
     _min_age_years: int
 
+    # the age is evaluated at the current date, i.e. the result changes over time without changes of the data
+    time_dependent = True
+
     def __init__(
         self,
         min_age_years: int = 18,
@@ -43,6 +48,20 @@ class AgeLimitPatient(Criterion):
         """
         return "AdultPatients"
 
+    def changed_persons(
+        self, since: datetime.datetime, until: datetime.datetime
+    ) -> Select:
+        """
+        Get the persons who reach the minimum age between two evaluation times (since, until], i.e. whose result
+        changes although their data did not.
+        """
+        age = relativedelta(years=self._min_age_years)
+
+        return select(self._table.c.person_id).where(
+            self._table.c.birth_datetime > since - age,
+            self._table.c.birth_datetime <= until - age,
+        )
+
     def _create_query(self) -> Select:
         """
         Get the SQL Select query for data required by this criterion.
@@ -88,6 +107,45 @@ class PatientsInTimeFrame(Criterion):
         return self.__class__.__name__
 
 
+def _first_surgery_columns() -> list[Column]:
+    table = ProcedureOccurrence.__table__
+
+    return [
+        Column("person_id", table.c.person_id.type, primary_key=True),
+        Column("procedure_datetime", table.c.procedure_datetime.type),
+        Column("procedure_end_datetime", table.c.procedure_end_datetime.type),
+    ]
+
+
+def _query_first_surgery() -> Select:
+    return query_first_event(
+        ProcedureOccurrence.__table__.alias("po"),
+        concept_column="procedure_concept_id",
+        concept_id=OMOP_SURGICAL_PROCEDURE,
+        datetime_column="procedure_datetime",
+        columns=["procedure_datetime", "procedure_end_datetime"],
+    )
+
+
+def _prepare_first_surgery(con: Connection) -> None:
+    ensure_first_event_index(
+        con,
+        ProcedureOccurrence.__table__,
+        concept_column="procedure_concept_id",
+        datetime_column="procedure_datetime",
+    )
+
+
+FIRST_SURGERY = register_anchor(
+    Anchor(
+        name="first_surgery",
+        columns=_first_surgery_columns,
+        query=_query_first_surgery,
+        prepare=_prepare_first_surgery,
+    )
+)
+
+
 class SurgicalPatients(PatientsInTimeFrame, ABC):
     """
     Select first surgery per patient
@@ -97,25 +155,59 @@ class SurgicalPatients(PatientsInTimeFrame, ABC):
         super().__init__()
         self._table = ProcedureOccurrence.__table__.alias("po")
 
-    def _query_first_surgery(self) -> Select:
-        subquery = (
-            select(
-                self._table.c.person_id,
-                self._table.c.procedure_occurrence_id,
-                self._table.c.procedure_datetime,
-                self._table.c.procedure_end_datetime,
-                func.row_number()
-                .over(
-                    partition_by=self._table.c.person_id,
-                    order_by=self._table.c.procedure_datetime,
-                )
-                .label("rn"),
-            )
-            .where(self._table.c.procedure_concept_id == OMOP_SURGICAL_PROCEDURE)
-            .alias("first_procedure")
-        )
+    def _query_first_surgery(self) -> FromClause:
+        """
+        Get the first surgery per person (person_id, procedure_datetime, procedure_end_datetime).
 
-        return subquery
+        Reads the per-run staging table if the anchor has been materialized, otherwise computes the first
+        surgery inline.
+        """
+        return FIRST_SURGERY.source()
+
+
+def _first_dexmedetomidine_columns() -> list[Column]:
+    table = DrugExposure.__table__
+
+    return [
+        Column("person_id", table.c.person_id.type, primary_key=True),
+        Column(
+            "drug_exposure_start_datetime",
+            table.c.drug_exposure_start_datetime.type,
+        ),
+        Column(
+            "drug_exposure_end_datetime",
+            table.c.drug_exposure_end_datetime.type,
+        ),
+    ]
+
+
+def _query_first_dexmedetomidine() -> Select:
+    return query_first_event(
+        DrugExposure.__table__.alias("d"),
+        concept_column="drug_concept_id",
+        concept_id=Dexmedetomidine.concept_id,
+        datetime_column="drug_exposure_start_datetime",
+        columns=["drug_exposure_start_datetime", "drug_exposure_end_datetime"],
+    )
+
+
+def _prepare_first_dexmedetomidine(con: Connection) -> None:
+    ensure_first_event_index(
+        con,
+        DrugExposure.__table__,
+        concept_column="drug_concept_id",
+        datetime_column="drug_exposure_start_datetime",
+    )
+
+
+FIRST_DEXMEDETOMIDINE = register_anchor(
+    Anchor(
+        name="first_dexmedetomidine",
+        columns=_first_dexmedetomidine_columns,
+        query=_query_first_dexmedetomidine,
+        prepare=_prepare_first_dexmedetomidine,
+    )
+)
 
 
 class FirstDexmedetomidineAdministration(PatientsInTimeFrame):
@@ -127,22 +219,12 @@ class FirstDexmedetomidineAdministration(PatientsInTimeFrame):
         super().__init__()
         self._table = DrugExposure.__table__.alias("d")
 
-    def _query_first_dexmedetomidine(self) -> Select:
-        subquery = (
-            select(
-                self._table.c.person_id,
-                self._table.c.drug_exposure_id,
-                self._table.c.drug_exposure_start_datetime,
-                self._table.c.drug_exposure_end_datetime,
-                func.row_number()
-                .over(
-                    partition_by=self._table.c.person_id,
-                    order_by=self._table.c.drug_exposure_start_datetime,
-                )
-                .label("rn"),
-            )
-            .where(self._table.c.drug_concept_id == Dexmedetomidine.concept_id)
-            .alias("first_dexmedetomidine")
-        )
+    def _query_first_dexmedetomidine(self) -> FromClause:
+        """
+        Get the first Dexmedetomidine administration per person
+        (person_id, drug_exposure_start_datetime, drug_exposure_end_datetime).
 
-        return subquery
+        Reads the per-run staging table if the anchor has been materialized, otherwise computes the first
+        administration inline.
+        """
+        return FIRST_DEXMEDETOMIDINE.source()
@@ -0,0 +1,288 @@
+"""
+Perioperative phase windows computed from the first surgery anchor.
+
+All perioperative criteria (pre-, intra- and postoperative patients) are windows relative to the first surgery of
+each person. Instead of each criterion scanning the surgery anchor with its own query, all phase windows are
+defined here and can be emitted for any set of phases in a single result set (person_id, phase, interval_start,
+interval_end). When the anchors are materialized for an execution run, all default phase windows are staged
+once and every perioperative criterion becomes a projection of the staging table.
+
+Open-ended windows (the phases in OPEN_ENDED_PHASES, e.g. postoperative) have interval_end = NULL, which is
+replaced by the end of the observation window when a criterion projects the window. For the other phases, a NULL
+interval_end (a surgery without procedure_end_datetime) is kept, i.e. such a surgery has no window in these phases.
+"""
+
+import datetime
+from abc import ABC
+from enum import StrEnum
+from typing import Callable, Sequence
+
+from execution_engine.omop.criterion.abstract import (
+    SQL_ONE_SECOND,
+    column_interval_type,
+    observation_end_datetime,
+)
+from execution_engine.omop.db.omop.tables import ProcedureOccurrence
+from execution_engine.util.interval import IntervalType
+from sqlalchemy import (
+    Column,
+    Interval,
+    String,
+    func,
+    literal,
+    literal_column,
+    null,
+    select,
+    union_all,
+)
+from sqlalchemy.sql import ColumnElement, FromClause, Select
+
+from digipod.criterion.anchors import Anchor, register_anchor
+from digipod.criterion.patients import FIRST_SURGERY, SurgicalPatients
+
+SQL_TWO_HOUR_ONE_SECOND = literal_column("interval '2 hour 1 second'")
+
+DEFAULT_MAX_DAYS_BEFORE_SURGERY = 42
+
+
+class PerioperativePhase(StrEnum):
+    """
+    Perioperative phases relative to the first surgery of a person.
+    """
+
+    # 42 days before the day of surgery until 2 hours before the day of surgery
+    PRE_OPERATIVE_UNTIL_TWO_HOURS_BEFORE_DAY_OF_SURGERY = (
+        "pre_operative_until_two_hours_before_day_of_surgery"
+    )
+    # 42 days before the day of surgery until the start of surgery
+    PRE_OPERATIVE_BEFORE_SURGERY = "pre_operative_before_surgery"
+    # 42 days (max_days_before_surgery) before the day of surgery until the end of surgery
+    PRE_OPERATIVE_BEFORE_END_OF_SURGERY = "pre_operative_before_end_of_surgery"
+    # start of surgery until end of surgery
+    INTRA_OPERATIVE = "intra_operative"
+    # end of surgery until the end of the day of surgery
+    POST_OPERATIVE_UNTIL_DAY_0 = "post_operative_until_day_0"
+    # end of surgery until the end of the 5th day after surgery
+    POST_OPERATIVE_UNTIL_DAY_5 = "post_operative_until_day_5"
+    # start of surgery until the end of the observation window
+    INTRA_OR_POST_OPERATIVE = "intra_or_post_operative"
+    # end of surgery until the end of the observation window
+    POST_OPERATIVE = "post_operative"
+
+
+Window = tuple[ColumnElement, ColumnElement]
+
+
+def _days(n: int) -> ColumnElement:
+    return func.cast(func.concat(n, "day"), Interval)
+
+
+def _pre_operative_start(
+    anchor: FromClause, max_days_before_surgery: int
+) -> ColumnElement:
+    return func.date_trunc("day", anchor.c.procedure_datetime) - _days(
+        max_days_before_surgery
+    )
+
+
+def _post_operative_until_day(anchor: FromClause, days: int) -> ColumnElement:
+    return (
+        func.date_trunc("day", anchor.c.procedure_end_datetime)
+        + _days(days + 1)
+        - SQL_ONE_SECOND
+    )
+
+
+_PHASE_WINDOWS: dict[PerioperativePhase, Callable[[FromClause, int], Window]] = {
+    PerioperativePhase.PRE_OPERATIVE_UNTIL_TWO_HOURS_BEFORE_DAY_OF_SURGERY: lambda a, d: (
+        _pre_operative_start(a, d),
+        func.date_trunc("day", a.c.procedure_datetime) - SQL_TWO_HOUR_ONE_SECOND,
+    ),
+    PerioperativePhase.PRE_OPERATIVE_BEFORE_SURGERY: lambda a, d: (
+        _pre_operative_start(a, d),
+        a.c.procedure_datetime,
+    ),
+    PerioperativePhase.PRE_OPERATIVE_BEFORE_END_OF_SURGERY: lambda a, d: (
+        _pre_operative_start(a, d),
+        a.c.procedure_end_datetime,
+    ),
+    PerioperativePhase.INTRA_OPERATIVE: lambda a, d: (
+        a.c.procedure_datetime,
+        a.c.procedure_end_datetime,
+    ),
+    PerioperativePhase.POST_OPERATIVE_UNTIL_DAY_0: lambda a, d: (
+        a.c.procedure_end_datetime,
+        _post_operative_until_day(a, 0),
+    ),
+    PerioperativePhase.POST_OPERATIVE_UNTIL_DAY_5: lambda a, d: (
+        a.c.procedure_end_datetime,
+        _post_operative_until_day(a, 5),
+    ),
+    PerioperativePhase.INTRA_OR_POST_OPERATIVE: lambda a, d: (
+        a.c.procedure_datetime,
+        null(),
+    ),
+    PerioperativePhase.POST_OPERATIVE: lambda a, d: (
+        a.c.procedure_end_datetime,
+        null(),
+    ),
+}
+
+
+# the phases that are open until the end of the observation window
+OPEN_ENDED_PHASES = frozenset(
+    {PerioperativePhase.INTRA_OR_POST_OPERATIVE, PerioperativePhase.POST_OPERATIVE}
+)
+
+
+# the longest window of each phase (None: open until the end of the observation window), assuming that surgeries
+# end before the end of the day after their start
+_PHASE_MAX_WINDOWS: dict[
+    PerioperativePhase, Callable[[int], datetime.timedelta | None]
+] = {
+    PerioperativePhase.PRE_OPERATIVE_UNTIL_TWO_HOURS_BEFORE_DAY_OF_SURGERY: lambda d: datetime.timedelta(
+        days=d
+    ),
+    PerioperativePhase.PRE_OPERATIVE_BEFORE_SURGERY: lambda d: datetime.timedelta(
+        days=d + 1
+    ),
+    PerioperativePhase.PRE_OPERATIVE_BEFORE_END_OF_SURGERY: lambda d: datetime.timedelta(
+        days=d + 2
+    ),
+    PerioperativePhase.INTRA_OPERATIVE: lambda d: datetime.timedelta(days=2),
+    PerioperativePhase.POST_OPERATIVE_UNTIL_DAY_0: lambda d: datetime.timedelta(days=1),
+    PerioperativePhase.POST_OPERATIVE_UNTIL_DAY_5: lambda d: datetime.timedelta(days=6),
+    PerioperativePhase.INTRA_OR_POST_OPERATIVE: lambda d: None,
+    PerioperativePhase.POST_OPERATIVE: lambda d: None,
+}
+
+
+def query_perioperative_windows(
+    phases: Sequence[PerioperativePhase],
+    anchor: FromClause | None = None,
+    max_days_before_surgery: int = DEFAULT_MAX_DAYS_BEFORE_SURGERY,
+) -> Select:
+    """
+    Get the windows of all given phases for all persons in a single result set.
+
+    The surgery anchor is read only once (as a common table expression if more than one phase is requested).
+
+    :param phases: The phases to compute.
+    :param anchor: The first surgery per person. Defaults to the first surgery anchor.
+    :param max_days_before_surgery: The number of days before the day of surgery at which the preoperative
+        phases start.
+    :return: A query returning (person_id, phase, interval_start, interval_end) - interval_end is NULL for
+        phases that are open until the end of the observation window (OPEN_ENDED_PHASES) and for surgeries without
+        an end.
+    """
+    if not phases:
+        raise ValueError("At least one phase is required")
+
+    if anchor is None:
+        anchor = FIRST_SURGERY.source()
+
+    if len(phases) > 1:
+        anchor = select(anchor).cte("first_surgery")
+
+    queries = []
+
+    for phase in phases:
+        start, end = _PHASE_WINDOWS[phase](anchor, max_days_before_surgery)
+        queries.append(
+            select(
+                anchor.c.person_id,
+                literal(phase.value, String).label("phase"),
+                start.label("interval_start"),
+                end.label("interval_end"),
+            )
+        )
+
+    if len(queries) == 1:
+        return queries[0]
+
+    return select(union_all(*queries).subquery("perioperative_window"))
+
+
+def _perioperative_window_columns() -> list[Column]:
+    table = ProcedureOccurrence.__table__
+
+    return [
+        Column("phase", String, primary_key=True),
+        Column("person_id", table.c.person_id.type, primary_key=True),
+        Column("interval_start", table.c.procedure_datetime.type),
+        Column("interval_end", table.c.procedure_end_datetime.type),
+    ]
+
+
+def _query_perioperative_windows() -> Select:
+    return query_perioperative_windows(list(PerioperativePhase))
+
+
+PERIOPERATIVE_WINDOWS = register_anchor(
+    Anchor(
+        name="perioperative_window",
+        columns=_perioperative_window_columns,
+        query=_query_perioperative_windows,
+    )
+)
+
+
+class PerioperativePhasePatients(SurgicalPatients, ABC):
+    """
+    Select patients in a perioperative phase (relative to their first surgery).
+
+    Subclasses only need to define the phase; the window is a projection of the perioperative windows.
+    """
+
+    _phase: PerioperativePhase
+    _max_days_before_surgery: int = DEFAULT_MAX_DAYS_BEFORE_SURGERY
+
+    @property
+    def max_window(self) -> datetime.timedelta | None:
+        """
+        The maximum length of a window of this criterion (None if the window is open until the end of the
+        observation window).
+        """
+        return _PHASE_MAX_WINDOWS[self._phase](self._max_days_before_surgery)
+
+    def _query_phase_window(self) -> FromClause:
+        """
+        Get the window of this criterion's phase (person_id, phase, interval_start, interval_end).
+
+        Reads the staged perioperative windows if they have been materialized (and this criterion uses the
+        default parameters), otherwise computes the window inline from the first surgery anchor.
+        """
+        if (
+            PERIOPERATIVE_WINDOWS.materialized
+            and self._max_days_before_surgery == DEFAULT_MAX_DAYS_BEFORE_SURGERY
+        ):
+            return PERIOPERATIVE_WINDOWS.source()
+
+        return query_perioperative_windows(
+            [self._phase],
+            anchor=self._query_first_surgery(),
+            max_days_before_surgery=self._max_days_before_surgery,
+        ).subquery("perioperative_window")
+
+    def _create_query(self) -> Select:
+        """
+        Get the SQL Select query for data required by this criterion.
+        """
+
+        window = self._query_phase_window()
+
+        interval_end: ColumnElement = window.c.interval_end
+        if self._phase in OPEN_ENDED_PHASES:
+            interval_end = func.coalesce(interval_end, observation_end_datetime)
+
+        query = select(
+            window.c.person_id,
+            column_interval_type(IntervalType.POSITIVE),
+            window.c.interval_start,
+            interval_end.label("interval_end"),
+        ).where(window.c.phase == self._phase.value)
+
+        query = self._filter_base_persons(query, c_person_id=window.c.person_id)
+        query = self._filter_datetime(query)
+
+        return query
@@ -1,51 +1,23 @@
-from execution_engine.omop.criterion.abstract import (
-    column_interval_type,
-)
 from execution_engine.omop.criterion.point_in_time import PointInTimeCriterion
 from execution_engine.omop.criterion.visit_occurrence import VisitOccurrence
 from execution_engine.util import logic
-from execution_engine.util.interval import IntervalType
 from execution_engine.util.value.value import ValueScalar
-from sqlalchemy import Interval, func, literal_column, select
-from sqlalchemy.sql import Select
 
 from digipod import concepts
-from digipod.criterion.patients import AdultPatients, SurgicalPatients
-
-SQL_TWO_HOUR_ONE_SECOND = literal_column("interval '2 hour 1 second'")
+from digipod.criterion.patients import AdultPatients
+from digipod.criterion.perioperative import (
+    DEFAULT_MAX_DAYS_BEFORE_SURGERY,
+    PerioperativePhase,
+    PerioperativePhasePatients,
+)
 
 
-class PreOperativePatientsUntilTwoHoursBeforeDayOfSurgery(SurgicalPatients):
+class PreOperativePatientsUntilTwoHoursBeforeDayOfSurgery(PerioperativePhasePatients):
     """
     Select patients who are pre-surgical in the timeframe between 42 days before the surgery and the day of the surgery.
     """
 
-    def _create_query(self) -> Select:
-        """
-        Get the SQL Select query for data required by this criterion.
-        """
-
-        subquery = self._query_first_surgery()
-
-        query = select(
-            subquery.c.person_id,
-            column_interval_type(IntervalType.POSITIVE),
-            (
-                func.date_trunc("day", subquery.c.procedure_datetime)
-                - func.cast(func.concat(42, "day"), Interval)
-            ).label("interval_start"),
-            (
-                func.date_trunc("day", subquery.c.procedure_datetime)
-                - SQL_TWO_HOUR_ONE_SECOND
-            ).label("interval_end"),
-        ).where(
-            subquery.c.rn == 1
-        )  # Filter only the first procedure per person
-
-        query = self._filter_base_persons(query, c_person_id=subquery.c.person_id)
-        query = self._filter_datetime(query)
-
-        return query
+    _phase = PerioperativePhase.PRE_OPERATIVE_UNTIL_TWO_HOURS_BEFORE_DAY_OF_SURGERY
 
 
 # todo: potentially we need to require VISIT_DETAIL here
@@ -88,73 +60,27 @@ MMSElt3 = PointInTimeCriterion(
 )
 
 
-class PreOperativePatientsBeforeEndOfSurgery(SurgicalPatients):
+class PreOperativePatientsBeforeEndOfSurgery(PerioperativePhasePatients):
     """
     Select patients who are pre-operative in the timeframe between 42 days before the surgery and the end of the surgery.
     """
 
-    _max_days_before_surgery: int
+    _phase = PerioperativePhase.PRE_OPERATIVE_BEFORE_END_OF_SURGERY
 
     def __init__(
         self,
-        max_days_before_surgery: int = 42,
+        max_days_before_surgery: int = DEFAULT_MAX_DAYS_BEFORE_SURGERY,
     ) -> None:
         super().__init__()
         self._max_days_before_surgery = max_days_before_surgery
 
-    def _create_query(self) -> Select:
-        """
-        Get the SQL Select query for data required by this criterion.
-        """
-
-        subquery = self._query_first_surgery()
-
-        query = select(
-            subquery.c.person_id,
-            column_interval_type(IntervalType.POSITIVE),
-            (
-                func.date_trunc("day", subquery.c.procedure_datetime)
-                - func.cast(func.concat(self._max_days_before_surgery, "day"), Interval)
-            ).label("interval_start"),
-            subquery.c.procedure_end_datetime.label("interval_end"),
-        ).where(
-            subquery.c.rn == 1
-        )  # Filter only the first procedure per person
-
-        query = self._filter_base_persons(query, c_person_id=subquery.c.person_id)
-        query = self._filter_datetime(query)
-
-        return query
-
 
-class PreOperativePatientsBeforeSurgery(SurgicalPatients):
+class PreOperativePatientsBeforeSurgery(PerioperativePhasePatients):
     """
     Select patients who are pre-operative in the timeframe between 42 days before the surgery and the end of the surgery.
     """
 
-    def _create_query(self) -> Select:
-        """
-        Get the SQL Select query for data required by this criterion.
-        """
-
-        subquery = self._query_first_surgery()
-
-        query = select(
-            subquery.c.person_id,
-            column_interval_type(IntervalType.POSITIVE),
-            (
-                func.date_trunc("day", subquery.c.procedure_datetime)
-                - func.cast(func.concat(42, "day"), Interval)
-            ).label("interval_start"),
-            subquery.c.procedure_datetime.label("interval_end"),
-        ).where(
-            subquery.c.rn == 1
-        )  # Filter only the first procedure per person
-
-        query = self._filter_base_persons(query, c_person_id=subquery.c.person_id)
-        query = self._filter_datetime(query)
-
-        return query
+    _phase = PerioperativePhase.PRE_OPERATIVE_BEFORE_SURGERY
 
 
 """
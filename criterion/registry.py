@@ -0,0 +1,166 @@
+"""
+Interning of structurally equal criterion instances.
+
+The temporal wrapper helpers (e.g. `PostOperative()` in criterion/non_pharma_measures.py) and the converters create
+a fresh interval criterion on every call. Each instance becomes a separate node in the execution graph, i.e. a
+separate task and a separate SQL query per execution, although all of them compute exactly the same intervals
+(recommendation 3.2 alone uses 36 `PatientsBeforeFirstDexAdministration` instances).
+
+`intern_criterion()` resolves structurally equal criteria to one canonical instance, so that they are executed
+only once.
+"""
+
+import json
+import logging
+from collections import Counter
+from typing import Any, Iterator, TypeVar
+
+from execution_engine.omop import cohort
+from execution_engine.omop.criterion.abstract import Criterion
+from execution_engine.util import logic
+
+T = TypeVar("T", bound=Criterion)
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+# attributes that identify the stored instance rather than its structure
+_IGNORED_ATTRIBUTES = {"_id"}
+
+
+def structural_key(criterion: Criterion) -> tuple[str, str]:
+    """
+    Get a key that is equal for structurally equal criteria.
+
+    The key consists of the qualified class name, the serialized criterion and all scalar instance attributes
+    (e.g. parameters of the criterion that are not part of its serialization).
+    """
+    cls = type(criterion)
+
+    attributes = {
+        name: value
+        for name, value in vars(criterion).items()
+        if name not in _IGNORED_ATTRIBUTES and isinstance(value, _SCALAR_TYPES)
+    }
+
+    data = json.dumps(
+        {"dict": criterion.dict(), "attributes": attributes},
+        sort_keys=True,
+        default=str,
+    )
+
+    return f"{cls.__module__}.{cls.__qualname__}", data
+
+
+class CriterionRegistry:
+    """
+    Registry of canonical criterion instances.
+    """
+
+    def __init__(self) -> None:
+        self._instances: dict[tuple[str, str], Criterion] = {}
+        self._collapsed: Counter[str] = Counter()
+
+    def intern(self, criterion: T) -> T:
+        """
+        Get the canonical instance of the given criterion.
+
+        :param criterion: The criterion.
+        :return: The first registered criterion that is structurally equal to the given one (or the given
+            criterion itself, if there is none).
+        """
+        key = structural_key(criterion)
+
+        canonical = self._instances.setdefault(key, criterion)
+
+        if canonical is not criterion:
+            self._collapsed[type(criterion).__name__] += 1
+
+        return canonical  # type: ignore[return-value]
+
+    @property
+    def collapsed(self) -> int:
+        """
+        The total number of criterion instances that have been resolved to an existing canonical instance.
+        """
+        return sum(self._collapsed.values())
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Get the interning statistics.
+        """
+        return {
+            "canonical": len(self._instances),
+            "collapsed": self.collapsed,
+            "collapsed_by_class": dict(self._collapsed.most_common()),
+        }
+
+    def log_stats(self) -> None:
+        """
+        Log the interning statistics.
+        """
+        stats = self.stats()
+
+        logging.info(
+            f"Criterion interning: {stats['canonical']} canonical criteria, "
+            f"{stats['collapsed']} duplicates collapsed"
+        )
+
+        for name, count in stats["collapsed_by_class"].items():
+            logging.debug(f"  {name}: {count} duplicates collapsed")
+
+    def clear(self) -> None:
+        """
+        Remove all canonical instances and reset the statistics.
+        """
+        self._instances.clear()
+        self._collapsed.clear()
+
+
+criterion_registry = CriterionRegistry()
+
+
+def intern_criterion(criterion: T) -> T:
+    """
+    Get the canonical instance of the given criterion from the global criterion registry.
+    """
+    return criterion_registry.intern(criterion)
+
+
+def _iterate_nodes(obj: Any) -> Iterator[Criterion | logic.BaseExpr]:
+    visited: set[int] = set()
+    stack = [obj]
+
+    while stack:
+        current = stack.pop()
+
+        if id(current) in visited:
+            continue
+        visited.add(id(current))
+
+        if isinstance(current, Criterion):
+            yield current
+        elif isinstance(current, (list, tuple)):
+            stack.extend(reversed(current))
+        elif isinstance(current, (logic.BaseExpr, cohort.Recommendation)):
+            if isinstance(current, logic.BaseExpr):
+                yield current
+            stack.extend(reversed(list(vars(current).values())))
+
+
+def iterate_criteria(obj: Any) -> Iterator[Criterion]:
+    """
+    Yield all criterion instances of a recommendation or expression (depth first, including base and interval
+    criteria).
+    """
+    for node in _iterate_nodes(obj):
+        if isinstance(node, Criterion):
+            yield node
+
+
+def iterate_expressions(obj: Any) -> Iterator[logic.BaseExpr]:
+    """
+    Yield all logical expressions of a recommendation or expression (depth first, excluding criteria).
+    """
+    for node in _iterate_nodes(obj):
+        if not isinstance(node, Criterion):
+            yield node
@@ -0,0 +1,78 @@
+"""
+Restriction of an execution run to a subset of persons.
+
+The base criterion of a recommendation defines the persons for which the recommendation is evaluated; all other
+criteria are restricted to these persons. `ScopedPatientsActiveDuringPeriod` is a drop-in replacement for the
+execution engine's `PatientsActiveDuringPeriod` that is additionally restricted to the persons of the current
+person scope (e.g. persons with changed data in incremental runs or the person_id range of a shard). Without a
+scope, it is identical to `PatientsActiveDuringPeriod`.
+"""
+
+from execution_engine.omop.criterion.visit_occurrence import PatientsActiveDuringPeriod
+from sqlalchemy import select
+from sqlalchemy.sql import ColumnElement, FromClause, Select
+
+_person_scope: FromClause | None = None
+_person_id_range: tuple[int, int] | None = None
+
+
+def set_person_scope(
+    persons: FromClause | None = None, id_range: tuple[int, int] | None = None
+) -> None:
+    """
+    Restrict all scoped criteria to the given persons. Calling without arguments removes the restriction.
+
+    :param persons: A table or subquery with a person_id column.
+    :param id_range: An inclusive range (first, last) of person_ids.
+    """
+    global _person_scope, _person_id_range
+    _person_scope = persons
+    _person_id_range = id_range
+
+
+def get_person_scope() -> FromClause | None:
+    """
+    Get the persons in scope (or None, if not restricted to a set of persons).
+    """
+    return _person_scope
+
+
+def get_person_id_range() -> tuple[int, int] | None:
+    """
+    Get the person_id range in scope (or None, if not restricted to a range).
+    """
+    return _person_id_range
+
+
+def person_scope_filter(c_person_id: ColumnElement) -> list[ColumnElement]:
+    """
+    Get the conditions that restrict the given person_id column to the current person scope.
+    """
+    conditions = []
+
+    if _person_scope is not None:
+        conditions.append(c_person_id.in_(select(_person_scope.c.person_id)))
+
+    if _person_id_range is not None:
+        conditions.append(c_person_id.between(*_person_id_range))
+
+    return conditions
+
+
+class ScopedPatientsActiveDuringPeriod(PatientsActiveDuringPeriod):
+    """
+    Select patients who are active during the observation period and in the current person scope.
+    """
+
+    def _create_query(self) -> Select:
+        """
+        Get the SQL Select query for data required by this criterion.
+        """
+        query = super()._create_query()
+
+        if _person_scope is None and _person_id_range is None:
+            return query
+
+        subquery = query.subquery("active_patients")
+
+        return select(subquery).where(*person_scope_filter(subquery.c.person_id))
@@ -1,8 +1,19 @@
+from typing import Any, Self
+
 from execution_engine.omop.concepts import Concept
+from execution_engine.omop.criterion.abstract import Criterion, column_interval_type
+from execution_engine.omop.criterion.measurement import Measurement
 from execution_engine.omop.criterion.point_in_time import PointInTimeCriterion
-from execution_engine.util.value import Value
+from execution_engine.omop.db.omop.tables import Measurement as MeasurementTable
+from execution_engine.util import logic
+from execution_engine.util.interval import IntervalType
+from execution_engine.util.value import Value, ValueConcept
+from sqlalchemy import Column, select
+from sqlalchemy.sql import FromClause, Select
 
 from digipod import concepts
+from digipod.criterion.anchors import Anchor, register_anchor
+from digipod.criterion.patients import FIRST_DEXMEDETOMIDINE
 
 NUDESC_documented = PointInTimeCriterion(
     concept=concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE,
@@ -67,3 +78,294 @@ def score_threshold(
         forward_fill=False,
         value=value,
     )
+
+
+FOUR_AT_SCORE = Concept(
+    concept_id=3662221,
+    concept_name="4AT (4 A's Test) score",
+    concept_code="1239211000000103",
+    domain_id="Measurement",
+    vocabulary_id="SNOMED",
+    concept_class_id="Observable Entity",
+    standard_concept=None,
+    invalid_reason=None,
+)
+
+# all delirium score concepts (documented scores and score classes)
+DELIRIUM_SCORE_CONCEPTS = [
+    concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE,
+    concepts.INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE,
+    concepts.CONFUSION_ASSESSMENT_METHOD_SCORE,
+    concepts.DELIRIUM_RATING_SCALE_SCORE,
+    concepts.DELIRIUM_OBSERVATION_SCALE_SCORE,
+    concepts.THREE_MINUTE_DIAGNOSTIC_INTERVIEW_FOR_CAM_DEFINED_DELIRIUM_SCORE,
+    concepts.CONFUSION_ASSESSMENT_METHOD_FOR_THE_INTENSIVE_CARE_UNIT_SCORE,
+    concepts.DELIRIUM_DETECTION_SCORE_SCORE,
+    concepts.FourAT,
+    FOUR_AT_SCORE,
+]
+
+POSITIVE = ValueConcept(
+    value={
+        "concept_id": 9191,
+        "concept_name": "Positive",
+        "concept_code": "10828004",
+        "domain_id": "Meas Value",
+        "vocabulary_id": "SNOMED",
+        "concept_class_id": "Qualifier Value",
+        "standard_concept": "S",
+        "invalid_reason": None,
+    }
+)
+
+NEGATIVE = ValueConcept(
+    value={
+        "concept_id": 9189,
+        "concept_name": "Negative",
+        "concept_code": "260385009",
+        "domain_id": "Meas Value",
+        "vocabulary_id": "SNOMED",
+        "concept_class_id": "Qualifier Value",
+        "standard_concept": "S",
+        "invalid_reason": None,
+    }
+)
+
+WEAKLY_POSITIVE = ValueConcept(
+    value={
+        "concept_id": 4127785,
+        "concept_name": "Weakly positive",
+        "concept_code": "260408008",
+        "domain_id": "Meas Value",
+        "vocabulary_id": "SNOMED",
+        "concept_class_id": "Qualifier Value",
+        "standard_concept": "S",
+        "invalid_reason": None,
+    }
+)
+
+
+# the measurement columns read by the score criteria (concept, time, value and unit of the score)
+SCORE_MEASUREMENT_COLUMNS = (
+    "measurement_id",
+    "person_id",
+    "measurement_concept_id",
+    "measurement_datetime",
+    "value_as_number",
+    "value_as_concept_id",
+    "unit_concept_id",
+)
+
+
+def _score_measurement_columns() -> list[Column]:
+    table = MeasurementTable.__table__
+    primary_key = ("measurement_concept_id", "person_id", "measurement_id")
+
+    return [
+        Column(name, table.c[name].type, primary_key=name in primary_key)
+        for name in SCORE_MEASUREMENT_COLUMNS
+    ]
+
+
+def _query_score_measurements() -> Select:
+    table = MeasurementTable.__table__.alias("m")
+
+    return select(*[table.c[name] for name in SCORE_MEASUREMENT_COLUMNS]).where(
+        table.c.measurement_concept_id.in_(
+            [concept.concept_id for concept in DELIRIUM_SCORE_CONCEPTS]
+        )
+    )
+
+
+SCORE_MEASUREMENTS = register_anchor(
+    Anchor(
+        name="delirium_score_measurement",
+        columns=_score_measurement_columns,
+        query=_query_score_measurements,
+    )
+)
+
+
+class ScoreClassification(Measurement):
+    """
+    Select measurements of a delirium score that fall into a score class (threshold or qualitative result).
+
+    Identical to Measurement, but reads the delirium score measurements that are staged once per run (one scan of
+    the measurement table for all scores) instead of scanning the measurement table for every score class.
+    """
+
+    def _create_query(self) -> Select:
+        """
+        Get the SQL Select query for data required by this criterion.
+        """
+        source = SCORE_MEASUREMENTS.source()
+
+        query = self._query_measurements(source)
+        query = self._restrict_query(query, source)
+        query = self._filter_base_persons(query, c_person_id=source.c.person_id)
+        query = self._filter_datetime(query)
+
+        return query
+
+    def _query_measurements(self, source: FromClause) -> Select:
+        """
+        Get the measurements of this criterion's score concept that fall into the score class, read from the given
+        source of measurements (the staged score measurements or an inline subquery).
+        """
+        query = select(
+            source.c.person_id,
+            column_interval_type(IntervalType.POSITIVE),
+            source.c.measurement_datetime.label("interval_start"),
+            source.c.measurement_datetime.label("interval_end"),
+        ).where(source.c.measurement_concept_id == self._concept.concept_id)
+
+        if self._value is not None:
+            query = query.where(self._value.to_sql(table=source))
+
+        return query
+
+    def _restrict_query(self, query: Select, source: FromClause) -> Select:
+        """
+        Restrict the query on the staged measurements further, e.g. in subclasses.
+        """
+        return query
+
+
+class ScoreClassificationBeforeFirstDexAdministration(ScoreClassification):
+    """
+    Select measurements of a delirium score that fall into a score class and were taken before (or at) the first
+    Dexmedetomidine administration of the patient.
+    """
+
+    def _restrict_query(self, query: Select, source: FromClause) -> Select:
+        """
+        Restrict the query to the measurements before (or at) the first Dexmedetomidine administration.
+        """
+        first_dex = FIRST_DEXMEDETOMIDINE.source()
+        first_dex_start = (
+            select(first_dex.c.drug_exposure_start_datetime)
+            .where(first_dex.c.person_id == source.c.person_id)
+            .scalar_subquery()
+        )
+
+        # no first administration (NULL) excludes all measurements of the person
+        return query.where(source.c.measurement_datetime <= first_dex_start)
+
+
+def restrict_before_first_dex_administration(arg: logic.BaseExpr) -> logic.BaseExpr:
+    """
+    Push the restriction to the time before the first Dexmedetomidine administration into the query of the given
+    criterion, if supported (currently: score classifications), such that only the measurements before the first
+    administration are fetched. Other expressions are returned unchanged.
+
+    The temporal restriction must still be applied (e.g. by a TemporalMinCount over
+    PatientsBeforeFirstDexAdministration); the pushed-down criterion only avoids fetching rows outside of it.
+    """
+    if isinstance(arg, ScoreClassificationBeforeFirstDexAdministration):
+        return arg
+
+    if isinstance(arg, ScoreClassification):
+        return ScoreClassificationBeforeFirstDexAdministration.from_dict(arg.dict())
+
+    return arg
+
+
+def score_classification(concept: Concept, value: Value) -> ScoreClassification:
+    """
+    Returns a ScoreClassification Criterion for the given score Concept and class Value
+    """
+    if concept.concept_id not in [c.concept_id for c in DELIRIUM_SCORE_CONCEPTS]:
+        raise ValueError(f"{concept} is not a staged delirium score concept")
+
+    return ScoreClassification(
+        static=False,
+        value_required=True,
+        concept=concept,
+        forward_fill=False,
+        value=value,
+        timing=None,
+    )
+
+
+# delirium scores used on normal wards and intensive care units, respectively
+NORMALWARD_SCORE_CONCEPTS = [
+    concepts.THREE_MINUTE_DIAGNOSTIC_INTERVIEW_FOR_CAM_DEFINED_DELIRIUM_SCORE,
+    concepts.FourAT,
+    concepts.CONFUSION_ASSESSMENT_METHOD_SCORE,
+    concepts.DELIRIUM_RATING_SCALE_SCORE,
+    concepts.DELIRIUM_OBSERVATION_SCALE_SCORE,
+    concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE,
+]
+
+ICU_SCORE_CONCEPTS = [
+    concepts.CONFUSION_ASSESSMENT_METHOD_FOR_THE_INTENSIVE_CARE_UNIT_SCORE,
+    concepts.DELIRIUM_DETECTION_SCORE_SCORE,
+    concepts.INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE,
+]
+
+
+class ScoreDocumented(Criterion):
+    """
+    Select patients at the times any of the given delirium scores is documented (regardless of the value).
+
+    Equivalent to an Or() of the `*_documented` criteria of the given concepts, but fetches all concepts with a
+    single query on the staged delirium score measurements (or `measurement_concept_id IN (...)` on the measurement
+    table, if not staged). Use `split()` to get one criterion per concept where the scores are needed separately.
+    """
+
+    def __init__(self, concepts: list[Concept]) -> None:
+        super().__init__()
+        if not concepts:
+            raise ValueError("At least one concept is required")
+
+        self._set_omop_variables_from_domain("Measurement")
+        self._value_required = False  # we don't care for any specific value
+        self._concepts = list(concepts)
+
+    def description(self) -> str:
+        """
+        Get a description of the criterion.
+        """
+        names = ", ".join(c.concept_name for c in self._concepts)
+        return f"ScoreDocumented[{names}]"
+
+    def dict(self) -> dict[str, Any]:
+        """
+        Get a dictionary representation of the object.
+        """
+        return {"concepts": [c.model_dump() for c in self._concepts]}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """
+        Create a criterion from a dictionary representation.
+        """
+        return cls(concepts=[Concept(**c) for c in data["concepts"]])
+
+    def split(self) -> list["ScoreDocumented"]:
+        """
+        Get one criterion per concept.
+        """
+        return [ScoreDocumented([concept]) for concept in self._concepts]
+
+    def _create_query(self) -> Select:
+        """
+        Get the SQL Select query for data required by this criterion.
+        """
+        table = SCORE_MEASUREMENTS.source()
+
+        query = select(
+            table.c.person_id,
+            column_interval_type(IntervalType.POSITIVE),
+            table.c.measurement_datetime.label("interval_start"),
+            table.c.measurement_datetime.label("interval_end"),
+        ).where(
+            table.c.measurement_concept_id.in_(
+                [concept.concept_id for concept in self._concepts]
+            )
+        )
+
+        query = self._filter_base_persons(query, c_person_id=table.c.person_id)
+        query = self._filter_datetime(query)
+
+        return query
@@ -0,0 +1,186 @@
+"""
+Shift-bucketed evaluation of delirium screenings.
+
+Recommendation 0.2 requires screenings in at least two shifts per day. Expressed with the temporal operators, the
+documented scores are evaluated and split once per shift (`Day(MorningShift(scores))`, ...). Instead, all
+screening measurements are assigned to a (person, day, shift) bucket in a single GROUP BY, which is staged once per
+run; each `DailyShiftScreening` criterion is a projection of the buckets of one shift.
+
+The shift boundaries are the same as those of the shifts in `execution_engine.util.temporal_logic_util`; days and
+hours are evaluated in the timezone configured for the execution engine (`timezone` setting), independent of the
+timezone of the database session.
+"""
+
+from enum import StrEnum
+from typing import Any, Self
+
+from execution_engine.omop.criterion.abstract import (
+    SQL_ONE_SECOND,
+    Criterion,
+    column_interval_type,
+)
+from execution_engine.omop.db.omop.tables import Measurement as MeasurementTable
+from execution_engine.settings import get_config
+from execution_engine.util.interval import IntervalType
+from sqlalchemy import Column, Integer, Interval, String, case, func, select
+from sqlalchemy.sql import ColumnElement, Select
+
+from digipod.criterion.anchors import Anchor, register_anchor
+from digipod.criterion.scores import (
+    ICU_SCORE_CONCEPTS,
+    NORMALWARD_SCORE_CONCEPTS,
+    SCORE_MEASUREMENTS,
+)
+
+# all delirium screening scores (normal ward and ICU)
+SCREENING_CONCEPTS = NORMALWARD_SCORE_CONCEPTS + ICU_SCORE_CONCEPTS
+
+
+class Shift(StrEnum):
+    """
+    Nursing shifts of a day.
+    """
+
+    # 00:00 - 05:59:59
+    NIGHT_AFTER_MIDNIGHT = "night_after_midnight"
+    # 06:00 - 13:59:59
+    MORNING = "morning"
+    # 14:00 - 21:59:59
+    AFTERNOON = "afternoon"
+    # 22:00 - 23:59:59
+    NIGHT_BEFORE_MIDNIGHT = "night_before_midnight"
+
+
+# first and last hour of each shift
+_SHIFT_HOURS = {
+    Shift.NIGHT_AFTER_MIDNIGHT: (0, 5),
+    Shift.MORNING: (6, 13),
+    Shift.AFTERNOON: (14, 21),
+    Shift.NIGHT_BEFORE_MIDNIGHT: (22, 23),
+}
+
+
+def _local_time(c_datetime: ColumnElement) -> ColumnElement:
+    # the wall clock time (timestamp without time zone) in the configured timezone
+    return func.timezone(get_config().timezone, c_datetime)
+
+
+def _start_of_day(c_datetime: ColumnElement) -> ColumnElement:
+    return func.timezone(
+        get_config().timezone, func.date_trunc("day", _local_time(c_datetime))
+    )
+
+
+def _end_of_day(c_day: ColumnElement) -> ColumnElement:
+    # add the day in local time, such that days with a daylight saving time change have 23 or 25 hours
+    next_day = _local_time(c_day) + func.cast(func.concat(1, "day"), Interval)
+
+    return func.timezone(get_config().timezone, next_day) - SQL_ONE_SECOND
+
+
+def _shift_of(c_datetime: ColumnElement) -> ColumnElement:
+    hour = func.extract("hour", _local_time(c_datetime))
+
+    return case(
+        *[
+            (hour.between(first, last), shift.value)
+            for shift, (first, last) in _SHIFT_HOURS.items()
+        ]
+    )
+
+
+def _screening_shift_columns() -> list[Column]:
+    table = MeasurementTable.__table__
+
+    return [
+        Column("shift", String, primary_key=True),
+        Column("person_id", table.c.person_id.type, primary_key=True),
+        Column("day", table.c.measurement_datetime.type, primary_key=True),
+        Column("n_screenings", Integer, nullable=False),
+    ]
+
+
+def _query_screening_shifts() -> Select:
+    table = SCORE_MEASUREMENTS.source()
+
+    screenings = (
+        select(
+            _shift_of(table.c.measurement_datetime).label("shift"),
+            table.c.person_id,
+            _start_of_day(table.c.measurement_datetime).label("day"),
+        )
+        .where(
+            table.c.measurement_concept_id.in_(
+                [concept.concept_id for concept in SCREENING_CONCEPTS]
+            )
+        )
+        .subquery("screening")
+    )
+
+    return select(
+        screenings.c.shift,
+        screenings.c.person_id,
+        screenings.c.day,
+        func.count().label("n_screenings"),
+    ).group_by(screenings.c.shift, screenings.c.person_id, screenings.c.day)
+
+
+SCREENING_SHIFTS = register_anchor(
+    Anchor(
+        name="delirium_screening_shift",
+        columns=_screening_shift_columns,
+        query=_query_screening_shifts,
+    )
+)
+
+
+class DailyShiftScreening(Criterion):
+    """
+    Select the days on which a delirium screening (any score) was documented during the given shift.
+
+    Equivalent to `Day(<Shift>(ScoreDocumented(SCREENING_CONCEPTS)))`, but a projection of the staged
+    (person, day, shift) buckets.
+    """
+
+    def __init__(self, shift: Shift) -> None:
+        super().__init__()
+        self._set_omop_variables_from_domain("Measurement")
+        self._value_required = False  # we don't care for any specific value
+        self._shift = shift
+
+    def description(self) -> str:
+        """
+        Get a description of the criterion.
+        """
+        return f"DailyShiftScreening[{self._shift}]"
+
+    def dict(self) -> dict[str, Any]:
+        """
+        Get a dictionary representation of the object.
+        """
+        return {"shift": self._shift.value}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """
+        Create a criterion from a dictionary representation.
+        """
+        return cls(shift=Shift(data["shift"]))
+
+    def _create_query(self) -> Select:
+        """
+        Get the SQL Select query for data required by this criterion.
+        """
+        buckets = SCREENING_SHIFTS.source()
+
+        query = select(
+            buckets.c.person_id,
+            column_interval_type(IntervalType.POSITIVE),
+            buckets.c.day.label("interval_start"),
+            _end_of_day(buckets.c.day).label("interval_end"),
+        ).where(buckets.c.shift == self._shift.value)
+
+        query = self._filter_base_persons(query, c_person_id=buckets.c.person_id)
+        query = self._filter_datetime(query)
+
+        return query
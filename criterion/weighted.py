@@ -0,0 +1,194 @@
+"""
+Declarative weighted combination of population/intervention pairs.
+
+The recommendation collections (2.1, 4.1, 4.3) combine the results of their population/intervention pairs into a
+weighted count, e.g. `(4 * left + right) / 5`. Instead of a hand-written operator class per recommendation (with a
+`prepare_data` that reorders the inputs and a per-segment `count_intervals`), `weighted_and` creates the operator
+class from a declarative specification:
+
+- one weight per argument (in the order of the arguments),
+- per argument, whether its count or only its positivity (1 if POSITIVE, else 0) contributes,
+- how the interval types are combined (& or |),
+- which arguments are *optional*: if an optional argument is NOT_APPLICABLE (the person is not part of the
+  population of that pair), it is dropped. If a single argument remains, its interval is passed through unchanged,
+  otherwise the weights are renormalized over the remaining arguments.
+
+The specification provides the `count_intervals` callback that the execution engine invokes per segment.
+"""
+
+import dataclasses
+from enum import StrEnum
+from functools import reduce
+from typing import Any, Iterable
+
+from execution_engine.task.process import IntervalWithCount, interval_like
+from execution_engine.task.task import Task
+from execution_engine.util import logic
+from execution_engine.util.interval import IntervalType
+from execution_engine.util.types import PersonIntervals
+
+
+class CountMode(StrEnum):
+    """
+    What an argument contributes to the weighted count.
+    """
+
+    # the count of the interval (0 if NOT_APPLICABLE, missing or without count)
+    COUNT = "count"
+    # the count of the interval, also if it is NOT_APPLICABLE (0 if missing or without count)
+    RAW_COUNT = "raw_count"
+    # 1 if the interval is POSITIVE, otherwise 0
+    POSITIVE = "positive"
+
+
+class TypeCombination(StrEnum):
+    """
+    How the interval types of the arguments are combined.
+    """
+
+    AND = "and"
+    OR = "or"
+
+
+@dataclasses.dataclass(frozen=True)
+class WeightedCombination:
+    """
+    Specification of a weighted combination of the results of several arguments.
+    """
+
+    weights: tuple[float, ...]
+    counts: tuple[CountMode, ...]
+    types: TypeCombination = TypeCombination.AND
+    optional: frozenset[int] = frozenset()
+
+    def __post_init__(self) -> None:
+        """
+        Validate the specification.
+
+        :raises ValueError: If the weights, count modes or optional arguments do not match.
+        """
+        if not self.weights:
+            raise ValueError("At least one weight is required")
+        if len(self.counts) != len(self.weights):
+            raise ValueError("Expected one count mode per weight")
+        if any(weight <= 0 for weight in self.weights):
+            raise ValueError("Weights must be positive")
+        if not self.optional <= set(range(len(self.weights))):
+            raise ValueError("Optional arguments out of range")
+
+    def _count(self, k: int, interval: Any) -> float:
+        if interval is None:
+            return 0.0
+        if self.counts[k] is CountMode.POSITIVE:
+            return 1.0 if interval.type is IntervalType.POSITIVE else 0.0
+        if not isinstance(interval, IntervalWithCount):
+            return 0.0
+        if (
+            self.counts[k] is CountMode.COUNT
+            and interval.type is IntervalType.NOT_APPLICABLE
+        ):
+            return 0.0
+        return float(interval.count)
+
+    def count_intervals(
+        self, start: int, end: int, intervals: list[Any]
+    ) -> IntervalWithCount:
+        """
+        Combine the intervals of one segment (callback of `process.find_rectangles`).
+        """
+        types = [
+            interval.type if interval is not None else IntervalType.NEGATIVE
+            for interval in intervals
+        ]
+        active = [
+            k
+            for k in range(len(intervals))
+            if not (k in self.optional and types[k] is IntervalType.NOT_APPLICABLE)
+        ]
+
+        if not active:
+            return IntervalWithCount(start, end, IntervalType.NOT_APPLICABLE, 0.0)
+
+        if len(active) == 1 and len(active) < len(intervals):
+            # the other arguments are not applicable, use the result of the remaining one as it is
+            (k,) = active
+
+            if intervals[k] is None:
+                return IntervalWithCount(start, end, IntervalType.NEGATIVE, 0.0)
+
+            return interval_like(intervals[k], start, end)
+
+        if self.types is TypeCombination.AND:
+            result_type = reduce(lambda x, y: x & y, (types[k] for k in active))
+        else:
+            result_type = reduce(lambda x, y: x | y, (types[k] for k in active))
+
+        total = sum(self.weights[k] for k in active)
+        count = sum(self.weights[k] * self._count(k, intervals[k]) for k in active)
+
+        return IntervalWithCount(start, end, result_type, count / total)
+
+
+def prepare_data_in_argument_order(
+    task: Task, data: list[PersonIntervals]
+) -> list[PersonIntervals]:
+    """
+    Sort the incoming data of a task in the order of the arguments of its expression.
+
+    This function is used in task.Task such that `count_intervals` can rely on the order of the arguments.
+    """
+    args = task.expr.args
+
+    if len(data) != len(args):
+        raise ValueError(f"Expected exactly {len(args)} inputs")
+
+    return [data[task.get_predecessor_data_index(arg)] for arg in args]
+
+
+def weighted_and(
+    name: str,
+    module: str,
+    weights: Iterable[float],
+    counts: Iterable[CountMode] | CountMode = CountMode.COUNT,
+    types: TypeCombination = TypeCombination.AND,
+    optional: Iterable[int] = (),
+    doc: str | None = None,
+) -> type[logic.And]:
+    """
+    Create an And operator class that combines the results of its arguments into a weighted count.
+
+    The class must be assigned to a module level variable of the same name in the given module, such that it can be
+    imported by its qualified name (like a hand-written operator class).
+
+    :param name: The name of the class.
+    :param module: The name of the module that defines the class (`__name__` of the calling module).
+    :param weights: The weight of each argument (in the order of the arguments).
+    :param counts: What each argument contributes to the count (one mode for all or one per argument).
+    :param types: How the interval types of the arguments are combined.
+    :param optional: The indices of the arguments that are dropped (and the weights renormalized) if they are
+        NOT_APPLICABLE.
+    :param doc: The docstring of the class.
+    :return: The operator class.
+    """
+    weights = tuple(float(weight) for weight in weights)
+
+    if isinstance(counts, CountMode):
+        counts = (counts,) * len(weights)
+
+    spec = WeightedCombination(
+        weights=weights,
+        counts=tuple(counts),
+        types=types,
+        optional=frozenset(optional),
+    )
+
+    namespace = {
+        "__module__": module,
+        "__qualname__": name,
+        "__doc__": doc or f"Weighted combination of the arguments ({spec}).",
+        "combination": spec,
+        "prepare_data": staticmethod(prepare_data_in_argument_order),
+        "count_intervals": staticmethod(spec.count_intervals),
+    }
+
+    return type(name, (logic.And,), namespace)
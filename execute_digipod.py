@@ -1,12 +1,13 @@
-import inspect
+import argparse
+import contextlib
+import datetime
 import logging
 import os
+import pathlib
 import re
 import sys
 import time
 from collections import OrderedDict
-from types import ModuleType
-from typing import Generator, Type
 
 import pendulum
 from sqlalchemy import text
@@ -25,8 +26,8 @@ from digipod.terminology.vocabulary import DigiPOD
 
 standard_vocabulary.register(DigiPOD)
 
-from execution_engine.builder import default_execution_engine_builder
 from execution_engine.clients import omopdb
+from execution_engine.execution_engine import ExecutionEngine
 from execution_engine.omop import cohort
 from execution_engine.settings import get_config, update_config
 
@@ -37,6 +38,18 @@ import digipod.recommendation.recommendation_3_2
 import digipod.recommendation.recommendation_4_1
 import digipod.recommendation.recommendation_4_2
 import digipod.recommendation.recommendation_4_3
+from digipod.criterion.anchors import materialize_anchors
+from digipod.criterion.registry import criterion_registry
+from digipod.runner.cache import DEFAULT_MAX_ENTRIES, ResultCache, execute_cached
+from digipod.runner.engine import build_engine
+from digipod.runner.incremental import execute_incremental
+from digipod.runner.sharding import execute_sharded
+from digipod.runner.sink import copy_result_writer, deferred_indexes
+from digipod.runner.slicing import (
+    DEFAULT_LOOKBACK,
+    execute_sliced,
+    window_spanning_counts,
+)
 
 # enable multiprocessing with all available cores
 # update_config(multiprocessing_use=False, multiprocessing_pool_size=-1)
@@ -45,39 +58,42 @@ import digipod.recommendation.recommendation_4_3
 update_config(multiprocessing_use=False)
 
 
-result_schema = get_config().omop.db_result_schema
-
-# Validate the schema name to ensure it's safe to use in the query
-if not re.match(r"^[a-zA-Z_][a-zA-Z0-9_]*$", result_schema):
-    raise ValueError(f"Invalid schema name: {result_schema}")
-
-# Optional: Truncate all tables before execution
-with omopdb.begin() as con:
-    schema_exists = (
-        con.execute(
-            text(
-                "SELECT count(*) FROM information_schema.schemata WHERE schema_name = :schema_name;"
-            ),
-            {"schema_name": result_schema},
-        ).fetchone()[0]
-        > 0
-    )
+def truncate_result_tables() -> None:
+    """
+    Truncate all tables of the result schema.
+    """
+    result_schema = get_config().omop.db_result_schema
+
+    # Validate the schema name to ensure it's safe to use in the query
+    if not re.match(r"^[a-zA-Z_][a-zA-Z0-9_]*$", result_schema):
+        raise ValueError(f"Invalid schema name: {result_schema}")
+
+    with omopdb.begin() as con:
+        schema_exists = (
+            con.execute(
+                text(
+                    "SELECT count(*) FROM information_schema.schemata WHERE schema_name = :schema_name;"
+                ),
+                {"schema_name": result_schema},
+            ).fetchone()[0]
+            > 0
+        )
 
-    # If the schema exists, proceed to truncate tables
-    if schema_exists:
-        con.execute(
-            text(
-                "TRUNCATE TABLE "
-                f"   {result_schema}.comment, "
-                f"   {result_schema}.recommendation, "
-                f"   {result_schema}.criterion, "
-                f"   {result_schema}.execution_run, "
-                f"   {result_schema}.result_interval, "
-                f"   {result_schema}.recommendation, "
-                f"   {result_schema}.population_intervention_pair "
-                "RESTART IDENTITY",
+        # If the schema exists, proceed to truncate tables
+        if schema_exists:
+            con.execute(
+                text(
+                    "TRUNCATE TABLE "
+                    f"   {result_schema}.comment, "
+                    f"   {result_schema}.recommendation, "
+                    f"   {result_schema}.criterion, "
+                    f"   {result_schema}.execution_run, "
+                    f"   {result_schema}.result_interval, "
+                    f"   {result_schema}.recommendation, "
+                    f"   {result_schema}.population_intervention_pair "
+                    "RESTART IDENTITY",
+                )
             )
-        )
 
 
 recommendation_package_version = "latest"
@@ -85,53 +101,6 @@ recommendation_package_version = "latest"
 start_datetime = pendulum.parse("2024-01-01 00:00:00+01:00")
 end_datetime = pendulum.parse("2025-05-31 23:59:59+01:00")
 
-
-def iterate_module_classes(module: ModuleType) -> Generator[Type, None, None]:
-    """
-    Yields all classes listed in the `__all__` attribute of a module.
-
-    :param module: The module from which to import classes.
-    :return: A generator yielding classes defined in the module's `__all__` list.
-    """
-
-    if hasattr(module, "__all__"):
-        for class_name in module.__all__:
-            cls = getattr(module, class_name, None)
-            if inspect.isclass(cls):
-                yield cls
-
-
-builder = default_execution_engine_builder()
-
-import digipod.converter.action
-import digipod.converter.characteristic
-import digipod.converter.relative_time
-import digipod.converter.time_from_event
-import digipod.criterion
-
-logging.getLogger().setLevel(logging.DEBUG)
-
-
-for cls in iterate_module_classes(digipod.converter.characteristic):
-    logging.info(f'Importing characteristic converter "{cls.__name__}"')
-    builder.prepend_characteristic_converter(cls)
-
-for cls in iterate_module_classes(digipod.converter.action):
-    logging.info(f'Importing action converter "{cls.__name__}"')
-    builder.prepend_action_converter(cls)
-
-for cls in iterate_module_classes(digipod.converter.time_from_event):
-    logging.info(f'Importing timeFromEvent converter "{cls.__name__}"')
-    builder.append_time_from_event_converter(cls)
-
-for cls in iterate_module_classes(digipod.converter.relative_time):
-    logging.info(f'Importing relativeTime converter "{cls.__name__}"')
-    builder.append_relative_time_converter(cls)
-
-
-# Build the ExecutionEngine
-engine = builder.build()
-
 recommendations: list[cohort.Recommendation] = [
     # digipod.recommendation.recommendation_0_2.rec_0_2_Delirium_Screening_single,
     # digipod.recommendation.recommendation_0_2.rec_0_2_Delirium_Screening_double,
@@ -174,11 +143,6 @@ urls: dict[str, str] = OrderedDict()
 # urls["6.2"] = "PlanDefinition/RecCollBenzoTreatmentofDeliriumInAdultSurgicalPatPostoperatively"
 # urls["6.3"] = "PlanDefinition/RecCollAdministerDexmedetomidineToPostOPCardiacSurgeryPatForPOD"
 
-import pathlib
-
-path = pathlib.Path("recommendation/gen")
-assert path.exists()
-
 header = """from digipod.criterion import PatientsBeforeFirstDexAdministration
 from digipod.criterion.intraop_patients import IntraOperativePatients
 from digipod.criterion.patients import AgeLimitPatient
@@ -203,31 +167,198 @@ from execution_engine.util.value.time import ValueCount
 
 """
 
-for rec_no, recommendation_url in urls.items():
-    print(rec_no, recommendation_url)
-    recommendation = engine.load_recommendation(
-        base_url + recommendation_url,
-        recommendation_package_version=recommendation_package_version,
-    )
 
-    with open(path / f"rec_{rec_no.replace('.', '_')}.py", "w") as f:
-        f.write(header)
-        f.write("recommendation = " + repr(recommendation))
+def generate_recommendation_code(engine: ExecutionEngine) -> None:
+    """
+    Load the recommendations listed in `urls` and write their Python representation to recommendation/gen.
+    """
+    path = pathlib.Path("recommendation/gen")
+    assert path.exists()
+
+    for rec_no, recommendation_url in urls.items():
+        print(rec_no, recommendation_url)
+        recommendation = engine.load_recommendation(
+            base_url + recommendation_url,
+            recommendation_package_version=recommendation_package_version,
+        )
+
+        with open(path / f"rec_{rec_no.replace('.', '_')}.py", "w") as f:
+            f.write(header)
+            f.write("recommendation = " + repr(recommendation))
 
-    # engine.execute(
-    #     recommendation, start_datetime=start_datetime, end_datetime=end_datetime
-    # )
+        # engine.execute(
+        #     recommendation, start_datetime=start_datetime, end_datetime=end_datetime
+        # )
 
-start_time = time.time()
 
-for recommendation in recommendations:
-    print(recommendation.name)
-    engine.register_recommendation(recommendation)
-    engine.execute(
-        recommendation, start_datetime=start_datetime, end_datetime=end_datetime
+def main() -> None:
+    """
+    Execute the DigiPOD recommendations.
+    """
+    parser = argparse.ArgumentParser(description="Execute the DigiPOD recommendations.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--cache",
+        help="Path of the result cache file. If given, the result schema is not truncated and recommendations "
+        "whose definition, observation window and source data are unchanged since a cached run are not "
+        "executed again.",
+        default=None,
+    )
+    parser.add_argument(
+        "--cache-max-entries",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Maximum number of cached runs (least recently used runs are evicted)",
     )
+    mode.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Do not truncate the result schema and only recompute persons with new or modified rows in the source "
+        "tables since the previous run of each recommendation.",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Split the persons into this many person_id ranges and execute them in parallel worker processes",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes for sharded execution (default: min(shards, number of CPUs))",
+    )
+    parser.add_argument(
+        "--slice-months",
+        type=int,
+        default=0,
+        help="Execute the observation window in consecutive slices of this many months (default: not sliced)",
+    )
+    parser.add_argument(
+        "--slice-lookback-days",
+        type=int,
+        default=DEFAULT_LOOKBACK.days,
+        help="Number of days before each slice that are executed with the slice and discarded",
+    )
+    parser.add_argument(
+        "--no-copy",
+        action="store_true",
+        help="Write the result intervals with INSERT statements instead of COPY",
+    )
+    args = parser.parse_args()
 
-end_time = time.time()
-runtime_seconds = end_time - start_time
+    if args.shards > 1 and (args.cache is not None or args.incremental):
+        parser.error("--shards cannot be combined with --cache or --incremental")
+
+    if args.slice_months > 0 and (
+        args.cache is not None or args.incremental or args.shards > 1
+    ):
+        parser.error(
+            "--slice-months cannot be combined with --cache, --incremental or --shards"
+        )
+
+    if args.slice_months > 0:
+        lookback = datetime.timedelta(days=args.slice_lookback_days)
+        unsliceable = [
+            r.name for r in recommendations if window_spanning_counts(r, lookback)
+        ]
+
+        if unsliceable:
+            parser.error(
+                f"--slice-months: {', '.join(unsliceable)} count events within windows longer than the lookback "
+                "period and cannot be executed in time slices"
+            )
 
-logging.info(f"Total runtime: {runtime_seconds:.2f} seconds")
+    logging.getLogger().setLevel(logging.DEBUG)
+
+    engine = build_engine()
+
+    generate_recommendation_code(engine)
+
+    cache: ResultCache | None = None
+    truncated = False
+
+    if args.cache is not None:
+        cache = ResultCache(args.cache, max_entries=args.cache_max_entries)
+    elif not args.incremental:
+        # Optional: Truncate all tables before execution
+        truncate_result_tables()
+        truncated = True
+
+    anchors_materialized = False
+
+    def ensure_anchors() -> None:
+        # compute shared anchors (e.g. first surgery per person) once for all criteria of this run
+        nonlocal anchors_materialized
+
+        if not anchors_materialized:
+            with omopdb.begin() as con:
+                materialize_anchors(con)
+            anchors_materialized = True
+
+    start_time = time.time()
+
+    with contextlib.ExitStack() as stack:
+        if not args.no_copy:
+            stack.enter_context(copy_result_writer())
+
+        if truncated and args.shards == 1 and args.slice_months == 0:
+            # the result tables are empty, build their indexes once after all results are written
+            stack.enter_context(deferred_indexes())
+
+        if cache is None:
+            ensure_anchors()
+
+        for recommendation in recommendations:
+            print(recommendation.name)
+            engine.register_recommendation(recommendation)
+
+            if cache is not None:
+                # the anchors are only needed if a recommendation is not cached
+                execute_cached(
+                    engine,
+                    cache,
+                    recommendation,
+                    start_datetime,
+                    end_datetime,
+                    prepare=ensure_anchors,
+                )
+            elif args.incremental:
+                execute_incremental(
+                    engine, recommendation, start_datetime, end_datetime
+                )
+            elif args.shards > 1:
+                execute_sharded(
+                    engine,
+                    recommendation,
+                    start_datetime,
+                    end_datetime,
+                    n_shards=args.shards,
+                    n_workers=args.workers,
+                )
+            elif args.slice_months > 0:
+                execute_sliced(
+                    engine,
+                    recommendation,
+                    start_datetime,
+                    end_datetime,
+                    months=args.slice_months,
+                    lookback=datetime.timedelta(days=args.slice_lookback_days),
+                )
+            else:
+                engine.execute(
+                    recommendation,
+                    start_datetime=start_datetime,
+                    end_datetime=end_datetime,
+                )
+
+    end_time = time.time()
+    runtime_seconds = end_time - start_time
+
+    logging.info(f"Total runtime: {runtime_seconds:.2f} seconds")
+
+    criterion_registry.log_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,14 @@
 from execution_engine.omop.cohort import PopulationInterventionPairExpr, Recommendation
-from execution_engine.omop.criterion.visit_occurrence import PatientsActiveDuringPeriod
 from execution_engine.util import logic, temporal_logic_util
 
 from digipod.criterion.preop_patients import (
     adultPatientsPreoperativelyOnSurgeryDayAndBefore,
 )
+from digipod.criterion.scope import ScopedPatientsActiveDuringPeriod
 from digipod.recommendation import package_version
-from digipod.recommendation.recommendation_0_2 import icu_scores, normalward_scores
+from digipod.recommendation.recommendation_0_2 import scores
 
-base_criterion = PatientsActiveDuringPeriod()
+base_criterion = ScopedPatientsActiveDuringPeriod()
 
 _RecPlanPreoperativeDeliriumScreening = PopulationInterventionPairExpr(
     name="",
@@ -17,9 +17,7 @@ _RecPlanPreoperativeDeliriumScreening = PopulationInterventionPairExpr(
     population_expr=adultPatientsPreoperativelyOnSurgeryDayAndBefore,
     intervention_expr=
         logic.MinCount(
-            temporal_logic_util.AnyTime(logic.Or(
-                normalward_scores, icu_scores
-            )),
+            temporal_logic_util.AnyTime(scores),
             threshold=1,
         )
 )
@@ -1,43 +1,27 @@
 from execution_engine.omop.cohort import PopulationInterventionPairExpr, Recommendation
-from execution_engine.omop.criterion.visit_occurrence import PatientsActiveDuringPeriod
 from execution_engine.util import logic
-from execution_engine.util.temporal_logic_util import (
-    AfternoonShift,
-    Day,
-    MorningShift,
-    NightShiftAfterMidnight,
-    NightShiftBeforeMidnight,
-)
 
 from digipod.criterion.patients import AdultPatients
 from digipod.criterion.postop_patients import PostOperativePatientsUntilDay5
+from digipod.criterion.scope import ScopedPatientsActiveDuringPeriod
 from digipod.criterion.scores import *
+from digipod.criterion.shifts import DailyShiftScreening, Shift
 from digipod.recommendation import package_version
 
 #############
 # criteria
 #############
-base_criterion = PatientsActiveDuringPeriod()
+base_criterion = ScopedPatientsActiveDuringPeriod()
 
 #############
 # PI Pairs
 #############
 
 
-normalward_scores = logic.Or(
-    TDCAM_documented,
-    AT4_documented,
-    CAM_documented,
-    DRS_documented,
-    DOS_documented,
-    NUDESC_documented,
-)
+# one query each for all normal ward and all ICU scores (instead of one per score concept)
+normalward_scores = ScoreDocumented(NORMALWARD_SCORE_CONCEPTS)
 
-icu_scores = logic.Or(
-    CAMICU_documented,
-    DDS_documented,
-    ICDSC_documented,
-)
+icu_scores = ScoreDocumented(ICU_SCORE_CONCEPTS)
 
 # gl 25-05-05: removed after email from Fatima (25-04-29):
 # "Recommendation 0.1 und 0.2: Ortsgebundenes Delirscreening bitte raus.
@@ -54,7 +38,7 @@ icu_scores = logic.Or(
 #
 #scores = logic.Or(normalward_scores_filtered, icu_scores_filtered)
 
-scores = logic.Or(normalward_scores, icu_scores)
+scores = ScoreDocumented(NORMALWARD_SCORE_CONCEPTS + ICU_SCORE_CONCEPTS)
 
 
 pi_double_screening = PopulationInterventionPairExpr(
@@ -65,11 +49,12 @@ pi_double_screening = PopulationInterventionPairExpr(
         AdultPatients(),
         PostOperativePatientsUntilDay5(),
     ),
+    # screenings bucketed by (person, day, shift) in one query, instead of Day(<Shift>(scores)) per shift
     intervention_expr=logic.CappedMinCount(
-        Day(NightShiftAfterMidnight(scores)),
-        Day(MorningShift(scores)),
-        Day(AfternoonShift(scores)),
-        Day(NightShiftBeforeMidnight(scores)),
+        DailyShiftScreening(Shift.NIGHT_AFTER_MIDNIGHT),
+        DailyShiftScreening(Shift.MORNING),
+        DailyShiftScreening(Shift.AFTERNOON),
+        DailyShiftScreening(Shift.NIGHT_BEFORE_MIDNIGHT),
         threshold=2,
     ),
 )
@@ -1,8 +1,8 @@
 from digipod.criterion.patients import AgeLimitPatient
 from digipod.criterion.preop_patients import PreOperativePatientsBeforeEndOfSurgery
+from digipod.criterion.scope import ScopedPatientsActiveDuringPeriod
 from execution_engine.omop.cohort import Recommendation, PopulationInterventionPairExpr
 from execution_engine.omop.criterion.noop import NoopCriterion
-from execution_engine.omop.criterion.visit_occurrence import PatientsActiveDuringPeriod
 from execution_engine.util.logic import *
 
 
@@ -28,11 +28,11 @@ recommendation = Recommendation(
         ),
       name='RecPlanNoSpecProphylacticDrugForPODAndShowRecommendation',
       url='https://fhir.charite.de/digipod/PlanDefinition/RecPlanNoSpecProphylacticDrugForPODAndShowRecommendation',
-      base_criterion=PatientsActiveDuringPeriod()
+      base_criterion=ScopedPatientsActiveDuringPeriod()
     ),
   threshold=1
 ),
-  base_criterion=PatientsActiveDuringPeriod(),
+  base_criterion=ScopedPatientsActiveDuringPeriod(),
   name='RecCollAdultSurgicalPatNoSpecProphylacticDrugForPOD',
   title="Recommendation Collection: Do not suggest the use of any drug as a prophylactic measure to reduce the incidence of POD in 'General Adult Surgical Patients Pre- and Intraoperatively'",
   url='https://fhir.charite.de/digipod/PlanDefinition/RecCollAdultSurgicalPatNoSpecProphylacticDrugForPOD',
@@ -1,7 +1,6 @@
 from execution_engine.omop.cohort import PopulationInterventionPairExpr, Recommendation
 from execution_engine.omop.criterion.abstract import Criterion, column_interval_type
 from execution_engine.omop.criterion.procedure_occurrence import ProcedureOccurrence
-from execution_engine.omop.criterion.visit_occurrence import PatientsActiveDuringPeriod
 from execution_engine.util.interval import IntervalType
 from execution_engine.util.logic import *
 from execution_engine.util.logic import NonSimplifiableAnd
@@ -51,6 +50,7 @@ from digipod.criterion.non_pharma_measures import (
     tdcamPositive,
 )
 from digipod.criterion.patients import AdultPatients
+from digipod.criterion.scope import ScopedPatientsActiveDuringPeriod
 from digipod.terminology.vocabulary import (
     ADMINISTRATION_OF_PROPHYLACTIC_DEXMEDETOMIDINE,
 )
@@ -165,7 +165,7 @@ recommendation = Recommendation(
             ),
             name="RecPlanSelectProphylacticDexAdministrationInPatsWithoutDementia",
             url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanSelectProphylacticDexAdministrationInPatsWithoutDementia",
-            base_criterion=PatientsActiveDuringPeriod(),
+            base_criterion=ScopedPatientsActiveDuringPeriod(),
         ),
         PopulationInterventionPairExpr(
             population_expr=NonSimplifiableAnd(AdultPatients(), anyDementiaBeforeSurgery),
@@ -174,10 +174,10 @@ recommendation = Recommendation(
             ),
             name="RecPlanSelectProphylacticDexAdministrationInPatsWithDementia",
             url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanSelectProphylacticDexAdministrationInPatsWithDementia",
-            base_criterion=PatientsActiveDuringPeriod(),
+            base_criterion=ScopedPatientsActiveDuringPeriod(),
         ),
     ),
-    base_criterion=PatientsActiveDuringPeriod(),
+    base_criterion=ScopedPatientsActiveDuringPeriod(),
     name="RecCollProphylacticDexAdministrationAfterBalancingBenefitsVSSE",
     title="Recommendation Collection: Select 'prophylactic' if you administer dexmedetomidine intra- or postoperatively with the aim to prevent postoperative delirium after having balanced benefits and side effects in 'General Adult Surgical Patients With Dementia Preoperatively' or 'General Adult Surgical Patients Without Dementia Preoperatively nor Delirium Before Dexmedetomidine Administration'",
     url="https://fhir.charite.de/digipod/PlanDefinition/RecCollProphylacticDexAdministrationAfterBalancingBenefitsVSSE",
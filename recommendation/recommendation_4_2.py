@@ -1,5 +1,4 @@
 from execution_engine.omop.cohort import PopulationInterventionPairExpr, Recommendation
-from execution_engine.omop.criterion.visit_occurrence import PatientsActiveDuringPeriod
 from execution_engine.util.logic import *
 from execution_engine.util.temporal_logic_util import AnyTime
 
@@ -8,6 +7,7 @@ from digipod.criterion.non_pharma_measures import (
     PreOperativeUntilTwoHoursBeforeDayOfSurgery,
 )
 from digipod.criterion.patients import AgeLimitPatient
+from digipod.criterion.scope import ScopedPatientsActiveDuringPeriod
 
 recommendation = Recommendation(
     expr=
@@ -23,9 +23,9 @@ recommendation = Recommendation(
             ),
             name="RecPlanExchangeHealthcareInformation",
             url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanExchangeHealthcareInformation",
-            base_criterion=PatientsActiveDuringPeriod(),
+            base_criterion=ScopedPatientsActiveDuringPeriod(),
         ),
-    base_criterion=PatientsActiveDuringPeriod(),
+    base_criterion=ScopedPatientsActiveDuringPeriod(),
     name="RecCollShareRFOfOlderAdultsPreOPAndRegisterPreventiveStrategies",
     title="Recommendation Collection: Share the results of the screening for POD risk factors among the care team and discuss and register the preventive strategies in the medical records in 'Older Adult Surgical Patients After Preoperative Screening of Risk Factors for POD'",
     url="https://fhir.charite.de/digipod/PlanDefinition/RecCollShareRFOfOlderAdultsPreOPAndRegisterPreventiveStrategies",
@@ -1,15 +1,12 @@
-from functools import reduce
-
 from execution_engine.omop.cohort import PopulationInterventionPairExpr, Recommendation
-from execution_engine.omop.criterion.visit_occurrence import PatientsActiveDuringPeriod
 from execution_engine.task.process import IntervalWithCount
-from execution_engine.task.task import Task
 from execution_engine.util.interval import IntervalType
 from execution_engine.util.temporal_logic_util import AnyTime, Day
-from execution_engine.util.types import PersonIntervals
 
 from digipod.criterion import PostOperativePatientsUntilDay5
 from digipod.criterion.non_pharma_measures import *
+from digipod.criterion.scope import ScopedPatientsActiveDuringPeriod
+from digipod.criterion.weighted import CountMode, TypeCombination, weighted_and
 
 #######################################################################################################################
 PostOperativePatientsWithHighRiskForDeliriumBeforeDayOfSurgery = And(AnyTime(anyHighRiskForDelirium), PostOperativePatientsUntilDay5())
@@ -71,7 +68,7 @@ bundle_anxiety = MinCount( # 100% wenn erfüllt, 0 % wenn nicht
         intervention_expr=Day(facesAnxietyScoreAssessed),
         name="RecPlanAssessFASPostoperatively",
         url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanAssessFASPostoperatively",
-        base_criterion=PatientsActiveDuringPeriod(),
+        base_criterion=ScopedPatientsActiveDuringPeriod(),
     ),
     # Apr-14, 2025 (email Laerson Hoff): Angst: Es muss nur noch der FAS dokumentiert werden. Eine Bewertung der
     # Angstbewältigung ist nicht mehr erforderlich. Mit anderen Worten: Dieser Teil der Empfehlung gilt als
@@ -96,7 +93,7 @@ bundle_anxiety = MinCount( # 100% wenn erfüllt, 0 % wenn nicht
     #     ),
     #     name="RecPlanNonPharmaAnxietyMeasuresInPatWithDementiaOrDeliriumPostOP",
     #     url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanNonPharmaAnxietyMeasuresInPatWithDementiaOrDeliriumPostOP",
-    #     base_criterion=PatientsActiveDuringPeriod(),
+    #     base_criterion=ScopedPatientsActiveDuringPeriod(),
     # ),
     # PopulationInterventionPairExpr(
     #     population_expr=And(
@@ -161,7 +158,7 @@ bundle_anxiety = MinCount( # 100% wenn erfüllt, 0 % wenn nicht
     #     ),
     #     name="RecPlanNonPharmaMeasuresForAnxietyInPatWithPositiveFASPostOP",
     #     url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanNonPharmaMeasuresForAnxietyInPatWithPositiveFASPostOP",
-    #     base_criterion=PatientsActiveDuringPeriod(),
+    #     base_criterion=ScopedPatientsActiveDuringPeriod(),
     # ),
     threshold=1,
 )
@@ -186,7 +183,7 @@ bundle_cognition = MinCount( # 100% wenn mind. 1 erfüllt, sonst 0
         ),
         name="RecPlanCognitiveStimulationPostOP",
         url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanCognitiveStimulationPostOP",
-        base_criterion=PatientsActiveDuringPeriod(),
+        base_criterion=ScopedPatientsActiveDuringPeriod(),
     ),
     # todo: should start at the actual day where this is provided
     PopulationInterventionPairExpr(
@@ -206,7 +203,7 @@ bundle_cognition = MinCount( # 100% wenn mind. 1 erfüllt, sonst 0
         ),
         name="RecPlanProvisionOfCommunicationAidsPostOP",
         url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanProvisionOfCommunicationAidsPostOP",
-        base_criterion=PatientsActiveDuringPeriod(),
+        base_criterion=ScopedPatientsActiveDuringPeriod(),
     ),
     PopulationInterventionPairExpr(
         population_expr=PostOperativePatientsWithHighRiskForDeliriumBeforeDayOfSurgery,
@@ -228,7 +225,7 @@ bundle_cognition = MinCount( # 100% wenn mind. 1 erfüllt, sonst 0
         ),
         name="RecPlanNonPharmaInterventionsSupportingCircardianRhythmPostOP",
         url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanNonPharmaInterventionsSupportingCircardianRhythmPostOP",
-        base_criterion=PatientsActiveDuringPeriod(),
+        base_criterion=ScopedPatientsActiveDuringPeriod(),
     ),
     # todo: should start at the actual day where this is provided
     PopulationInterventionPairExpr(
@@ -248,7 +245,7 @@ bundle_cognition = MinCount( # 100% wenn mind. 1 erfüllt, sonst 0
         ),
         name="RecPlanDocumentProvisionOrientationAidPostOP",
         url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanDocumentProvisionOrientationAidPostOP",
-        base_criterion=PatientsActiveDuringPeriod(),
+        base_criterion=ScopedPatientsActiveDuringPeriod(),
     ),
     threshold=1
 )
@@ -262,7 +259,7 @@ bundle_mobilization = CappedMinCount(
         intervention_expr=Day(mobilizationAbilityObservation),
         name="RecPlanDocumentMobilizationAbilitiesPostoperatively",
         url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanDocumentMobilizationAbilitiesPostoperatively",
-        base_criterion=PatientsActiveDuringPeriod(),
+        base_criterion=ScopedPatientsActiveDuringPeriod(),
     ),
     PopulationInterventionPairExpr(
         population_expr=And(PostOperativePatientsWithHighRiskForDeliriumBeforeDayOfSurgery, Day(doesNotMobilize)),
@@ -282,7 +279,7 @@ bundle_mobilization = CappedMinCount(
         ),
         name="RecPlanDocumentMobilizePatientOrDocumentWhyNoMobilizationPostOP",
         url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanDocumentMobilizePatientOrDocumentWhyNoMobilizationPostOP",
-        base_criterion=PatientsActiveDuringPeriod(),
+        base_criterion=ScopedPatientsActiveDuringPeriod(),
     ),
     threshold=2,
 )
@@ -300,7 +297,7 @@ CappedMinCount(
             intervention_expr=Day(selfFeedingAbility),
             name="RecPlanDocumentFeedingAbilitiesPostoperatively",
             url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanDocumentFeedingAbilitiesPostoperatively",
-            base_criterion=PatientsActiveDuringPeriod(),
+            base_criterion=ScopedPatientsActiveDuringPeriod(),
         ),
         PopulationInterventionPairExpr(
             population_expr=And(PostOperativePatientsWithHighRiskForDeliriumBeforeDayOfSurgery, Day(doesNotFeedSelf)),
@@ -320,7 +317,7 @@ CappedMinCount(
             ),
             name="RecPlanDocumentFeedEnterallyPatientOrDocumentWhyNoFeedingPostOP",
             url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanDocumentFeedEnterallyPatientOrDocumentWhyNoFeedingPostOP",
-            base_criterion=PatientsActiveDuringPeriod(),
+            base_criterion=ScopedPatientsActiveDuringPeriod(),
         ),
         threshold=2,
     ),
@@ -333,7 +330,7 @@ CappedMinCount(
             intervention_expr=Day(deglutition),
             name="RecPlanDocumentDeglutitionAbilitiesPostoperatively",
             url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanDocumentDeglutitionAbilitiesPostoperatively",
-            base_criterion=PatientsActiveDuringPeriod(),
+            base_criterion=ScopedPatientsActiveDuringPeriod(),
         ),
         PopulationInterventionPairExpr(
             population_expr=And(PostOperativePatientsWithHighRiskForDeliriumBeforeDayOfSurgery, Day(difficultySwallowing)),
@@ -343,7 +340,7 @@ CappedMinCount(
             ),
             name="RecPlanDeglutitionRelatedInterventionsPostoperatively",
             url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanDeglutitionRelatedInterventionsPostoperatively",
-            base_criterion=PatientsActiveDuringPeriod(),
+            base_criterion=ScopedPatientsActiveDuringPeriod(),
         ),
         threshold=2,
     ),
@@ -357,78 +354,21 @@ CappedMinCount(
             intervention_expr=Day(mouthCareManagement),
             name="RecPlanOralCareRelatedInterventionsPostoperatively",
             url="https://fhir.charite.de/digipod/PlanDefinition/RecPlanOralCareRelatedInterventionsPostoperatively",
-            base_criterion=PatientsActiveDuringPeriod(),
+            base_criterion=ScopedPatientsActiveDuringPeriod(),
         ),
         threshold=1,
     ),
 )
 
-class CombineRecommendation4_3(logic.And):
-    """
-    Combines the two distinct population/intervention pairs in this recommendation and calculates
-    a weighted sum of the counts.
-    """
-
-    @staticmethod
-    def prepare_data(task: Task, data: list[PersonIntervals]) -> list[PersonIntervals]:
-        """
-        Selects and returns the PersonIntervals in the order
-        - result of bundle_anxiety
-        - result of bundle_cognition
-        - result of bundle_mobilization
-        - result of bundle_feeding
-
-        This function is used in task.Task to sort the incoming data such that the `count_intervals` function
-        can rely on this order.
-        """
-        assert task.expr.args[0].args[0].name == bundle_anxiety.args[0].name
-        assert task.expr.args[1].args[0].name == bundle_cognition.args[0].name
-        assert task.expr.args[2].args[0].name == bundle_mobilization.args[0].name
-        assert task.expr.args[3].args[0].args[0].name == bundle_feeding.args[0].args[0].name
-
-        idx_anxiety = task.get_predecessor_data_index(task.expr.args[0])
-        idx_cognition = task.get_predecessor_data_index(task.expr.args[1])
-        idx_mobilization = task.get_predecessor_data_index(task.expr.args[2])
-        idx_feeding = task.get_predecessor_data_index(task.expr.args[3])
-
-        if len(data) != 4:
-            raise ValueError('Expected exactly 4 inputs')
-
-        return [
-            data[idx_anxiety],
-            data[idx_cognition],
-            data[idx_mobilization],
-            data[idx_feeding],
-        ]
-
-
-    @staticmethod
-    def count_intervals(start: int, end: int, intervals: list[IntervalWithCount]
-    ) -> IntervalWithCount:
-        """
-        Combines two intervals into a single IntervalWithCount, handling special cases.
-
-        This function is used as a callback in `process.find_rectangles`.
-
-        Due to ` prepare_data`, the intervals are expected to be (in that order):
-        - index 0: result of _piScreeningOfRFInOlderPatientsPreOP
-        - index 1: result of _piOptimizationOfPreOPStatusInOlderPatPreoperatively
-
-        If the second interval is NOT_APPLICABLE - i.e. the patient is not part of the population of the second
-        PI pair, the first interval is returned directly.
-        Otherwise, a union of both intervals is created, and the count value is
-        calculated based on the notion that there are 4 items to be fulfilled in
-        _RecPlanCheckRiskFactorsAgeASACCIMiniCog, and 1 item in _RecPlanCheckRiskFactorsMoCAACERMMSE.
-        Accordingly, a weighted count is calculated.
-        """
-        # we need to take special care, unfortunately, that:
-        # - interval can be with or without count (if without, .count is the namedtuple build-in method)
-
-        # todo: do we need to handle not_applicable?
-
-        result_count = sum(interval.count if interval is not None else 0 for interval in intervals) / len(intervals)
-        result_type = reduce(lambda x, y: x & y, (interval.type if interval else IntervalType.NEGATIVE for interval in intervals))
-        return IntervalWithCount(start, end, result_type, result_count)
+# mean of the counts of the four bundles (including the counts of NOT_APPLICABLE bundles)
+CombineRecommendation4_3 = weighted_and(
+    "CombineRecommendation4_3",
+    module=__name__,
+    weights=[1, 1, 1, 1],
+    counts=CountMode.RAW_COUNT,
+    types=TypeCombination.AND,
+    doc="Combines the four bundles in this recommendation and calculates the mean of their counts.",
+)
 
 
 recommendation = Recommendation(
@@ -438,7 +378,7 @@ recommendation = Recommendation(
         bundle_mobilization,
         bundle_feeding,
     ),
-    base_criterion=PatientsActiveDuringPeriod(),
+    base_criterion=ScopedPatientsActiveDuringPeriod(),
     name="RecCollBundleOfNonPharmaMeasuresPostOPInAdultsAtRiskForPOD",
     title="Recommendation Collection: Perform a bundle of non-pharmacological interventions once a day postoperatively in different populations of 'Adult Surgical Patients At Risk For POD'",
     url="https://fhir.charite.de/digipod/PlanDefinition/RecCollBundleOfNonPharmaMeasuresPostOPInAdultsAtRiskForPOD",
@@ -0,0 +1,296 @@
+"""
+Persistent cache of recommendation execution runs.
+
+A run of a recommendation writes its results (per criterion, per population/intervention pair and for the whole
+recommendation) to the result schema, identified by its run_id. If neither the recommendation definition, nor the
+observation window, nor the OMOP source data have changed since an earlier run, the results of that run are still
+valid and the execution can be skipped.
+
+The cache maps a key (recommendation hash, observation window, data watermark) to the run_id of the run that
+computed the results. The recommendation hash includes the code version of this package (the criteria are defined
+in code), the data watermark includes the vocabulary tables (concept sets are expanded with concept_ancestor).
+Recommendations with time-dependent criteria (e.g. `AgeLimitPatient`) can change their results without any change of
+the data; a cached run of such a recommendation is only used if no person's result changed since its evaluation
+(see runner/watermark.py). It is stored as a JSON file and bounded in size: when the maximum number of entries is
+exceeded, the least recently used entries are evicted and their results are deleted from the result schema.
+
+Note: The execution engine evaluates the task graph of a recommendation as a whole and does not allow injecting
+results for single criteria, hence results are cached per recommendation run (which includes the results of all
+its criteria).
+"""
+
+import datetime
+import functools
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+import execution_engine
+from execution_engine.clients import omopdb
+from execution_engine.omop import cohort
+from sqlalchemy import Connection, select
+
+from digipod.recommendation import package_version
+from digipod.runner.results import delete_runs, run_exists
+from digipod.runner.watermark import (
+    SOURCE_TABLES,
+    VOCABULARY_TABLES,
+    data_watermark,
+    query_time_dependent_changes,
+    time_dependent_criteria,
+)
+
+DEFAULT_MAX_ENTRIES = 32
+
+# the subpackages (and modules) of this package that define the criteria and recommendations
+CODE_PATHS = [
+    "concepts.py",
+    "converter",
+    "criterion",
+    "recommendation",
+    "runner",
+    "terminology",
+]
+
+
+@functools.cache
+def code_version() -> str:
+    """
+    Get the version of this package, including a hash of its source code (the version is not bumped for every
+    change of a criterion).
+    """
+    root = Path(__file__).resolve().parent.parent
+    digest = hashlib.sha256(package_version.encode())
+
+    for path in CODE_PATHS:
+        files = [root / path] if path.endswith(".py") else (root / path).rglob("*.py")
+        for file in sorted(files):
+            digest.update(str(file.relative_to(root)).encode())
+            digest.update(file.read_bytes())
+
+    return f"{package_version}+{digest.hexdigest()[:16]}"
+
+
+def recommendation_hash(recommendation: cohort.Recommendation) -> str:
+    """
+    Get a hash of the recommendation definition (the serialized recommendation, including all of its criteria) and
+    of the code versions that evaluate it.
+    """
+    definition = (
+        f"{execution_engine.__version__}:{code_version()}:".encode()
+        + recommendation.json()
+    )
+
+    return hashlib.sha256(definition).hexdigest()
+
+
+class ResultCache:
+    """
+    File-based cache of recommendation execution runs.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        """
+        :param path: The path of the cache file (created if it does not exist).
+        :param max_entries: The maximum number of cached runs.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.path = path
+        self.max_entries = max_entries
+        self._entries: dict[str, dict[str, Any]] = self._load()
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+
+        with open(self.path) as f:
+            return json.load(f)
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f, indent=2, sort_keys=True)
+
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def key(
+        recommendation: cohort.Recommendation,
+        start_datetime: datetime.datetime,
+        end_datetime: datetime.datetime,
+        watermark: str,
+    ) -> str:
+        """
+        Get the cache key of a recommendation run.
+        """
+        return "|".join(
+            [
+                recommendation_hash(recommendation),
+                start_datetime.isoformat(),
+                end_datetime.isoformat(),
+                watermark,
+            ]
+        )
+
+    def get(self, con: Connection, key: str) -> int | None:
+        """
+        Get the run_id of a cached run.
+
+        :param con: The database connection (used to check that the results of the run still exist).
+        :param key: The cache key.
+        :return: The run_id, or None if there is no (valid) cached run.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        if not run_exists(con, entry["run_id"]):
+            del self._entries[key]
+            self._save()
+            return None
+
+        entry["last_used"] = datetime.datetime.now().isoformat()
+        self._save()
+
+        return entry["run_id"]
+
+    def evaluated_at(self, key: str) -> datetime.datetime | None:
+        """
+        Get the time at which a cached run was evaluated (None if there is no cached run or the time is unknown).
+        """
+        entry = self._entries.get(key)
+
+        if entry is None or "evaluated_at" not in entry:
+            return None
+
+        return datetime.datetime.fromisoformat(entry["evaluated_at"])
+
+    def put(
+        self,
+        con: Connection,
+        key: str,
+        run_id: int,
+        name: str,
+        evaluated_at: datetime.datetime | None = None,
+    ) -> None:
+        """
+        Add a run to the cache.
+
+        Replaced and evicted runs are deleted from the result schema.
+
+        :param con: The database connection (within a transaction).
+        :param key: The cache key.
+        :param run_id: The run_id of the run.
+        :param name: The name of the recommendation (informational only).
+        :param evaluated_at: The time at which the run was started (defaults to now).
+        """
+        obsolete: list[int] = []
+
+        # a recommendation is only cached for a single watermark, older runs are outdated
+        prefix = key.rsplit("|", 1)[0]
+        outdated = [k for k in self._entries if k.rsplit("|", 1)[0] == prefix]
+        for other_key in outdated:
+            obsolete.append(self._entries.pop(other_key)["run_id"])
+
+        now = datetime.datetime.now()
+        self._entries[key] = {
+            "run_id": run_id,
+            "recommendation": name,
+            "created": now.isoformat(),
+            "last_used": now.isoformat(),
+            "evaluated_at": (evaluated_at or now).isoformat(),
+        }
+
+        while len(self._entries) > self.max_entries:
+            lru_key = min(self._entries, key=lambda k: self._entries[k]["last_used"])
+            obsolete.append(self._entries.pop(lru_key)["run_id"])
+
+        obsolete = [r for r in obsolete if r != run_id]
+
+        if obsolete:
+            logging.info(f"Deleting results of evicted runs {obsolete}")
+            delete_runs(con, obsolete)
+
+        self._save()
+
+    def __len__(self) -> int:
+        """
+        Get the number of cached runs.
+        """
+        return len(self._entries)
+
+
+def execute_cached(
+    engine: Any,
+    cache: ResultCache,
+    recommendation: cohort.Recommendation,
+    start_datetime: datetime.datetime,
+    end_datetime: datetime.datetime,
+    prepare: Callable[[], None] | None = None,
+) -> int:
+    """
+    Execute a recommendation, unless the results of an identical run are cached.
+
+    :param engine: The ExecutionEngine.
+    :param cache: The result cache.
+    :param recommendation: The recommendation.
+    :param start_datetime: The start of the observation window.
+    :param end_datetime: The end of the observation window.
+    :param prepare: Called before the recommendation is executed, i.e. only if there is no cached run (e.g. to
+        materialize the anchors).
+    :return: The run_id of the (cached or new) run.
+    """
+    time_dependent = time_dependent_criteria(recommendation)
+
+    # the time-dependent criteria are evaluated at the current time
+    evaluated_at = datetime.datetime.now()
+
+    with omopdb.begin() as con:
+        key = cache.key(
+            recommendation,
+            start_datetime,
+            end_datetime,
+            data_watermark(con, SOURCE_TABLES + VOCABULARY_TABLES),
+        )
+        run_id = cache.get(con, key)
+
+        if run_id is not None and time_dependent:
+            cached_at = cache.evaluated_at(key)
+
+            if (
+                cached_at is None
+                or con.execute(
+                    select(
+                        query_time_dependent_changes(
+                            time_dependent, cached_at, evaluated_at
+                        ).exists()
+                    )
+                ).scalar_one()
+            ):
+                logging.info(
+                    f'Cached results of "{recommendation.name}" are outdated (time-dependent criteria)'
+                )
+                run_id = None
+
+    if run_id is not None:
+        logging.info(f'Using cached results of "{recommendation.name}" (run {run_id})')
+        return run_id
+
+    if prepare is not None:
+        prepare()
+
+    run_id = engine.execute(
+        recommendation, start_datetime=start_datetime, end_datetime=end_datetime
+    )
+
+    with omopdb.begin() as con:
+        cache.put(con, key, run_id, recommendation.name, evaluated_at=evaluated_at)
+
+    return run_id
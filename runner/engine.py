@@ -0,0 +1,57 @@
+"""
+Construction of the ExecutionEngine with all DigiPOD converters.
+"""
+
+import inspect
+import logging
+from types import ModuleType
+from typing import Generator, Type
+
+from execution_engine.builder import default_execution_engine_builder
+from execution_engine.execution_engine import ExecutionEngine
+
+import digipod.converter.action
+import digipod.converter.characteristic
+import digipod.converter.relative_time
+import digipod.converter.time_from_event
+import digipod.criterion  # noqa: F401 -- registers the DigiPOD criteria
+
+
+def iterate_module_classes(module: ModuleType) -> Generator[Type, None, None]:
+    """
+    Yields all classes listed in the `__all__` attribute of a module.
+
+    :param module: The module from which to import classes.
+    :return: A generator yielding classes defined in the module's `__all__` list.
+    """
+
+    if hasattr(module, "__all__"):
+        for class_name in module.__all__:
+            cls = getattr(module, class_name, None)
+            if inspect.isclass(cls):
+                yield cls
+
+
+def build_engine() -> ExecutionEngine:
+    """
+    Build the ExecutionEngine with all DigiPOD converters.
+    """
+    builder = default_execution_engine_builder()
+
+    for cls in iterate_module_classes(digipod.converter.characteristic):
+        logging.info(f'Importing characteristic converter "{cls.__name__}"')
+        builder.prepend_characteristic_converter(cls)
+
+    for cls in iterate_module_classes(digipod.converter.action):
+        logging.info(f'Importing action converter "{cls.__name__}"')
+        builder.prepend_action_converter(cls)
+
+    for cls in iterate_module_classes(digipod.converter.time_from_event):
+        logging.info(f'Importing timeFromEvent converter "{cls.__name__}"')
+        builder.append_time_from_event_converter(cls)
+
+    for cls in iterate_module_classes(digipod.converter.relative_time):
+        logging.info(f'Importing relativeTime converter "{cls.__name__}"')
+        builder.append_relative_time_converter(cls)
+
+    return builder.build()
@@ -0,0 +1,366 @@
+"""
+Incremental execution of recommendations.
+
+Instead of recomputing a recommendation for all persons, an incremental run only recomputes the results of persons
+with new or modified rows in the OMOP source tables since the previous run and replaces their results in the
+previous run.
+
+For each recommendation (identified by its definition hash), the state table stores the run that holds the current
+results and a change watermark: the oldest (64-bit) transaction id that was possibly still in progress when the run
+started. Rows written by later transactions are found by comparing their xmin with the lower 32 bits of the
+watermark, which is only valid while the transaction id epoch (the upper 32 bits) is unchanged.
+
+A full run is performed instead if
+
+- there is no previous run or the observation window changed,
+- the transaction id epoch changed (wraparound) or the frozen transaction id of any source table changed (VACUUM
+  FREEZE, aggressive vacuums, VACUUM FULL, CLUSTER, TRUNCATE), as the xmin of the rows is not comparable then,
+- rows have been deleted from any source table or the statistics were reset (deleted rows cannot be attributed to
+  persons, see runner/watermark.py).
+
+Time-dependent criteria (e.g. `AgeLimitPatient`, which depends on the current date) can change their results without
+any change of the data. The persons whose results changed since the evaluation time of the previous run (e.g. who
+reached the minimum age) are recomputed as well.
+
+Note: The recommendations must use `ScopedPatientsActiveDuringPeriod` as base criterion, otherwise the person scope
+is not applied and incremental runs recompute all persons.
+"""
+
+import datetime
+import logging
+from typing import Any
+
+from execution_engine.clients import omopdb
+from execution_engine.omop import cohort
+from execution_engine.omop.criterion.abstract import Criterion
+from execution_engine.omop.db.omop.schema import SCHEMA_NAME as OMOP_SCHEMA_NAME
+from execution_engine.settings import get_config
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    Connection,
+    DateTime,
+    MetaData,
+    Select,
+    String,
+    Table,
+    delete,
+    insert,
+    select,
+    text,
+    union,
+)
+
+from digipod.criterion.scope import set_person_scope
+from digipod.runner.cache import recommendation_hash
+from digipod.runner.results import delete_runs, merge_runs, run_exists
+from digipod.runner.watermark import (
+    SOURCE_TABLES,
+    stats_reset,
+    query_time_dependent_changes,
+    table_watermarks,
+    time_dependent_criteria,
+)
+
+_state_table: Table | None = None
+_person_scope_table: Table | None = None
+
+
+def state_table() -> Table:
+    """
+    The table storing the current run and change watermark per recommendation.
+    """
+    global _state_table
+
+    if _state_table is None:
+        _state_table = Table(
+            "digipod_incremental_state",
+            MetaData(schema=get_config().omop.db_result_schema),
+            Column("recommendation_hash", String, primary_key=True),
+            Column("run_id", BigInteger, nullable=False),
+            Column("observation_start_datetime", DateTime(timezone=True)),
+            Column("observation_end_datetime", DateTime(timezone=True)),
+            Column("snapshot_xmin", BigInteger, nullable=False),
+            Column("frozen_xids", JSON, nullable=False),
+            Column("table_watermarks", JSON, nullable=False),
+            Column("stats_reset", String),
+            Column("evaluated_at", DateTime),
+            Column("updated_datetime", DateTime(timezone=True)),
+        )
+
+    return _state_table
+
+
+def person_scope_table() -> Table:
+    """
+    The staging table of the persons to recompute in an incremental run.
+    """
+    global _person_scope_table
+
+    if _person_scope_table is None:
+        _person_scope_table = Table(
+            "digipod_person_scope",
+            MetaData(schema=get_config().omop.db_result_schema),
+            Column("person_id", BigInteger, primary_key=True),
+            prefixes=["UNLOGGED"],
+        )
+
+    return _person_scope_table
+
+
+XID_EPOCH_BITS = 32
+
+
+def current_snapshot_xmin(con: Connection) -> int:
+    """
+    Get the oldest (64-bit) transaction id that is still in progress (all older transactions are completed).
+    """
+    return con.execute(
+        text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+    ).scalar_one()
+
+
+def frozen_xids(con: Connection, tables: list[str] | None = None) -> dict[str, str]:
+    """
+    Get the frozen transaction id (pg_class.relfrozenxid) of each source table.
+
+    The frozen transaction id changes whenever rows of the table may have been frozen or the table was rewritten.
+
+    :param con: The database connection.
+    :param tables: The tables (in the OMOP CDM schema). Defaults to all source tables.
+    :return: A mapping of table name to frozen transaction id.
+    """
+    if tables is None:
+        tables = SOURCE_TABLES
+
+    rows = con.execute(
+        text(
+            "SELECT c.relname, c.relfrozenxid::text "
+            "FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = :schema AND c.relname = ANY(:tables)"
+        ),
+        {"schema": OMOP_SCHEMA_NAME, "tables": tables},
+    ).fetchall()
+
+    return {relname: xid for relname, xid in rows}
+
+
+def stage_changed_persons(
+    con: Connection, snapshot_xmin: int, time_dependent_changes: Select | None = None
+) -> int:
+    """
+    Stage all persons with rows in the source tables that were written by transactions since snapshot_xmin.
+
+    Only valid if the transaction id epoch and the frozen transaction ids of the source tables have not changed
+    since snapshot_xmin was taken (see `full_run_reason`).
+
+    Note: Requires a sequential scan of each source table (xmin is not indexed), which is still much cheaper than
+    recomputing all persons.
+
+    :param con: The database connection (within a transaction).
+    :param snapshot_xmin: The change watermark of the previous run.
+    :param time_dependent_changes: Query returning further persons to stage, whose results of time-dependent criteria
+        changed since the previous run (see `query_time_dependent_changes`).
+    :return: The number of staged persons.
+    """
+    scope = person_scope_table()
+    scope.drop(con, checkfirst=True)
+    scope.create(con)
+
+    metadata = MetaData(schema=OMOP_SCHEMA_NAME)
+
+    # xmin is the lower 32 bits of the transaction id; all transactions since snapshot_xmin are of the same epoch
+    changed_since = text("xmin::text::bigint >= :xid")
+
+    queries = [
+        select(table.c.person_id).where(changed_since)
+        for table in [
+            Table(name, metadata, Column("person_id", BigInteger))
+            for name in SOURCE_TABLES
+        ]
+    ]
+
+    if time_dependent_changes is not None:
+        queries.append(time_dependent_changes)
+
+    con.execute(
+        insert(scope).from_select(["person_id"], union(*queries)),
+        {"xid": snapshot_xmin % (1 << XID_EPOCH_BITS)},
+    )
+    con.execute(text(f"ANALYZE {scope.schema}.{scope.name}"))  # nosec
+
+    return con.execute(select(text("count(*)")).select_from(scope)).scalar_one()
+
+
+def _deleted_rows(previous: dict[str, Any], current: dict[str, list[int]]) -> bool:
+    """
+    Whether rows have been deleted from any source table between two table watermarks.
+    """
+    # watermarks are [inserted, updated, deleted]
+    return any(current[name][2] != previous.get(name, [0, 0, 0])[2] for name in current)
+
+
+def full_run_reason(
+    previous: dict[str, Any] | None,
+    current: dict[str, Any],
+    time_dependent: list[Criterion],
+) -> str | None:
+    """
+    Get the reason why a recommendation must be executed for all persons (see module docstring).
+
+    :param previous: The state of the previous run (None if there is none).
+    :param current: The current state (same keys as the state table).
+    :param time_dependent: The time-dependent criteria of the recommendation.
+    :return: The reason, or None if an incremental run is possible.
+    """
+    if previous is None:
+        return "no previous run"
+
+    if (
+        previous["observation_start_datetime"] != current["observation_start_datetime"]
+        or previous["observation_end_datetime"] != current["observation_end_datetime"]
+    ):
+        return "observation window changed"
+
+    if time_dependent and previous["evaluated_at"] is None:
+        return "evaluation time of time-dependent criteria unknown"
+
+    if (
+        previous["snapshot_xmin"] >> XID_EPOCH_BITS
+        != current["snapshot_xmin"] >> XID_EPOCH_BITS
+    ):
+        return "transaction id epoch changed"
+
+    if previous["frozen_xids"] != current["frozen_xids"]:
+        return "rows frozen or tables rewritten"
+
+    if previous["stats_reset"] != current["stats_reset"]:
+        return "statistics reset"
+
+    if _deleted_rows(previous["table_watermarks"], current["table_watermarks"]):
+        return "rows deleted"
+
+    return None
+
+
+def execute_incremental(
+    engine: Any,
+    recommendation: cohort.Recommendation,
+    start_datetime: datetime.datetime,
+    end_datetime: datetime.datetime,
+) -> int:
+    """
+    Execute a recommendation incrementally, i.e. only for persons with changed data since the previous run.
+
+    :param engine: The ExecutionEngine.
+    :param recommendation: The recommendation.
+    :param start_datetime: The start of the observation window.
+    :param end_datetime: The end of the observation window.
+    :return: The run_id of the run that holds the current results.
+    """
+    state = state_table()
+    rec_hash = recommendation_hash(recommendation)
+
+    with omopdb.begin() as con:
+        state.create(con, checkfirst=True)
+
+        previous = (
+            con.execute(select(state).where(state.c.recommendation_hash == rec_hash))
+            .mappings()
+            .one_or_none()
+        )
+
+        if previous is not None and not run_exists(con, previous["run_id"]):
+            # the results have been deleted (e.g. the result schema was truncated)
+            previous = None
+
+        # take the watermark before computing, changes during the run are picked up by the next run
+        current = {
+            "observation_start_datetime": start_datetime,
+            "observation_end_datetime": end_datetime,
+            "snapshot_xmin": current_snapshot_xmin(con),
+            "frozen_xids": frozen_xids(con),
+            "table_watermarks": table_watermarks(con),
+            "stats_reset": stats_reset(con),
+            # the time-dependent criteria are evaluated at the current time
+            "evaluated_at": datetime.datetime.now(),
+        }
+
+        time_dependent = time_dependent_criteria(recommendation)
+        reason = full_run_reason(previous, current, time_dependent)
+
+        if reason is not None:
+            n_persons = 0
+        else:
+            n_persons = stage_changed_persons(
+                con,
+                previous["snapshot_xmin"],
+                (
+                    query_time_dependent_changes(
+                        time_dependent,
+                        previous["evaluated_at"],
+                        current["evaluated_at"],
+                    )
+                    if time_dependent
+                    else None
+                ),
+            )
+
+    if reason is not None:
+        logging.info(f'Full run of "{recommendation.name}": {reason}')
+
+        run_id = engine.execute(
+            recommendation, start_datetime=start_datetime, end_datetime=end_datetime
+        )
+
+        obsolete = [previous["run_id"]] if previous is not None else []
+
+    elif n_persons == 0:
+        assert previous is not None
+        logging.info(f'No changed persons for "{recommendation.name}"')
+
+        run_id = previous["run_id"]
+        obsolete = []
+
+    else:
+        assert previous is not None
+        logging.info(
+            f'Incremental run of "{recommendation.name}" for {n_persons} changed persons'
+        )
+
+        set_person_scope(person_scope_table())
+
+        try:
+            partial_run_id = engine.execute(
+                recommendation,
+                start_datetime=start_datetime,
+                end_datetime=end_datetime,
+            )
+        finally:
+            set_person_scope()
+
+        run_id = previous["run_id"]
+        obsolete = []
+
+        with omopdb.begin() as con:
+            n_rows = merge_runs(
+                con, run_id, [partial_run_id], persons=person_scope_table()
+            )
+
+        logging.info(f"Replaced results of changed persons ({n_rows} rows)")
+
+    with omopdb.begin() as con:
+        delete_runs(con, obsolete)
+
+        con.execute(delete(state).where(state.c.recommendation_hash == rec_hash))
+        con.execute(
+            insert(state).values(
+                recommendation_hash=rec_hash,
+                run_id=run_id,
+                updated_datetime=datetime.datetime.now(datetime.timezone.utc),
+                **current,
+            )
+        )
+
+    return run_id
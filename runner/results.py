@@ -0,0 +1,89 @@
+"""
+Maintenance of execution runs in the result schema.
+"""
+
+from execution_engine.omop.db.celida.tables import ResultInterval
+from execution_engine.settings import get_config
+from sqlalchemy import Connection, delete, insert, literal, select, text
+from sqlalchemy.sql import FromClause
+
+
+def run_exists(con: Connection, run_id: int) -> bool:
+    """
+    Whether the run (and thus its results) still exists in the result schema.
+    """
+    schema = get_config().omop.db_result_schema
+
+    return con.execute(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {schema}.execution_run WHERE run_id = :run_id)"  # nosec -- schema from config
+        ),
+        {"run_id": run_id},
+    ).scalar_one()
+
+
+def delete_runs(con: Connection, run_ids: list[int]) -> None:
+    """
+    Delete the results of the given runs from the result schema.
+    """
+    if not run_ids:
+        return
+
+    schema = get_config().omop.db_result_schema
+
+    for table in ["result_interval", "execution_run"]:
+        con.execute(
+            text(
+                f"DELETE FROM {schema}.{table} WHERE run_id = ANY(:run_ids)"  # nosec -- schema from config
+            ),
+            {"run_ids": run_ids},
+        )
+
+
+def merge_runs(
+    con: Connection,
+    target_run_id: int,
+    source_run_ids: list[int],
+    persons: FromClause | None = None,
+) -> int:
+    """
+    Move the results of the source runs into the target run and delete the source runs.
+
+    The results are inserted in the order of source_run_ids (and ordered by person within each run), so that
+    merging the same runs always yields the same result.
+
+    :param con: The database connection (within a transaction).
+    :param target_run_id: The run that receives the results.
+    :param source_run_ids: The runs whose results are moved (all runs must be of the same recommendation and
+        observation window as the target run).
+    :param persons: If given, the existing results of these persons (table or subquery with a person_id column)
+        are removed from the target run before merging, i.e. they are replaced by the results of the source runs.
+    :return: The number of merged result rows.
+    """
+    table = ResultInterval.__table__
+    columns = [c for c in table.columns if not c.primary_key and c.name != "run_id"]
+
+    if persons is not None:
+        con.execute(
+            delete(table).where(
+                table.c.run_id == target_run_id,
+                table.c.person_id.in_(select(persons.c.person_id)),
+            )
+        )
+
+    n_rows = 0
+
+    for source_run_id in source_run_ids:
+        query = (
+            select(literal(target_run_id).label("run_id"), *columns)
+            .where(table.c.run_id == source_run_id)
+            .order_by(table.c.person_id, table.c.interval_start)
+        )
+        result = con.execute(
+            insert(table).from_select(["run_id", *[c.name for c in columns]], query)
+        )
+        n_rows += result.rowcount
+
+    delete_runs(con, [r for r in source_run_ids if r != target_run_id])
+
+    return n_rows
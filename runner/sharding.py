@@ -0,0 +1,152 @@
+"""
+Person-sharded parallel execution of recommendations.
+
+The persons are split into N shards of (approximately) equal size by person_id ranges. Each shard is executed in
+a worker process (with its own database connections) as a separate execution run restricted to the person_id range
+of the shard (see `ScopedPatientsActiveDuringPeriod`). As all results are per person, the shards are independent.
+Afterwards, the results of all shard runs are merged into the run of the first shard, in shard order.
+
+Workers are forked from the main process, i.e. they inherit the registered recommendations and the materialized
+anchors; the recommendations must be registered with the engine before the pool is started, so that all shard runs
+use the same recommendation, population/intervention pair and criterion ids.
+"""
+
+import datetime
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from execution_engine.clients import omopdb
+from execution_engine.omop import cohort
+from execution_engine.omop.db.omop.tables import Person
+from sqlalchemy import Connection, Engine, func, select
+
+from digipod.criterion.anchors import activate_anchors
+from digipod.criterion.scope import set_person_scope
+from digipod.runner.results import merge_runs
+
+# state inherited by the forked workers
+_engine: Any = None
+_recommendation: cohort.Recommendation | None = None
+_db_engine: Engine | None = None
+
+
+def shard_ranges(con: Connection, n_shards: int) -> list[tuple[int, int]]:
+    """
+    Split the persons into n_shards inclusive person_id ranges with (approximately) equal number of persons.
+
+    :param con: The database connection.
+    :param n_shards: The number of shards.
+    :return: The (first, last) person_id of each shard, ordered by person_id.
+    """
+    if n_shards < 1:
+        raise ValueError("n_shards must be at least 1")
+
+    table = Person.__table__
+
+    numbered = select(
+        table.c.person_id,
+        func.ntile(n_shards).over(order_by=table.c.person_id).label("shard"),
+    ).subquery("numbered_persons")
+
+    query = (
+        select(func.min(numbered.c.person_id), func.max(numbered.c.person_id))
+        .group_by(numbered.c.shard)
+        .order_by(numbered.c.shard)
+    )
+
+    return [(first, last) for first, last in con.execute(query)]
+
+
+def _init_worker() -> None:
+    assert _db_engine is not None
+
+    # connections must not be shared with the parent process
+    _db_engine.dispose(close=False)
+    activate_anchors()
+
+
+def _execute_shard(
+    id_range: tuple[int, int],
+    start_datetime: datetime.datetime,
+    end_datetime: datetime.datetime,
+) -> int:
+    assert _engine is not None and _recommendation is not None
+
+    set_person_scope(id_range=id_range)
+
+    try:
+        run_id = _engine.execute(
+            _recommendation, start_datetime=start_datetime, end_datetime=end_datetime
+        )
+    finally:
+        set_person_scope()
+
+    logging.info(f"Executed shard {id_range} (run {run_id})")
+
+    return run_id
+
+
+def execute_sharded(
+    engine: Any,
+    recommendation: cohort.Recommendation,
+    start_datetime: datetime.datetime,
+    end_datetime: datetime.datetime,
+    n_shards: int,
+    n_workers: int | None = None,
+) -> int:
+    """
+    Execute a recommendation in person shards in parallel worker processes.
+
+    :param engine: The ExecutionEngine (the recommendation must already be registered).
+    :param recommendation: The recommendation.
+    :param start_datetime: The start of the observation window.
+    :param end_datetime: The end of the observation window.
+    :param n_shards: The number of shards.
+    :param n_workers: The number of worker processes (defaults to min(n_shards, number of CPUs)).
+    :return: The run_id of the run that holds the merged results.
+    """
+    global _engine, _recommendation, _db_engine
+
+    with omopdb.begin() as con:
+        ranges = shard_ranges(con, n_shards)
+        db_engine = con.engine
+
+    if not ranges:
+        raise ValueError("No persons to execute")
+
+    if n_workers is None:
+        n_workers = min(len(ranges), os.cpu_count() or 1)
+
+    logging.info(
+        f'Executing "{recommendation.name}" in {len(ranges)} shards with {n_workers} workers'
+    )
+
+    _engine, _recommendation, _db_engine = engine, recommendation, db_engine
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_init_worker,
+        ) as pool:
+            futures = [
+                pool.submit(_execute_shard, id_range, start_datetime, end_datetime)
+                for id_range in ranges
+            ]
+            run_ids = [f.result() for f in futures]
+    finally:
+        _engine, _recommendation, _db_engine = None, None, None
+
+    target_run_id, *other_run_ids = run_ids
+
+    with omopdb.begin() as con:
+        n_rows = merge_runs(con, target_run_id, other_run_ids)
+
+    logging.info(
+        f"Merged {len(other_run_ids)} shard runs into run {target_run_id} ({n_rows} rows)"
+    )
+
+    return target_run_id
@@ -0,0 +1,353 @@
+"""
+Bulk writing of result rows with PostgreSQL COPY.
+
+The execution engine writes the result intervals of each criterion, population/intervention pair and recommendation
+with multi-row INSERT statements. SQLAlchemy executes these either with the DBAPI's executemany or, by default for
+PostgreSQL, in "insertmanyvalues" mode (batches of `INSERT ... VALUES (...), (...)` passed to execute).
+`copy_result_writer` intercepts both on the database engine and writes the rows with a single `COPY ... FROM STDIN`
+per batch instead (binary format if all columns have built-in types, text format otherwise), without changing the
+execution engine.
+
+`deferred_indexes` drops the secondary indexes of the result tables for the duration of a run and recreates them
+afterwards, such that each index is built once instead of being maintained for every written row. This only pays off
+if the result tables are (nearly) empty before the run, e.g. after truncating the result schema. The definitions of
+the dropped indexes are stored in the table `digipod_deferred_index` in the same transaction as the drop, so that
+indexes dropped by an interrupted run are recreated by the next run (or `recreate_deferred_indexes`).
+"""
+
+import contextlib
+import itertools
+import logging
+import weakref
+from typing import Any, Iterable, Iterator, Sequence
+
+from execution_engine.clients import omopdb
+from execution_engine.omop.db.celida.tables import ResultInterval
+from execution_engine.settings import get_config
+from sqlalchemy import (
+    Column,
+    Connection,
+    Dialect,
+    MetaData,
+    String,
+    Table,
+    Text,
+    delete,
+    event,
+    func,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.engine.interfaces import ExecuteStyle, ExecutionContext
+
+DEFAULT_BATCH_SIZE = 50_000
+
+# executemany inserts with fewer rows are not worth a COPY
+MIN_COPY_ROWS = 100
+
+# type names that are rendered by sqlalchemy but are unknown to psycopg's type registry
+_TYPE_ALIASES = {"float": "float8", "double": "float8", "real": "float4"}
+
+
+def result_tables() -> list[Table]:
+    """
+    The result tables that receive a large number of rows per run.
+    """
+    return [ResultInterval.__table__]
+
+
+def _batched(rows: Iterable[Sequence[Any]], batch_size: int) -> Iterator[list[Any]]:
+    iterator = iter(rows)
+
+    while batch := list(itertools.islice(iterator, batch_size)):
+        yield batch
+
+
+def _binary_types(
+    cursor: Any, dialect: Dialect, table: Table, columns: list[str]
+) -> list[str] | None:
+    """
+    Get the PostgreSQL type names of the columns for a binary COPY, or None if any type is not a built-in type.
+    """
+    types = []
+
+    for name in columns:
+        type_name = table.c[name].type.compile(dialect=dialect).lower()
+        type_name = _TYPE_ALIASES.get(type_name, type_name)
+
+        if cursor.adapters.types.get(type_name) is None:
+            return None
+
+        types.append(type_name)
+
+    return types
+
+
+def _copy(
+    cursor: Any,
+    dialect: Dialect,
+    table: Table,
+    columns: list[str],
+    rows: Iterable[Sequence[Any]],
+    batch_size: int,
+) -> int:
+    """
+    Write the rows with one COPY statement per batch using a (psycopg) DBAPI cursor.
+    """
+    preparer = dialect.identifier_preparer
+    types = _binary_types(cursor, dialect, table, columns)
+
+    statement = (
+        f"COPY {preparer.format_table(table)} "  # nosec -- identifiers quoted by the dialect
+        f"({', '.join(preparer.quote(name) for name in columns)}) "
+        f"FROM STDIN (FORMAT {'BINARY' if types is not None else 'TEXT'})"
+    )
+
+    n_rows = 0
+
+    for batch in _batched(rows, batch_size):
+        with cursor.copy(statement) as copy:
+            if types is not None:
+                copy.set_types(types)
+
+            for row in batch:
+                copy.write_row(row)
+
+        n_rows += len(batch)
+
+    return n_rows
+
+
+def copy_rows(
+    con: Connection,
+    table: Table,
+    columns: list[str],
+    rows: Iterable[Sequence[Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Write rows into a table with PostgreSQL COPY.
+
+    The rows are consumed in batches of batch_size rows, i.e. at most one batch is held in memory if rows is an
+    iterator.
+
+    :param con: The database connection (psycopg driver).
+    :param table: The target table.
+    :param columns: The names of the columns, in the order of the row values.
+    :param rows: The rows (sequences of already adapted values, e.g. enum values as strings).
+    :param batch_size: The number of rows per COPY statement.
+    :return: The number of written rows.
+    """
+    cursor = con.connection.dbapi_connection.cursor()  # type: ignore[union-attr]
+
+    try:
+        return _copy(cursor, con.dialect, table, columns, rows, batch_size)
+    finally:
+        cursor.close()
+
+
+@contextlib.contextmanager
+def copy_result_writer(
+    tables: list[Table] | None = None, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[None]:
+    """
+    Write all multi-row INSERTs (executemany or insertmanyvalues) into the given tables (default: the result tables)
+    with COPY while in the context.
+
+    :param tables: The tables whose inserts are replaced by COPY.
+    :param batch_size: The number of rows per COPY statement.
+    """
+    targets = {id(table): table for table in tables or result_tables()}
+    # the executions whose rows have been copied (insertmanyvalues calls do_execute once per batch)
+    copied: weakref.WeakSet[ExecutionContext] = weakref.WeakSet()
+
+    def copy_parameters(
+        cursor: Any,
+        parameters: Sequence[dict[str, Any]],
+        context: ExecutionContext,
+    ) -> bool:
+        compiled: Any = context.compiled
+
+        if (
+            compiled is None
+            or not compiled.isinsert
+            or compiled.effective_returning
+            or id(compiled.statement.table) not in targets
+            or len(parameters) < MIN_COPY_ROWS
+        ):
+            return False
+
+        table = targets[id(compiled.statement.table)]
+        columns = list(parameters[0])
+
+        if not all(name in table.c for name in columns):
+            # bind names differ from the column names, use the regular insert
+            return False
+
+        rows = (tuple(params[name] for name in columns) for params in parameters)
+        n_rows = _copy(cursor, context.dialect, table, columns, rows, batch_size)
+
+        logging.debug(f"Copied {n_rows} rows into {table.name}")
+
+        return True
+
+    def do_executemany(
+        cursor: Any,
+        statement: str,
+        parameters: Sequence[dict[str, Any]],
+        context: ExecutionContext,
+    ) -> bool | None:
+        return copy_parameters(cursor, parameters, context) or None
+
+    def do_execute(
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: ExecutionContext,
+    ) -> bool | None:
+        if context.execute_style is not ExecuteStyle.INSERTMANYVALUES:
+            return None
+
+        if context in copied:
+            # the remaining batches of an execution whose rows have all been copied
+            return True
+
+        # the parameters of this call are those of the current batch, copy the rows of all batches at once
+        if copy_parameters(cursor, context.parameters, context):  # type: ignore[attr-defined]
+            copied.add(context)
+            return True
+
+        return None
+
+    with omopdb.connect() as con:
+        engine = con.engine
+
+    event.listen(engine, "do_executemany", do_executemany)
+    event.listen(engine, "do_execute", do_execute)
+
+    try:
+        yield
+    finally:
+        event.remove(engine, "do_executemany", do_executemany)
+        event.remove(engine, "do_execute", do_execute)
+
+
+_deferred_index_table: Table | None = None
+
+
+def deferred_index_table() -> Table:
+    """
+    The table storing the definitions of the indexes dropped by `deferred_indexes` until they are recreated.
+    """
+    global _deferred_index_table
+
+    if _deferred_index_table is None:
+        _deferred_index_table = Table(
+            "digipod_deferred_index",
+            MetaData(schema=get_config().omop.db_result_schema),
+            Column("index_name", String, primary_key=True),
+            Column("definition", Text, nullable=False),
+        )
+
+    return _deferred_index_table
+
+
+def secondary_indexes(con: Connection, table: Table) -> dict[str, str]:
+    """
+    Get the definitions of the indexes of a table that do not back a constraint (primary key, unique, exclusion).
+
+    :return: The index definitions (CREATE INDEX statements) by (schema qualified) index name.
+    """
+    query = text(
+        """
+        SELECT CAST(CAST(x.indexrelid AS regclass) AS text), pg_get_indexdef(x.indexrelid)
+        FROM pg_index x
+        WHERE x.indrelid = CAST(:table AS regclass)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+        ORDER BY 1
+        """
+    )
+    table_name = con.dialect.identifier_preparer.format_table(table)
+
+    return dict(con.execute(query, {"table": table_name}).tuples().all())
+
+
+def recreate_deferred_indexes(con: Connection) -> int:
+    """
+    Recreate the indexes stored in the deferred index table and remove them from the table.
+
+    :param con: The database connection (within a transaction).
+    :return: The number of recreated indexes.
+    """
+    table = deferred_index_table()
+    table.create(con, checkfirst=True)
+
+    deferred = con.execute(
+        delete(table).returning(table.c.index_name, table.c.definition)
+    ).all()
+    n_created = 0
+
+    for name, definition in deferred:
+        # the index may have been recreated manually after an interrupted run
+        if con.execute(select(func.to_regclass(name))).scalar_one() is None:
+            con.execute(text(definition))
+            n_created += 1
+
+    return n_created
+
+
+@contextlib.contextmanager
+def deferred_indexes(tables: list[Table] | None = None) -> Iterator[None]:
+    """
+    Drop the secondary indexes of the given tables (default: the result tables) while in the context and recreate
+    them afterwards (also if the context is left with an exception).
+
+    The index definitions are stored in the deferred index table before the indexes are dropped (in the same
+    transaction); indexes left over by an interrupted run are recreated first.
+
+    :param tables: The tables whose index maintenance is deferred.
+    """
+    tables = tables or result_tables()
+    index_table = deferred_index_table()
+    n_deferred = 0
+
+    with omopdb.begin() as con:
+        n_restored = recreate_deferred_indexes(con)
+
+        if n_restored:
+            logging.warning(f"Recreated {n_restored} indexes of an interrupted run")
+
+        for table in tables:
+            indexes = secondary_indexes(con, table)
+
+            if not indexes:
+                continue
+
+            con.execute(
+                insert(index_table),
+                [
+                    {"index_name": name, "definition": definition}
+                    for name, definition in indexes.items()
+                ],
+            )
+
+            for name in indexes:
+                statement = f"DROP INDEX {name}"  # nosec -- name from the catalog
+                con.execute(text(statement))
+
+            n_deferred += len(indexes)
+
+    logging.info(f"Deferred {n_deferred} indexes of the result tables")
+
+    try:
+        yield
+    finally:
+        with omopdb.begin() as con:
+            n_created = recreate_deferred_indexes(con)
+
+            for table in tables:
+                table_name = con.dialect.identifier_preparer.format_table(table)
+                con.execute(text(f"ANALYZE {table_name}"))  # nosec
+
+        logging.info(f"Recreated {n_created} indexes of the result tables")
@@ -0,0 +1,328 @@
+"""
+Time-sliced execution of recommendations over long observation windows.
+
+The memory required to execute a recommendation grows with the length of the observation window (e.g. open-ended
+postoperative windows split into per-day intervals). A sliced execution processes the observation window in
+consecutive slices (e.g. one month each); each slice is executed as a separate run whose results are clipped to the
+slice and moved into a single target run, so the results are written per slice and memory stays bounded by the
+slice length.
+
+Carry-over between slices:
+
+- The per-person anchors (first surgery, first dexmedetomidine administration, perioperative windows, delirium
+  score measurements) do not depend on the observation window and are staged once for all slices.
+- Each slice is executed with its start extended by a lookback period (default: 44 days, the longest preoperative
+  window), so that temporal counts within windows starting before the slice (e.g. "at least once during the
+  preoperative phase") see the events of the preceding slice. The results of the lookback period are discarded.
+- Result intervals that end at a slice boundary and continue in the next slice (same person, PI pair, criterion,
+  cohort category, type and ratio) are merged into a single interval.
+
+Only recommendations whose temporal counts are evaluated within windows no longer than the lookback period can be
+sliced: interval criteria declare the maximum length of their windows as `max_window` (e.g. perioperative phases,
+an `And` of interval criteria is bounded by its shortest member), time-of-day, per-day and per-shift windows are at
+most one day long. Temporal counts over windows that may be longer (e.g. `AnyTime(...)`, which counts over the whole
+observation window, or windows open until the end of the observation window) would only see the events of the
+lookback period and the slice itself, so `execute_sliced` refuses to slice such recommendations. Slices start at
+midnight, so per-day intervals (`Day(...)`) are never split.
+"""
+
+import datetime
+import logging
+from typing import Any
+
+import pendulum
+from execution_engine.clients import omopdb
+from execution_engine.omop import cohort
+from execution_engine.omop.db.celida.tables import ExecutionRun, ResultInterval
+from execution_engine.util import logic
+from sqlalchemy import (
+    Connection,
+    and_,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+)
+
+from digipod.criterion.perioperative import DEFAULT_MAX_DAYS_BEFORE_SURGERY
+from digipod.criterion.registry import iterate_expressions
+from digipod.runner.results import delete_runs
+
+# the longest preoperative window (see criterion/perioperative.py)
+DEFAULT_LOOKBACK = datetime.timedelta(days=DEFAULT_MAX_DAYS_BEFORE_SURGERY + 2)
+
+ONE_SECOND = datetime.timedelta(seconds=1)
+
+ONE_DAY = datetime.timedelta(days=1)
+
+
+def _max_window(interval_criterion: Any) -> datetime.timedelta | None:
+    if isinstance(interval_criterion, logic.And):
+        # the intersection is not longer than the shortest bounded window
+        windows = [
+            window
+            for window in map(_max_window, interval_criterion.args)
+            if window is not None
+        ]
+        return min(windows, default=None)
+
+    return getattr(interval_criterion, "max_window", None)
+
+
+def max_count_window(expr: logic.TemporalCount) -> datetime.timedelta | None:
+    """
+    Get the maximum length of the windows a temporal count is evaluated in.
+
+    :param expr: The temporal count.
+    :return: The maximum length, or None if the windows may span the whole observation window.
+    """
+    interval_criterion = getattr(expr, "interval_criterion", None)
+
+    if interval_criterion is not None:
+        return _max_window(interval_criterion)
+
+    if (
+        getattr(expr, "start_time", None) is not None
+        or getattr(expr, "end_time", None) is not None
+    ):
+        # time of day windows (e.g. shifts)
+        return ONE_DAY
+
+    interval_type = getattr(expr, "interval_type", None)
+
+    if interval_type is not None and interval_type.name != "ANY_TIME":
+        # per day windows
+        return ONE_DAY
+
+    return None
+
+
+def window_spanning_counts(
+    recommendation: cohort.Recommendation, lookback: datetime.timedelta
+) -> list[logic.TemporalCount]:
+    """
+    Get the temporal counts of a recommendation whose windows may be longer than the lookback period.
+
+    :param recommendation: The recommendation.
+    :param lookback: The lookback period of the slices.
+    :return: The temporal counts that cannot be evaluated in time slices.
+    """
+    spanning = []
+
+    for expr in iterate_expressions(recommendation):
+        if not isinstance(expr, logic.TemporalCount):
+            continue
+
+        max_window = max_count_window(expr)
+
+        if max_window is None or max_window > lookback:
+            spanning.append(expr)
+
+    return spanning
+
+
+def time_slices(
+    start_datetime: datetime.datetime,
+    end_datetime: datetime.datetime,
+    months: int = 1,
+) -> list[tuple[datetime.datetime, datetime.datetime]]:
+    """
+    Split an observation window into consecutive slices of the given number of calendar months.
+
+    The first slice starts at start_datetime, all following slices start at midnight of the first day of a month
+    (in the timezone of start_datetime). The end of each slice is one second before the start of the next slice
+    (the end of the observation window is inclusive).
+
+    :param start_datetime: The start of the observation window.
+    :param end_datetime: The end of the observation window.
+    :param months: The length of the slices in months.
+    :return: The (start, end) of each slice.
+    """
+    if months < 1:
+        raise ValueError("months must be at least 1")
+
+    slices = []
+    slice_start = pendulum.instance(start_datetime)
+
+    while slice_start <= end_datetime:
+        next_start = slice_start.start_of("month").add(months=months)
+        slice_end = min(next_start - ONE_SECOND, end_datetime)
+        slices.append((slice_start, slice_end))
+        slice_start = next_start
+
+    return slices
+
+
+def _key_columns() -> list[str]:
+    table = ResultInterval.__table__
+
+    return [
+        c.name
+        for c in table.columns
+        if not c.primary_key
+        and c.name not in ("run_id", "interval_start", "interval_end")
+    ]
+
+
+def move_clipped_results(
+    con: Connection,
+    target_run_id: int,
+    source_run_id: int,
+    slice_start: datetime.datetime,
+    slice_end: datetime.datetime,
+) -> int:
+    """
+    Move the results of a slice run, clipped to the slice, into the target run and delete the slice run.
+
+    :return: The number of moved result rows.
+    """
+    table = ResultInterval.__table__
+    columns = [table.c[name] for name in _key_columns()]
+
+    query = select(
+        literal(target_run_id).label("run_id"),
+        *columns,
+        func.greatest(table.c.interval_start, slice_start).label("interval_start"),
+        func.least(table.c.interval_end, slice_end).label("interval_end"),
+    ).where(
+        table.c.run_id == source_run_id,
+        table.c.interval_start <= slice_end,
+        table.c.interval_end >= slice_start,
+    )
+
+    result = con.execute(
+        insert(table).from_select(
+            ["run_id", *[c.name for c in columns], "interval_start", "interval_end"],
+            query,
+        )
+    )
+
+    delete_runs(con, [source_run_id])
+
+    return result.rowcount
+
+
+def merge_boundary_intervals(
+    con: Connection, run_id: int, boundary: datetime.datetime
+) -> int:
+    """
+    Merge the result intervals that end right before the boundary with their continuation starting at the boundary.
+
+    :param con: The database connection (within a transaction).
+    :param run_id: The run.
+    :param boundary: The start of a slice.
+    :return: The number of merged intervals.
+    """
+    table = ResultInterval.__table__
+    (pk,) = table.primary_key.columns
+    a = table.alias("a")
+    b = table.alias("b")
+
+    continuation = (
+        select(a.c[pk.name].label("a_id"), b.c[pk.name].label("b_id"))
+        .join_from(
+            a,
+            b,
+            and_(
+                b.c.run_id == a.c.run_id,
+                *[b.c[name].is_not_distinct_from(a.c[name]) for name in _key_columns()],
+            ),
+        )
+        .where(
+            a.c.run_id == run_id,
+            a.c.interval_end == boundary - ONE_SECOND,
+            b.c.interval_start == boundary,
+        )
+        .subquery("continuation")
+    )
+
+    # delete the continuations and extend the intervals they continue in a single statement
+    deleted = (
+        delete(table)
+        .where(table.c[pk.name] == continuation.c.b_id)
+        .returning(continuation.c.a_id, table.c.interval_end)
+        .cte("deleted_continuation")
+    )
+
+    n_merged = con.execute(
+        update(table)
+        .where(table.c[pk.name] == deleted.c.a_id)
+        .values(interval_end=deleted.c.interval_end)
+    ).rowcount
+
+    return n_merged
+
+
+def execute_sliced(
+    engine: Any,
+    recommendation: cohort.Recommendation,
+    start_datetime: datetime.datetime,
+    end_datetime: datetime.datetime,
+    months: int = 1,
+    lookback: datetime.timedelta = DEFAULT_LOOKBACK,
+) -> int:
+    """
+    Execute a recommendation in consecutive time slices (see module docstring).
+
+    :param engine: The ExecutionEngine.
+    :param recommendation: The recommendation.
+    :param start_datetime: The start of the observation window.
+    :param end_datetime: The end of the observation window.
+    :param months: The length of the slices in months.
+    :param lookback: The period before each slice that is executed with the slice (and discarded).
+    :return: The run_id of the run that holds the results of the whole observation window.
+    :raises ValueError: If the recommendation has temporal counts over windows longer than the lookback period.
+    """
+    spanning = window_spanning_counts(recommendation, lookback)
+
+    if spanning:
+        raise ValueError(
+            f'Cannot execute "{recommendation.name}" in time slices: '
+            f"{len(spanning)} temporal counts are evaluated within windows that may be longer than the lookback "
+            f"period of {lookback} ({', '.join(sorted({str(expr) for expr in spanning}))})"
+        )
+
+    target_run_id: int | None = None
+
+    for slice_start, slice_end in time_slices(start_datetime, end_datetime, months):
+        execution_start = max(slice_start - lookback, start_datetime)
+
+        run_id = engine.execute(
+            recommendation, start_datetime=execution_start, end_datetime=slice_end
+        )
+
+        if target_run_id is None:
+            # the first slice starts at the start of the observation window (no lookback)
+            target_run_id = run_id
+        else:
+            with omopdb.begin() as con:
+                n_rows = move_clipped_results(
+                    con, target_run_id, run_id, slice_start, slice_end
+                )
+                n_merged = merge_boundary_intervals(con, target_run_id, slice_start)
+
+            logging.debug(
+                f"Moved {n_rows} rows, merged {n_merged} intervals at {slice_start}"
+            )
+
+        logging.info(
+            f'Executed slice {slice_start} - {slice_end} of "{recommendation.name}"'
+        )
+
+    assert target_run_id is not None
+
+    table = ExecutionRun.__table__
+
+    with omopdb.begin() as con:
+        con.execute(
+            update(table)
+            .where(table.c.run_id == target_run_id)
+            .values(
+                observation_start_datetime=start_datetime,
+                observation_end_datetime=end_datetime,
+            )
+        )
+
+    return target_run_id
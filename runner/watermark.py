@@ -0,0 +1,144 @@
+"""
+Cheap change watermarks of the OMOP source tables.
+
+The watermark of a table is derived from PostgreSQL's cumulative statistics (number of inserted, updated and
+deleted tuples), which is available without scanning the table. Any write to a table changes its watermark.
+
+The counters are reset by pg_stat_reset() (and pg_stat_reset_single_table_counters()), after which they can reach
+the values of an earlier watermark again although the data has changed. The data watermark therefore also includes
+the time of the last statistics reset of the database (`pg_stat_database.stats_reset`).
+
+Note: The statistics are collected asynchronously and may lag behind by a few hundred milliseconds.
+
+Time-dependent criteria (`time_dependent = True`, e.g. `AgeLimitPatient`, which is evaluated at the current date)
+can change their results without any write to the tables. They provide `changed_persons(since, until)`, the persons
+whose results change between two evaluation times (see `query_time_dependent_changes`).
+"""
+
+import datetime
+import hashlib
+import json
+
+from execution_engine.omop import cohort
+from execution_engine.omop.criterion.abstract import Criterion
+from execution_engine.omop.db.omop.schema import SCHEMA_NAME as OMOP_SCHEMA_NAME
+from sqlalchemy import Connection, Select, select, text, union
+
+from digipod.criterion.registry import iterate_criteria
+
+# tables that are read by the DigiPOD criteria
+SOURCE_TABLES = [
+    "person",
+    "visit_occurrence",
+    "visit_detail",
+    "procedure_occurrence",
+    "measurement",
+    "observation",
+    "drug_exposure",
+    "condition_occurrence",
+    "device_exposure",
+]
+
+# vocabulary tables that the criteria expand their concepts with (e.g. concept_ancestor for concept sets)
+VOCABULARY_TABLES = [
+    "concept",
+    "concept_ancestor",
+    "concept_relationship",
+]
+
+
+def table_watermarks(
+    con: Connection, tables: list[str] | None = None
+) -> dict[str, list[int]]:
+    """
+    Get the watermark of each source table.
+
+    :param con: The database connection.
+    :param tables: The tables (in the OMOP CDM schema). Defaults to all source tables.
+    :return: A mapping of table name to [inserted, updated, deleted] tuple counts.
+    """
+    if tables is None:
+        tables = SOURCE_TABLES
+
+    rows = con.execute(
+        text(
+            "SELECT relname, n_tup_ins, n_tup_upd, n_tup_del "
+            "FROM pg_stat_all_tables "
+            "WHERE schemaname = :schema AND relname = ANY(:tables)"
+        ),
+        {"schema": OMOP_SCHEMA_NAME, "tables": tables},
+    ).fetchall()
+
+    watermarks = {table: [0, 0, 0] for table in tables}
+
+    for relname, n_ins, n_upd, n_del in rows:
+        watermarks[relname] = [n_ins, n_upd, n_del]
+
+    return watermarks
+
+
+def stats_reset(con: Connection) -> str | None:
+    """
+    Get the time of the last reset of the statistics of the current database.
+
+    :param con: The database connection.
+    :return: The time (ISO format), or None if the statistics have never been reset.
+    """
+    value = con.execute(
+        text(
+            "SELECT stats_reset FROM pg_stat_database "
+            "WHERE datname = current_database()"
+        )
+    ).scalar_one_or_none()
+
+    return None if value is None else value.isoformat()
+
+
+def data_watermark(con: Connection, tables: list[str] | None = None) -> str:
+    """
+    Get a single watermark over all source tables.
+
+    :param con: The database connection.
+    :param tables: The tables (in the OMOP CDM schema). Defaults to all source tables.
+    :return: A hash that changes whenever any of the tables is written to or the statistics are reset.
+    """
+    watermark = {
+        "tables": table_watermarks(con, tables),
+        "stats_reset": stats_reset(con),
+    }
+
+    return hashlib.sha256(json.dumps(watermark, sort_keys=True).encode()).hexdigest()
+
+
+def time_dependent_criteria(recommendation: cohort.Recommendation) -> list[Criterion]:
+    """
+    Get the criteria of a recommendation whose results depend on the current time (`time_dependent` attribute).
+    """
+    return [
+        criterion
+        for criterion in iterate_criteria(recommendation)
+        if getattr(criterion, "time_dependent", False)
+    ]
+
+
+def query_time_dependent_changes(
+    criteria: list[Criterion], since: datetime.datetime, until: datetime.datetime
+) -> Select:
+    """
+    Get the persons whose results of the given time-dependent criteria change between two evaluation times,
+    without any change of their data.
+
+    :param criteria: The time-dependent criteria (see `time_dependent_criteria`).
+    :param since: The evaluation time of the earlier run.
+    :param until: The evaluation time of the current run.
+    :return: A query returning the person_id of the changed persons.
+    """
+    if not criteria:
+        raise ValueError("At least one time-dependent criterion is required")
+
+    queries = [criterion.changed_persons(since, until) for criterion in criteria]
+
+    if len(queries) == 1:
+        return queries[0]
+
+    return select(union(*queries).subquery("time_dependent_change"))
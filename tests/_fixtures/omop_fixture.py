@@ -1,7 +1,11 @@
 import datetime
+import hashlib
+import itertools
+import json
 import logging
 import os
 from contextlib import contextmanager
+from typing import Any, Iterator
 from urllib.parse import quote
 
 import pandas as pd
@@ -10,6 +14,7 @@ import sqlalchemy
 from execution_engine.util.types.timerange import TimeRange
 from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm.session import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 logging.basicConfig()
 logger = logging.getLogger()
@@ -17,6 +22,73 @@ logger.setLevel(logging.DEBUG)
 
 TIMEZONE = "Europe/Berlin"
 
+# comment of the template databases created by save_template (only those are dropped when outdated, see conftest.py)
+TEMPLATE_COMMENT = "digipod test template"
+
+# vocabulary tables that are loaded from tests/_testdata/omop_cdm
+SEED_TABLES = [
+    "concept",
+    "concept_relationship",
+    "concept_ancestor",
+    "drug_strength",
+]
+
+
+def seed_hash() -> str:
+    """
+    Hash of everything that determines the seeded test database: the engine version (schema), the vocabulary CSVs,
+    the DigiPOD concepts and the seeding code in this module.
+    """
+    import execution_engine
+
+    from digipod.terminology.vocabulary import DigiPOD
+
+    h = hashlib.sha256(execution_engine.__version__.encode())
+
+    for table in SEED_TABLES:
+        with open(f"tests/_testdata/omop_cdm/{table}.csv.gz", "rb") as f:
+            h.update(hashlib.file_digest(f, "sha256").digest())
+
+    concepts = [c.model_dump() for _, c in sorted(DigiPOD.map.items())]
+    h.update(json.dumps(concepts, sort_keys=True, default=str).encode())
+
+    with open(__file__, "rb") as f:
+        h.update(hashlib.file_digest(f, "sha256").digest())
+
+    return h.hexdigest()
+
+
+def save_template(engine: sqlalchemy.Engine, template: str) -> None:
+    """
+    Create the template database from the (seeded) database of the engine.
+
+    All connections to the database must be closed. If the template cannot be created (e.g. because another session
+    is connected), the next test session seeds its database again.
+    """
+    engine.dispose()
+
+    maintenance = create_engine(
+        engine.url.set(database="postgres"), isolation_level="AUTOCOMMIT"
+    )
+
+    try:
+        with maintenance.connect() as con:
+            con.execute(
+                text(
+                    f'CREATE DATABASE "{template}" TEMPLATE "{engine.url.database}"'  # nosec -- names from config
+                )
+            )
+            con.execute(
+                text(
+                    f"COMMENT ON DATABASE \"{template}\" IS '{TEMPLATE_COMMENT}'"  # nosec -- constants
+                )
+            )
+        logger.info(f"Created template database {template}.")
+    except sqlalchemy.exc.DBAPIError as e:
+        logger.warning(f"Could not create template database {template}: {e}")
+    finally:
+        maintenance.dispose()
+
 
 @contextmanager
 def disable_postgres_trigger(conn):
@@ -28,9 +100,10 @@ def disable_postgres_trigger(conn):
     conn.commit()
 
 
-@pytest.fixture(scope="session")
-def db_setup():
-    """Database Session for SQLAlchemy."""
+def seed_database(engine: sqlalchemy.Engine) -> None:
+    """
+    Create the OMOP and CELIDA schemas and load the test vocabulary and the DigiPOD concepts.
+    """
     # late import to prevent settings object being initialized before the test (and thus using the wrong settings)
     from execution_engine.omop.db.base import (  # noqa: F401 -- do not remove - needed for sqlalchemy to work
         Base,
@@ -39,27 +112,6 @@ def db_setup():
     from execution_engine.omop.db.celida.schema import SCHEMA_NAME as CELIDA_SCHEMA_NAME
     from execution_engine.omop.db.omop.schema import SCHEMA_NAME as OMOP_SCHEMA_NAME
 
-    pg_user = os.environ["CELIDA_EE_OMOP__USER"]
-    pg_password = os.environ["CELIDA_EE_OMOP__PASSWORD"]
-    pg_host = os.environ["CELIDA_EE_OMOP__HOST"]
-    pg_port = os.environ["CELIDA_EE_OMOP__PORT"]
-    pg_db = os.environ["CELIDA_EE_OMOP__DATABASE"]
-
-    connection_str = f"postgresql+psycopg://{quote(pg_user)}:{quote(pg_password)}@{pg_host}:{pg_port}/{pg_db}"
-    engine = create_engine(connection_str)
-
-    @event.listens_for(engine, "connect")
-    def set_timezone(dbapi_connection, connection_record) -> None:
-        """
-        Set the timezone for the database connection.
-        """
-        cursor = dbapi_connection.cursor()
-        cursor.execute(
-            "SELECT set_config('TIMEZONE', %(timezone)s, false)",
-            {"timezone": TIMEZONE},
-        )
-        cursor.close()
-
     with engine.begin() as con:
         if not con.dialect.has_schema(con, CELIDA_SCHEMA_NAME):
             con.execute(sqlalchemy.schema.CreateSchema(CELIDA_SCHEMA_NAME))
@@ -70,12 +122,7 @@ def db_setup():
             metadata.create_all(con)
             logger.info("Inserting test data into the database.")
 
-            for table in [
-                "concept",
-                "concept_relationship",
-                "concept_ancestor",
-                "drug_strength",
-            ]:
+            for table in SEED_TABLES:
                 df = pd.read_csv(
                     f"tests/_testdata/omop_cdm/{table}.csv.gz",
                     na_values=[""],
@@ -92,16 +139,16 @@ def db_setup():
         with disable_postgres_trigger(con):
             from digipod.terminology.vocabulary import DigiPOD
 
-            for concept in DigiPOD.map.values():
-                insert_stmt = text(
-                    f"INSERT INTO {OMOP_SCHEMA_NAME}.concept ("  # nosec  -- we need to insert the schema name here
-                    "concept_id, concept_name, domain_id, vocabulary_id, concept_class_id, standard_concept, concept_code, valid_start_date, valid_end_date, invalid_reason"
-                    ") VALUES ("
-                    ":concept_id, :concept_name, :domain_id, :vocabulary_id, :concept_class_id, :standard_concept, :concept_code, :valid_start_date, :valid_end_date, :invalid_reason"
-                    ")"
-                )
-                con.execute(
-                    insert_stmt,
+            insert_stmt = text(
+                f"INSERT INTO {OMOP_SCHEMA_NAME}.concept ("  # nosec  -- we need to insert the schema name here
+                "concept_id, concept_name, domain_id, vocabulary_id, concept_class_id, standard_concept, concept_code, valid_start_date, valid_end_date, invalid_reason"
+                ") VALUES ("
+                ":concept_id, :concept_name, :domain_id, :vocabulary_id, :concept_class_id, :standard_concept, :concept_code, :valid_start_date, :valid_end_date, :invalid_reason"
+                ")"
+            )
+            con.execute(
+                insert_stmt,
+                [
                     {
                         "concept_id": concept.concept_id,
                         "concept_name": concept.concept_name,
@@ -113,8 +160,48 @@ def db_setup():
                         "valid_start_date": datetime.date(2024, 1, 1),
                         "valid_end_date": datetime.date(2099, 12, 31),
                         "invalid_reason": None,
-                    },
-                )
+                    }
+                    for concept in DigiPOD.map.values()
+                ],
+            )
+
+
+@pytest.fixture(scope="session")
+def db_setup():
+    """Database Session for SQLAlchemy."""
+    # late import to prevent settings object being initialized before the test (and thus using the wrong settings)
+    from execution_engine.omop.db.base import (  # noqa: F401 -- do not remove - needed for sqlalchemy to work
+        Base,
+        metadata,
+    )
+
+    pg_user = os.environ["CELIDA_EE_OMOP__USER"]
+    pg_password = os.environ["CELIDA_EE_OMOP__PASSWORD"]
+    pg_host = os.environ["CELIDA_EE_OMOP__HOST"]
+    pg_port = os.environ["CELIDA_EE_OMOP__PORT"]
+    pg_db = os.environ["CELIDA_EE_OMOP__DATABASE"]
+
+    connection_str = f"postgresql+psycopg://{quote(pg_user)}:{quote(pg_password)}@{pg_host}:{pg_port}/{pg_db}"
+    engine = create_engine(connection_str)
+
+    @event.listens_for(engine, "connect")
+    def set_timezone(dbapi_connection, connection_record) -> None:
+        """
+        Set the timezone for the database connection.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute(
+            "SELECT set_config('TIMEZONE', %(timezone)s, false)",
+            {"timezone": TIMEZONE},
+        )
+        cursor.close()
+
+    # the database was created from the template database of the current seed (see conftest.py)
+    if os.environ.get("DIGIPOD_TEST_DB_FROM_TEMPLATE") != "1":
+        seed_database(engine)
+
+        if template := os.environ.get("DIGIPOD_TEST_TEMPLATE_DB"):
+            save_template(engine, template)
 
     yield sessionmaker(bind=engine, expire_on_commit=False)
 
@@ -125,12 +212,147 @@ def truncate_tables(connection, schema_name, table_names):
         connection.execute(sql)
 
 
+class SharedConnection:
+    """
+    A DBAPI connection shared by all connections of an engine in `outer_transaction`.
+
+    commit(), rollback() and close() are no-ops, such that the outer transaction is neither ended by the
+    transactions of the engine's connections (which are SAVEPOINTs) nor by the pool.
+    """
+
+    def __init__(self, dbapi_connection: Any) -> None:
+        object.__setattr__(self, "_connection", dbapi_connection)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._connection, name, value)
+
+    def commit(self) -> None:
+        """
+        Keep the outer transaction open (the savepoint is released in the commit event).
+        """
+
+    def rollback(self) -> None:
+        """
+        Keep the outer transaction open (the savepoint is rolled back in the rollback event).
+        """
+
+    def close(self) -> None:
+        """
+        Keep the connection open (it is returned to the pool of the engine by `outer_transaction`).
+        """
+
+
+@contextmanager
+def outer_transaction(engine: sqlalchemy.Engine) -> Iterator[None]:
+    """
+    Run all statements on the engine in one transaction that is rolled back at the end.
+
+    Within the context, all connections of the engine share one of its DBAPI connections (the outer transaction),
+    and the transaction of each connection is a SAVEPOINT with its own name: a commit releases the savepoint (the
+    changes stay visible to all connections of the engine), a rollback rolls back to it.
+
+    The transactions of different connections need not be nested strictly. Savepoints are released in stack
+    order, i.e. a commit is deferred until the later savepoints are released as well. A rollback also rolls back
+    the changes made after the savepoint by other connections (and discards their savepoints, their commit or
+    rollback is a no-op then).
+    """
+    raw = engine.raw_connection()
+    dbapi_connection = raw.driver_connection
+    shared = SharedConnection(dbapi_connection)
+    pool = engine.pool
+
+    # the open savepoints (oldest first), the savepoint of each connection and the committed savepoints that are
+    # released once the later ones are released
+    savepoints: list[str] = []
+    savepoint_of: dict[sqlalchemy.Connection, str] = {}
+    committed: set[str] = set()
+    names = itertools.count()
+
+    def execute(statement: str) -> None:
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute(statement)
+
+    def release_committed() -> None:
+        while savepoints and savepoints[-1] in committed:
+            name = savepoints.pop()
+            committed.discard(name)
+            execute(f"RELEASE SAVEPOINT {name}")
+
+    def begin(con: sqlalchemy.Connection) -> None:
+        name = f"test_transaction_{next(names)}"
+        execute(f"SAVEPOINT {name}")
+        savepoints.append(name)
+        savepoint_of[con] = name
+
+    def commit(con: sqlalchemy.Connection) -> None:
+        name = savepoint_of.pop(con, None)
+
+        if name is not None:
+            committed.add(name)
+            release_committed()
+
+    def rollback(con: sqlalchemy.Connection) -> None:
+        name = savepoint_of.pop(con, None)
+
+        if name is None:
+            return
+
+        index = savepoints.index(name)
+        execute(f"ROLLBACK TO SAVEPOINT {name}")
+        execute(f"RELEASE SAVEPOINT {name}")
+
+        # the later savepoints are gone as well
+        discarded = set(savepoints[index:])
+        del savepoints[index:]
+        committed.difference_update(discarded)
+        for other, other_name in list(savepoint_of.items()):
+            if other_name in discarded:
+                del savepoint_of[other]
+
+        release_committed()
+
+    events = {"begin": begin, "commit": commit, "rollback": rollback}
+
+    engine.pool = StaticPool(
+        creator=lambda: shared, reset_on_return=None, dialect=engine.dialect
+    )
+    for identifier, fn in events.items():
+        event.listen(engine, identifier, fn)
+
+    try:
+        yield
+    finally:
+        for identifier, fn in events.items():
+            event.remove(engine, identifier, fn)
+        engine.pool = pool
+
+        dbapi_connection.rollback()
+        raw.close()
+
+
 @pytest.fixture(scope="function")
-def db_session(db_setup):
+def db_session(db_setup, request):
     # late import to prevent settings object being initialized before the test (and thus using the wrong settings)
+    from execution_engine.clients import omopdb
     from execution_engine.omop.db.celida.schema import SCHEMA_NAME as CELIDA_SCHEMA_NAME
     from execution_engine.omop.db.omop.schema import SCHEMA_NAME as OMOP_SCHEMA_NAME
 
+    if request.config.getoption("--db-isolation") == "savepoint":
+        # the test session and the execution engine share the outer transaction, which is rolled back afterwards
+        with omopdb.connect() as con:
+            engine = con.engine
+
+        with outer_transaction(engine):
+            session = db_setup(bind=engine)
+            try:
+                yield session
+            finally:
+                session.close()
+        return
+
     session = db_setup()
     try:
         yield session
@@ -0,0 +1,177 @@
+"""
+Bulk loading of test and synthetic patients with PostgreSQL COPY.
+
+Adding the ORM objects of each patient to a session inserts them one statement at a time (and the person has to
+be flushed first to get its id). `load_patients` instead collects the objects of any number of patients into
+columnar buffers per OMOP table, reserves all person ids with one query and writes each table with COPY (see
+runner/sink.py).
+"""
+
+import dataclasses
+import decimal
+from typing import Any, Iterable
+
+from sqlalchemy import Column, Connection, Numeric, Table, inspect, text
+
+from digipod.runner.sink import copy_rows
+from digipod.tests.recommendation.utils import Patient
+
+
+def python_default(column: Column) -> Any:
+    """
+    Evaluate the Python-side (scalar or callable) default of a column.
+
+    Callables are invoked without execution context. SQL expression and sequence defaults are left to the database
+    (see `TableBuffer.copy`).
+
+    :return: The default value, or None if the column has no Python-side default.
+    """
+    default = column.default
+
+    if default is None:
+        return None
+    if default.is_scalar:
+        return default.arg
+    if default.is_callable:
+        return default.arg(None)
+
+    return None
+
+
+@dataclasses.dataclass
+class TableBuffer:
+    """
+    The column values of all objects of one table (in the order of the table's columns).
+    """
+
+    table: Table
+    columns: list[Column]
+    values: dict[str, list[Any]]
+
+    @classmethod
+    def for_object(cls, obj: Any) -> "TableBuffer":
+        """
+        Create an empty buffer for the table of an ORM object.
+        """
+        table = obj.__table__
+        # primary keys are assigned by the database (except for the person, see load_patients)
+        columns = [
+            c for c in table.columns if not c.primary_key or c.name == "person_id"
+        ]
+
+        return cls(table=table, columns=columns, values={c.name: [] for c in columns})
+
+    def append(self, obj: Any) -> None:
+        """
+        Append the column values of an ORM object.
+
+        Attributes that were never set are filled with the Python-side default of their column, as the ORM does on
+        insert.
+        """
+        mapper = inspect(type(obj))
+        state = inspect(obj)
+
+        for column in self.columns:
+            key = mapper.get_property_by_column(column).key
+
+            if key in state.dict:
+                value = state.dict[key]
+            else:
+                value = python_default(column)
+
+            if (
+                isinstance(value, float)
+                and isinstance(column.type, Numeric)
+                and column.type.asdecimal
+            ):
+                value = decimal.Decimal(repr(value))
+
+            self.values[column.name].append(value)
+
+    def copy(self, con: Connection) -> int:
+        """
+        Write the buffered rows with COPY. Columns that are NULL in all rows and have a default are omitted, such
+        that server-side, SQL expression and sequence defaults are applied by the database.
+        """
+        columns = [
+            c.name
+            for c in self.columns
+            if (c.server_default is None and c.default is None)
+            or any(value is not None for value in self.values[c.name])
+        ]
+        rows = zip(*(self.values[name] for name in columns))
+
+        return copy_rows(con, self.table, columns, rows)
+
+
+def reserve_person_ids(con: Connection, n: int) -> list[int]:
+    """
+    Reserve n person ids from the sequence of person.person_id (or after the largest existing id, if the column has
+    no sequence).
+    """
+    from execution_engine.omop.db.omop.schema import SCHEMA_NAME as OMOP_SCHEMA_NAME
+
+    sequence = con.execute(
+        text("SELECT pg_get_serial_sequence(:table, 'person_id')"),
+        {"table": f"{OMOP_SCHEMA_NAME}.person"},
+    ).scalar_one()
+
+    if sequence is not None:
+        return list(
+            con.execute(
+                text(
+                    "SELECT nextval(CAST(:sequence AS regclass)) "
+                    "FROM generate_series(1, :n)"
+                ),
+                {"sequence": sequence, "n": n},
+            ).scalars()
+        )
+
+    max_id = con.execute(
+        text(
+            f"SELECT coalesce(max(person_id), 0) FROM {OMOP_SCHEMA_NAME}.person"  # nosec -- constant schema name
+        )
+    ).scalar_one()
+
+    return list(range(max_id + 1, max_id + 1 + n))
+
+
+def load_patients(con: Connection, patients: Iterable[Patient]) -> dict[str, int]:
+    """
+    Write the persons and all objects of the patients with one COPY per table.
+
+    The person ids are reserved in bulk and assigned to the persons and their objects (as in
+    `TestRecommendationBase.commit_patient`).
+
+    :param con: The database connection (psycopg driver, within a transaction).
+    :param patients: The patients.
+    :return: The number of written rows per table.
+    """
+    patients = list(patients)
+
+    if not patients:
+        return {}
+
+    person_ids = reserve_person_ids(con, len(patients))
+    buffers: dict[str, TableBuffer] = {}
+
+    def buffer(obj: Any) -> TableBuffer:
+        name = obj.__table__.name
+
+        if name not in buffers:
+            buffers[name] = TableBuffer.for_object(obj)
+
+        return buffers[name]
+
+    for patient, person_id in zip(patients, person_ids):
+        patient.person.person_id = person_id
+        buffer(patient.person).append(patient.person)
+
+        for obj in patient.yield_objects():
+            obj.person_id = person_id
+            buffer(obj).append(obj)
+
+    # the person table first (foreign keys of the other tables)
+    order = sorted(buffers, key=lambda name: name != "person")
+
+    return {name: buffers[name].copy(con) for name in order}
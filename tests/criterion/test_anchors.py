@@ -0,0 +1,86 @@
+from collections import Counter
+
+import pandas as pd
+from sqlalchemy import select
+
+from digipod.criterion.anchors import (
+    materialize_anchors,
+    registered_anchors,
+    reset_anchors,
+)
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.recommendation.utils import perioperative_cohort
+
+
+def execute_staged(engine, recommendation, start_datetime, end_datetime):
+    """
+    Execute a recommendation with all anchors read from their staging tables.
+    """
+    from execution_engine.clients import omopdb
+
+    with omopdb.begin() as con:
+        materialize_anchors(con)
+
+    try:
+        return engine.execute(
+            recommendation, start_datetime=start_datetime, end_datetime=end_datetime
+        )
+    finally:
+        reset_anchors()
+
+
+class AnchorEquivalence(TestRecommendationBase):
+    """
+    Staged anchors must yield the same results as the inline anchor subqueries.
+    """
+
+    def teardown_method(self, method):
+        reset_anchors()
+        super().teardown_method(method)
+
+    def test_staging_table_equals_query(self):
+        from execution_engine.clients import omopdb
+
+        self.commit_patients(perioperative_cohort())
+
+        with omopdb.begin() as con:
+            for anchor in registered_anchors():
+                expected = Counter(map(tuple, con.execute(anchor.query())))
+                anchor.materialize(con)
+                staged = Counter(map(tuple, con.execute(select(anchor.table))))
+
+                assert anchor.materialized
+                assert staged == expected, anchor.name
+
+    def test_staged_equals_inline(self):
+        self.commit_patients(perioperative_cohort())
+
+        inline = self.fetch_run(self.execute())
+        staged = self.fetch_run(self.execute(execute_staged))
+
+        assert not inline.empty
+        pd.testing.assert_frame_equal(staged, inline)
+
+
+class TestAnchors_0_1(AnchorEquivalence):
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_0_1
+
+        self.recommendation = recommendation_0_1.rec_0_1_Delirium_Screening
+        super().setup_method(method)
+
+
+class TestAnchors_0_2(AnchorEquivalence):
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_0_2
+
+        self.recommendation = recommendation_0_2.rec_0_2_Delirium_Screening_double
+        super().setup_method(method)
+
+
+class TestAnchors_4_3(AnchorEquivalence):
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_4_3
+
+        self.recommendation = recommendation_4_3.recommendation
+        super().setup_method(method)
@@ -0,0 +1,170 @@
+import datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy import delete, insert, or_
+
+from digipod.criterion.concept_set import ConditionConceptSet
+from digipod.tests.criterion.test_scores import recommendation_results
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.recommendation.utils import (
+    AdultPatient,
+    single_pair_recommendation,
+)
+
+# a (synthetic) descendant of the SNOMED dementia concept
+DEMENTIA_DESCENDANT_ID = 2_099_999_001
+
+
+def dementia_concepts():
+    from digipod.criterion.non_pharma_measures import (
+        DEMENTIA,
+        DEMENTIA_IN_OTHER_DISEASES,
+        DEMENTIA_IN_OTHER_DISEASES_UNSPECIFIED_SEVERITY,
+        DEMENTIA_UNSPECIFIED,
+        VASCULAR_DEMENTIA,
+    )
+
+    return [
+        DEMENTIA,
+        VASCULAR_DEMENTIA,
+        DEMENTIA_IN_OTHER_DISEASES,
+        DEMENTIA_IN_OTHER_DISEASES_UNSPECIFIED_SEVERITY,
+        DEMENTIA_UNSPECIFIED,
+    ]
+
+
+def patient_with_condition(concept_id: int) -> AdultPatient:
+    patient = AdultPatient()
+    patient.add_condition(
+        concept_id, "2024-12-02 10:00:00+01:00", "2024-12-03 10:00:00+01:00"
+    )
+
+    return patient
+
+
+class TestConditionConceptSet(TestRecommendationBase):
+    @pytest.fixture(autouse=True)
+    def _dementia_descendant(self, db_session):
+        from execution_engine.clients import omopdb
+        from execution_engine.omop.db.omop.tables import Concept, ConceptAncestor
+
+        dementia = dementia_concepts()[0]
+        concept = Concept.__table__
+        ancestor = ConceptAncestor.__table__
+
+        with omopdb.begin() as con:
+            con.execute(
+                insert(concept).values(
+                    concept_id=DEMENTIA_DESCENDANT_ID,
+                    concept_name="Dementia (test descendant)",
+                    domain_id=dementia.domain_id,
+                    vocabulary_id=dementia.vocabulary_id,
+                    concept_class_id=dementia.concept_class_id,
+                    standard_concept="S",
+                    concept_code="digipod-test-dementia",
+                    valid_start_date=datetime.date(1970, 1, 1),
+                    valid_end_date=datetime.date(2099, 12, 31),
+                    invalid_reason=None,
+                )
+            )
+            con.execute(
+                insert(ancestor),
+                [
+                    {
+                        "ancestor_concept_id": ancestor_id,
+                        "descendant_concept_id": DEMENTIA_DESCENDANT_ID,
+                        "min_levels_of_separation": levels,
+                        "max_levels_of_separation": levels,
+                    }
+                    for ancestor_id, levels in [
+                        (dementia.concept_id, 1),
+                        (DEMENTIA_DESCENDANT_ID, 0),
+                    ]
+                ],
+            )
+
+        yield
+
+        with omopdb.begin() as con:
+            con.execute(
+                delete(ancestor).where(
+                    or_(
+                        ancestor.c.ancestor_concept_id == DEMENTIA_DESCENDANT_ID,
+                        ancestor.c.descendant_concept_id == DEMENTIA_DESCENDANT_ID,
+                    )
+                )
+            )
+            con.execute(
+                delete(concept).where(concept.c.concept_id == DEMENTIA_DESCENDANT_ID)
+            )
+
+    def execute_criterion(self, name, criterion) -> pd.DataFrame:
+        self.recommendation = single_pair_recommendation(name, criterion, criterion)
+
+        return recommendation_results(self.fetch_run(self.execute()))
+
+    def population_persons(self, criterion) -> set[int]:
+        from execution_engine.util.interval import IntervalType
+
+        df = self.execute_criterion("concept-set-population", criterion)
+
+        return set(
+            df.loc[df["interval_type"] == IntervalType.POSITIVE.name, "person_id"]
+        )
+
+    def test_descendants(self):
+        dementia, vascular_dementia = dementia_concepts()[:2]
+        descendant = patient_with_condition(DEMENTIA_DESCENDANT_ID)
+        snomed = patient_with_condition(dementia.concept_id)
+        icd10 = patient_with_condition(vascular_dementia.concept_id)
+        other = patient_with_condition(dementia_concepts()[4].concept_id)
+
+        self.commit_patients([descendant, snomed, icd10, other])
+
+        def ids(*patients):
+            return {patient.person.person_id for patient in patients}
+
+        # the dementia definition includes the descendants of the concepts
+        assert self.population_persons(
+            ConditionConceptSet([dementia, vascular_dementia])
+        ) == ids(descendant, snomed, icd10)
+        assert self.population_persons(
+            ConditionConceptSet(
+                [dementia, vascular_dementia], include_descendants=False
+            )
+        ) == ids(snomed, icd10)
+
+    def test_equals_or_of_condition_occurrences(self):
+        from execution_engine.omop.criterion.condition_occurrence import (
+            ConditionOccurrence,
+        )
+        from execution_engine.util import logic
+
+        self.commit_patients(
+            [patient_with_condition(c.concept_id) for c in dementia_concepts()]
+            + [patient_with_condition(DEMENTIA_DESCENDANT_ID)]
+        )
+
+        expected = self.execute_criterion(
+            "concept-set-or",
+            logic.Or(
+                *[
+                    ConditionOccurrence(
+                        static=False,
+                        value_required=False,
+                        concept=concept,
+                        value=None,
+                        timing=None,
+                    )
+                    for concept in dementia_concepts()
+                ]
+            ),
+        )
+        concept_set = self.execute_criterion(
+            "concept-set",
+            ConditionConceptSet(dementia_concepts(), include_descendants=False),
+        )
+
+        assert not expected.empty
+        pd.testing.assert_frame_equal(concept_set, expected)
@@ -0,0 +1,111 @@
+import pandas as pd
+import pendulum
+import pytest
+from sqlalchemy import select, text
+
+from digipod.criterion.first_event import (
+    FIRST_EVENT_STRATEGY_ENV,
+    FirstEventStrategy,
+    ensure_first_event_index,
+    first_event_index_name,
+    get_first_event_strategy,
+    query_first_event,
+)
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.recommendation.utils import perioperative_cohort
+
+
+def test_strategy_from_environment(monkeypatch):
+    monkeypatch.delenv(FIRST_EVENT_STRATEGY_ENV, raising=False)
+    assert get_first_event_strategy() == FirstEventStrategy.ROW_NUMBER
+
+    monkeypatch.setenv(FIRST_EVENT_STRATEGY_ENV, "LATERAL")
+    assert get_first_event_strategy() == FirstEventStrategy.LATERAL
+
+    monkeypatch.setenv(FIRST_EVENT_STRATEGY_ENV, "sort")
+    with pytest.raises(ValueError, match=FIRST_EVENT_STRATEGY_ENV):
+        get_first_event_strategy()
+
+
+class TestFirstEvent(TestRecommendationBase):
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_0_2
+
+        self.recommendation = recommendation_0_2.rec_0_2_Delirium_Screening_double
+        super().setup_method(method)
+
+    @pytest.mark.parametrize("strategy", list(FirstEventStrategy))
+    def test_first_surgery(self, strategy):
+        from execution_engine.clients import omopdb
+        from execution_engine.omop.db.omop.tables import ProcedureOccurrence
+        from execution_engine.omop.vocabulary import OMOP_SURGICAL_PROCEDURE
+
+        patients = perioperative_cohort()
+        self.commit_patients(patients)
+
+        query = query_first_event(
+            ProcedureOccurrence.__table__.alias("po"),
+            concept_column="procedure_concept_id",
+            concept_id=OMOP_SURGICAL_PROCEDURE,
+            datetime_column="procedure_datetime",
+            columns=["procedure_datetime", "procedure_end_datetime"],
+            strategy=strategy,
+        )
+
+        with omopdb.begin() as con:
+            rows = con.execute(select(query.subquery())).all()
+
+        icu, normalward, two_surgeries, no_surgery = patients
+
+        expected = {
+            icu.person.person_id: "2024-12-01 09:00:00+01:00",
+            normalward.person.person_id: "2024-12-05 14:00:00+01:00",
+            two_surgeries.person.person_id: "2024-11-30 08:00:00+01:00",
+        }
+
+        assert {row.person_id: row.procedure_datetime for row in rows} == {
+            person_id: pendulum.parse(dt) for person_id, dt in expected.items()
+        }
+
+    @pytest.mark.parametrize(
+        "strategy", [FirstEventStrategy.DISTINCT_ON, FirstEventStrategy.LATERAL]
+    )
+    def test_recommendation_results(self, strategy, monkeypatch):
+        self.commit_patients(perioperative_cohort())
+
+        monkeypatch.setenv(FIRST_EVENT_STRATEGY_ENV, FirstEventStrategy.ROW_NUMBER)
+        row_number = self.fetch_run(self.execute())
+
+        monkeypatch.setenv(FIRST_EVENT_STRATEGY_ENV, strategy)
+        result = self.fetch_run(self.execute())
+
+        assert not row_number.empty
+        pd.testing.assert_frame_equal(result, row_number)
+
+    @pytest.mark.parametrize("strategy", list(FirstEventStrategy))
+    def test_ensure_first_event_index(self, strategy):
+        from execution_engine.clients import omopdb
+        from execution_engine.omop.db.omop.tables import ProcedureOccurrence
+
+        table = ProcedureOccurrence.__table__
+        index_name = first_event_index_name(table)
+
+        with omopdb.begin() as con:
+            uses_index = ensure_first_event_index(
+                con,
+                table,
+                concept_column="procedure_concept_id",
+                datetime_column="procedure_datetime",
+                strategy=strategy,
+            )
+            exists = con.execute(
+                text(
+                    "SELECT count(*) FROM pg_indexes "
+                    "WHERE schemaname = :schema AND indexname = :name"
+                ),
+                {"schema": table.schema, "name": index_name},
+            ).scalar_one()
+            con.execute(text(f"DROP INDEX IF EXISTS {table.schema}.{index_name}"))
+
+        assert uses_index == (strategy != FirstEventStrategy.ROW_NUMBER)
+        assert exists == int(uses_index)
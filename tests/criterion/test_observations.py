@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+from execution_engine.constants import CohortCategory
+
+from digipod.criterion.anchors import reset_anchors
+from digipod.tests.criterion.test_anchors import execute_staged
+from digipod.tests.criterion.test_scores import recommendation_results
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.recommendation.utils import (
+    ElderlyPatient,
+    single_pair_recommendation,
+)
+
+
+def anxiety_patient() -> ElderlyPatient:
+    """
+    A patient with two Faces Anxiety Scale assessments on 2024-12-02 and one on 2024-12-04.
+    """
+    from digipod.terminology.custom_concepts import FACES_ANXIETY_SCALE_SCORE
+
+    patient = ElderlyPatient()
+    patient.add_inpatient_visit(
+        start="2024-12-01 10:00:00+01:00", end="2024-12-08 12:00:00+01:00"
+    )
+
+    for time in [
+        "2024-12-02 09:00:00+01:00",
+        "2024-12-02 15:00:00+01:00",
+        "2024-12-04 11:00:00+01:00",
+    ]:
+        patient.add_measurement(FACES_ANXIETY_SCALE_SCORE.concept_id, time, 0)
+
+    return patient
+
+
+class TestFacesAnxietyScaleAssessmentDays(TestRecommendationBase):
+    def teardown_method(self, method):
+        reset_anchors()
+        super().teardown_method(method)
+
+    def positive_intervals(self, criterion, runner) -> list[tuple]:
+        from execution_engine.util.interval import IntervalType
+
+        self.recommendation = single_pair_recommendation(
+            criterion.description(), criterion, criterion
+        )
+        df = recommendation_results(self.fetch_run(self.execute(runner)))
+        df = df[
+            (df["cohort_category"] == CohortCategory.POPULATION.name)
+            & (df["interval_type"] == IntervalType.POSITIVE.name)
+        ]
+
+        return sorted(zip(df["interval_start"], df["interval_end"]))
+
+    @pytest.mark.parametrize("runner", [None, execute_staged])
+    @pytest.mark.parametrize(
+        "name,intervals",
+        [
+            (
+                # until the last assessment of the day
+                "BeforeDailyFacesAnxietyScaleAssessment",
+                [
+                    ("2024-12-02 00:00:00+01:00", "2024-12-02 15:00:00+01:00"),
+                    ("2024-12-04 00:00:00+01:00", "2024-12-04 11:00:00+01:00"),
+                ],
+            ),
+            (
+                # from the first assessment of the day
+                "AfterDailyFacesAnxietyScaleAssessment",
+                [
+                    ("2024-12-02 09:00:00+01:00", "2024-12-02 23:59:59+01:00"),
+                    ("2024-12-04 11:00:00+01:00", "2024-12-04 23:59:59+01:00"),
+                ],
+            ),
+            (
+                "OnFacesAnxietyScaleAssessmentDay",
+                [
+                    ("2024-12-02 00:00:00+01:00", "2024-12-02 23:59:59+01:00"),
+                    ("2024-12-04 00:00:00+01:00", "2024-12-04 23:59:59+01:00"),
+                ],
+            ),
+        ],
+    )
+    def test_intervals(self, name, intervals, runner):
+        from digipod.criterion import observations
+
+        self.commit_patients([anxiety_patient()])
+
+        result = self.positive_intervals(getattr(observations, name)(), runner)
+
+        assert result == [
+            (pd.Timestamp(start), pd.Timestamp(end)) for start, end in intervals
+        ]
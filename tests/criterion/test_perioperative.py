@@ -0,0 +1,151 @@
+import pendulum
+import pytest
+from sqlalchemy import select
+
+from digipod.criterion.perioperative import (
+    PerioperativePhase,
+    query_perioperative_windows,
+)
+from digipod.tests._fixtures.omop_fixture import TIMEZONE
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.criterion.test_scores import recommendation_results
+from digipod.tests.recommendation.utils import (
+    AdultPatient,
+    perioperative_cohort,
+    single_pair_recommendation,
+)
+
+
+def local(dt: str) -> pendulum.DateTime:
+    return pendulum.parse(dt, tz=TIMEZONE)
+
+
+# windows of a surgery from 2024-12-01 09:00 to 10:30 (None: open until the end of the observation window)
+EXPECTED_WINDOWS = {
+    PerioperativePhase.PRE_OPERATIVE_UNTIL_TWO_HOURS_BEFORE_DAY_OF_SURGERY: (
+        local("2024-10-20 00:00:00"),
+        local("2024-11-30 21:59:59"),
+    ),
+    PerioperativePhase.PRE_OPERATIVE_BEFORE_SURGERY: (
+        local("2024-10-20 00:00:00"),
+        local("2024-12-01 09:00:00"),
+    ),
+    PerioperativePhase.PRE_OPERATIVE_BEFORE_END_OF_SURGERY: (
+        local("2024-10-20 00:00:00"),
+        local("2024-12-01 10:30:00"),
+    ),
+    PerioperativePhase.INTRA_OPERATIVE: (
+        local("2024-12-01 09:00:00"),
+        local("2024-12-01 10:30:00"),
+    ),
+    PerioperativePhase.POST_OPERATIVE_UNTIL_DAY_0: (
+        local("2024-12-01 10:30:00"),
+        local("2024-12-01 23:59:59"),
+    ),
+    PerioperativePhase.POST_OPERATIVE_UNTIL_DAY_5: (
+        local("2024-12-01 10:30:00"),
+        local("2024-12-06 23:59:59"),
+    ),
+    PerioperativePhase.INTRA_OR_POST_OPERATIVE: (local("2024-12-01 09:00:00"), None),
+    PerioperativePhase.POST_OPERATIVE: (local("2024-12-01 10:30:00"), None),
+}
+
+
+def test_all_phases_have_a_window():
+    assert set(EXPECTED_WINDOWS) == set(PerioperativePhase)
+
+    with pytest.raises(ValueError):
+        query_perioperative_windows([])
+
+
+class TestPerioperativeWindows(TestRecommendationBase):
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_0_1
+
+        self.recommendation = recommendation_0_1.rec_0_1_Delirium_Screening
+        super().setup_method(method)
+
+    def fetch_windows(self, phases):
+        from execution_engine.clients import omopdb
+
+        query = query_perioperative_windows(phases).subquery()
+
+        with omopdb.begin() as con:
+            return {
+                (row.person_id, row.phase): (row.interval_start, row.interval_end)
+                for row in con.execute(select(query))
+            }
+
+    def test_windows(self):
+        pat = AdultPatient()
+        pat.add_surgery(
+            start="2024-12-01 09:00:00+01:00", end="2024-12-01 10:30:00+01:00"
+        )
+        # only the first surgery defines the windows
+        pat.add_surgery(
+            start="2024-12-08 09:00:00+01:00", end="2024-12-08 10:30:00+01:00"
+        )
+        self.commit_patients([pat, AdultPatient()])
+
+        windows = self.fetch_windows(list(PerioperativePhase))
+
+        assert windows == {
+            (pat.person.person_id, phase.value): window
+            for phase, window in EXPECTED_WINDOWS.items()
+        }
+
+    def test_single_phase_equals_all_phases(self):
+        self.commit_patients(perioperative_cohort())
+
+        windows = self.fetch_windows(list(PerioperativePhase))
+
+        for phase in PerioperativePhase:
+            assert self.fetch_windows([phase]) == {
+                key: window for key, window in windows.items() if key[1] == phase
+            }
+
+    def test_surgery_without_end(self):
+        from execution_engine.constants import CohortCategory
+        from execution_engine.util.interval import IntervalType
+
+        from digipod.criterion.intraop_patients import IntraOperativePatients
+        from digipod.criterion.postop_patients import IntraOrPostOperativePatients
+        from digipod.criterion.preop_patients import (
+            PreOperativePatientsBeforeEndOfSurgery,
+        )
+
+        pat = AdultPatient()
+        pat.add_surgery(
+            start="2024-12-01 09:00:00+01:00", end="2024-12-01 10:30:00+01:00"
+        )
+        pat.add_inpatient_visit(
+            start="2024-11-30 10:00:00+01:00", end="2024-12-08 12:00:00+01:00"
+        )
+        # procedure_end_datetime is nullable in OMOP
+        pat._procedures[-1].procedure_end_datetime = None
+        self.commit_patients([pat])
+
+        windows = self.fetch_windows(list(PerioperativePhase))
+        assert windows[pat.person.person_id, PerioperativePhase.INTRA_OPERATIVE] == (
+            local("2024-12-01 09:00:00"),
+            None,
+        )
+
+        def positive_starts(criterion) -> list:
+            self.recommendation = single_pair_recommendation(
+                criterion.description(), criterion, criterion
+            )
+            df = recommendation_results(self.fetch_run(self.execute()))
+            df = df[
+                (df["cohort_category"] == CohortCategory.POPULATION.name)
+                & (df["interval_type"] == IntervalType.POSITIVE.name)
+            ]
+            return list(df["interval_start"])
+
+        # no end of surgery: no window in the phases that end with the surgery
+        assert positive_starts(IntraOperativePatients()) == []
+        assert positive_starts(PreOperativePatientsBeforeEndOfSurgery()) == []
+        # the open-ended phases still last until the end of the observation window
+        assert positive_starts(IntraOrPostOperativePatients()) == [
+            local("2024-12-01 09:00:00")
+        ]
@@ -0,0 +1,92 @@
+from digipod.criterion.non_pharma_measures import PostOperative
+from digipod.criterion.patients import AgeLimitPatient
+from digipod.criterion.postop_patients import (
+    PostOperativePatients,
+    PostOperativePatientsUntilDay5,
+)
+from digipod.criterion.registry import (
+    CriterionRegistry,
+    criterion_registry,
+    iterate_criteria,
+    iterate_expressions,
+    structural_key,
+)
+
+
+def test_equal_criteria_are_interned():
+    registry = CriterionRegistry()
+
+    first = registry.intern(PostOperativePatients())
+    second = registry.intern(PostOperativePatients())
+
+    assert second is first
+    assert registry.stats() == {
+        "canonical": 1,
+        "collapsed": 1,
+        "collapsed_by_class": {"PostOperativePatients": 1},
+    }
+
+
+def test_different_criteria_are_not_interned():
+    registry = CriterionRegistry()
+
+    criteria = [
+        PostOperativePatients(),
+        PostOperativePatientsUntilDay5(),
+        AgeLimitPatient(min_age_years=18),
+        AgeLimitPatient(min_age_years=70),
+    ]
+
+    assert [registry.intern(c) for c in criteria] == criteria
+    assert registry.collapsed == 0
+    assert len({structural_key(c) for c in criteria}) == len(criteria)
+
+
+def test_clear():
+    registry = CriterionRegistry()
+    first = registry.intern(PostOperativePatients())
+
+    registry.clear()
+
+    assert registry.intern(PostOperativePatients()) is not first
+    assert registry.stats()["canonical"] == 1
+
+
+def test_temporal_wrappers_share_interval_criterion():
+    PostOperative(AgeLimitPatient())
+    collapsed = criterion_registry.collapsed
+
+    PostOperative(AgeLimitPatient(min_age_years=70))
+
+    # the interval criterion of the second wrapper is the canonical instance of the first one
+    assert criterion_registry.collapsed == collapsed + 1
+
+
+def test_iterate_criteria():
+    from digipod.criterion.scope import ScopedPatientsActiveDuringPeriod
+    from digipod.criterion.shifts import DailyShiftScreening, Shift
+    from digipod.recommendation.recommendation_0_2 import (
+        rec_0_2_Delirium_Screening_double,
+    )
+
+    criteria = list(iterate_criteria(rec_0_2_Delirium_Screening_double))
+
+    assert len({id(c) for c in criteria}) == len(criteria)
+    assert any(isinstance(c, ScopedPatientsActiveDuringPeriod) for c in criteria)
+    assert {
+        c.dict()["shift"] for c in criteria if isinstance(c, DailyShiftScreening)
+    } == {shift.value for shift in Shift}
+
+
+def test_iterate_expressions():
+    from execution_engine.omop.criterion.abstract import Criterion
+    from execution_engine.util import logic
+
+    count = PostOperative(AgeLimitPatient(min_age_years=70))
+    expr = logic.And(count, PostOperativePatientsUntilDay5())
+
+    expressions = list(iterate_expressions(expr))
+
+    assert expressions[0] is expr
+    assert any(e is count for e in expressions)
+    assert not any(isinstance(e, Criterion) for e in expressions)
@@ -0,0 +1,190 @@
+import pandas as pd
+import pytest
+
+from digipod import concepts
+from digipod.criterion.anchors import reset_anchors
+from digipod.criterion.scores import (
+    ICDSC_documented,
+    NUDESC_documented,
+    ScoreClassification,
+    ScoreClassificationBeforeFirstDexAdministration,
+    ScoreDocumented,
+    restrict_before_first_dex_administration,
+    score_classification,
+)
+from digipod.tests.criterion.test_anchors import execute_staged
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.recommendation.utils import (
+    perioperative_cohort,
+    single_pair_recommendation,
+)
+
+
+def dexmedetomidine_cohort():
+    """
+    The perioperative cohort, with dexmedetomidine administrations between the delirium screenings of the ICU and
+    normal ward patients.
+    """
+    icu, normalward, two_surgeries, no_surgery = perioperative_cohort()
+
+    icu.add_drug_exposure(
+        concepts.Dexmedetomidine.concept_id,
+        "2024-12-02 08:00:00+01:00",
+        "2024-12-02 20:00:00+01:00",
+    )
+    normalward.add_drug_exposure(
+        concepts.Dexmedetomidine.concept_id,
+        "2024-12-06 12:00:00+01:00",
+        "2024-12-06 13:00:00+01:00",
+    )
+
+    return [icu, normalward, two_surgeries, no_surgery]
+
+
+def recommendation_results(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Get the results of the recommendation itself (not of its PI pairs and criteria), which do not depend on the
+    criterion ids.
+    """
+    return df[df["pi_pair_id"].isna() & df["criterion_id"].isna()].reset_index(
+        drop=True
+    )
+
+
+def test_score_classification_requires_staged_concept():
+    from execution_engine.util.value import ValueScalar
+
+    with pytest.raises(ValueError):
+        score_classification(
+            concepts.Dexmedetomidine,
+            ValueScalar(unit=None, value=None, value_min=1.0, value_max=None),
+        )
+
+
+def test_restrict_before_first_dex_administration():
+    from digipod.criterion.non_pharma_measures import nudescLt2
+
+    restricted = restrict_before_first_dex_administration(nudescLt2)
+
+    assert isinstance(restricted, ScoreClassificationBeforeFirstDexAdministration)
+    assert restricted.dict() == nudescLt2.dict()
+    assert restrict_before_first_dex_administration(restricted) is restricted
+    assert restrict_before_first_dex_administration(NUDESC_documented) is (
+        NUDESC_documented
+    )
+
+
+def score_classifications() -> list[ScoreClassification]:
+    from digipod.criterion.non_pharma_measures import (
+        icdscLt4,
+        nudescGte2,
+        nudescLt2,
+    )
+
+    return [nudescGte2, nudescLt2, icdscLt4]
+
+
+class TestScores(TestRecommendationBase):
+    def teardown_method(self, method):
+        reset_anchors()
+        super().teardown_method(method)
+
+    def execute_pair(self, name, population_expr, intervention_expr, runner=None):
+        self.recommendation = single_pair_recommendation(
+            name, population_expr, intervention_expr
+        )
+
+        return recommendation_results(self.fetch_run(self.execute(runner)))
+
+    @pytest.mark.parametrize("index", range(3))
+    def test_score_classification_equals_measurement(self, index):
+        from execution_engine.omop.criterion.measurement import Measurement
+
+        from digipod.criterion.postop_patients import PostOperativePatients
+
+        criterion = score_classifications()[index]
+        measurement = Measurement.from_dict(criterion.dict())
+
+        self.commit_patients(perioperative_cohort())
+
+        expected = self.execute_pair(
+            "score-measurement", PostOperativePatients(), measurement
+        )
+        inline = self.execute_pair("score-inline", PostOperativePatients(), criterion)
+        staged = self.execute_pair(
+            "score-staged", PostOperativePatients(), criterion, execute_staged
+        )
+
+        assert not expected.empty
+        pd.testing.assert_frame_equal(inline, expected)
+        pd.testing.assert_frame_equal(staged, expected)
+
+    def test_score_documented_equals_or(self):
+        from execution_engine.util import logic
+
+        from digipod.criterion.postop_patients import PostOperativePatients
+
+        self.commit_patients(perioperative_cohort())
+
+        expected = self.execute_pair(
+            "documented-or",
+            PostOperativePatients(),
+            logic.Or(NUDESC_documented, ICDSC_documented),
+        )
+        documented = ScoreDocumented(
+            [
+                concepts.NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE,
+                concepts.INTENSIVE_CARE_DELIRIUM_SCREENING_CHECKLIST_SCORE,
+            ]
+        )
+        inline = self.execute_pair(
+            "documented-inline", PostOperativePatients(), documented
+        )
+        staged = self.execute_pair(
+            "documented-staged", PostOperativePatients(), documented, execute_staged
+        )
+
+        assert not expected.empty
+        pd.testing.assert_frame_equal(inline, expected)
+        pd.testing.assert_frame_equal(staged, expected)
+
+    @pytest.mark.parametrize("index", range(3))
+    def test_restricted_equals_unrestricted(self, index):
+        from execution_engine.util import logic
+
+        from digipod.criterion.dexmed_patients import (
+            PatientsBeforeFirstDexAdministration,
+        )
+        from digipod.criterion.non_pharma_measures import BeforeFirstDexAdministration
+        from digipod.criterion.postop_patients import PostOperativePatients
+
+        criterion = score_classifications()[index]
+        unrestricted = logic.TemporalMinCount(
+            criterion,
+            start_time=None,
+            end_time=None,
+            interval_type=None,
+            interval_criterion=PatientsBeforeFirstDexAdministration(),
+            threshold=1,
+        )
+        # the score query only fetches the measurements before the first administration
+        restricted = BeforeFirstDexAdministration(criterion)
+
+        self.commit_patients(dexmedetomidine_cohort())
+
+        expected = self.execute_pair(
+            "dex-unrestricted", PostOperativePatients(), unrestricted
+        )
+        inline = self.execute_pair(
+            "dex-restricted-inline", PostOperativePatients(), restricted
+        )
+        staged = self.execute_pair(
+            "dex-restricted-staged",
+            PostOperativePatients(),
+            restricted,
+            execute_staged,
+        )
+
+        assert not expected.empty
+        pd.testing.assert_frame_equal(inline, expected)
+        pd.testing.assert_frame_equal(staged, expected)
@@ -0,0 +1,149 @@
+import datetime
+from collections import Counter
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+from sqlalchemy import text
+
+from digipod.criterion.anchors import reset_anchors
+from digipod.criterion.shifts import SCREENING_SHIFTS, DailyShiftScreening, Shift
+from digipod.tests._fixtures.omop_fixture import TIMEZONE
+from digipod.tests.criterion.test_anchors import execute_staged
+from digipod.tests.criterion.test_scores import recommendation_results
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.recommendation.utils import (
+    AdultPatient,
+    perioperative_cohort,
+    single_pair_recommendation,
+)
+
+
+def midnight_patient() -> AdultPatient:
+    """
+    A patient screened right after midnight (i.e. on the previous day in UTC).
+    """
+    patient = AdultPatient()
+    patient.add_surgery(
+        start="2024-12-02 09:00:00+01:00", end="2024-12-02 10:00:00+01:00"
+    )
+    patient.add_inpatient_visit(
+        start="2024-12-02 10:00:00+01:00", end="2024-12-08 10:00:00+01:00"
+    )
+    patient.add_NUDESC("2024-12-03 00:30:00+01:00", 0)
+    patient.add_NUDESC("2024-12-03 09:00:00+01:00", 0)
+    patient.add_NUDESC("2024-12-04 23:30:00+01:00", 0)
+
+    return patient
+
+
+def population():
+    from execution_engine.util import logic
+
+    from digipod.criterion.patients import AdultPatients
+    from digipod.criterion.postop_patients import PostOperativePatientsUntilDay5
+
+    return logic.And(AdultPatients(), PostOperativePatientsUntilDay5())
+
+
+def temporal_shift_recommendation():
+    """
+    Recommendation 0.2 as defined with the temporal shift operators over the documented scores.
+    """
+    from execution_engine.util import logic
+    from execution_engine.util.temporal_logic_util import (
+        AfternoonShift,
+        Day,
+        MorningShift,
+        NightShiftAfterMidnight,
+        NightShiftBeforeMidnight,
+    )
+
+    from digipod.criterion import scores
+
+    documented = logic.Or(
+        scores.TDCAM_documented,
+        scores.AT4_documented,
+        scores.CAM_documented,
+        scores.DRS_documented,
+        scores.DOS_documented,
+        scores.NUDESC_documented,
+        scores.CAMICU_documented,
+        scores.DDS_documented,
+        scores.ICDSC_documented,
+    )
+
+    return single_pair_recommendation(
+        "shifts-temporal",
+        population_expr=population(),
+        intervention_expr=logic.CappedMinCount(
+            Day(NightShiftAfterMidnight(documented)),
+            Day(MorningShift(documented)),
+            Day(AfternoonShift(documented)),
+            Day(NightShiftBeforeMidnight(documented)),
+            threshold=2,
+        ),
+    )
+
+
+def daily_shift_recommendation():
+    from execution_engine.util import logic
+
+    return single_pair_recommendation(
+        "shifts-daily",
+        population_expr=population(),
+        intervention_expr=logic.CappedMinCount(
+            *[DailyShiftScreening(shift) for shift in Shift],
+            threshold=2,
+        ),
+    )
+
+
+class TestShifts(TestRecommendationBase):
+    def teardown_method(self, method):
+        reset_anchors()
+        super().teardown_method(method)
+
+    def test_buckets_in_configured_timezone(self):
+        from execution_engine.clients import omopdb
+
+        patient = midnight_patient()
+        self.commit_patients([patient])
+
+        with omopdb.begin() as con:
+            buckets = Counter(map(tuple, con.execute(SCREENING_SHIFTS.query())))
+
+            # the buckets do not depend on the timezone of the session
+            con.execute(text("SET LOCAL TIME ZONE 'UTC'"))
+            assert Counter(map(tuple, con.execute(SCREENING_SHIFTS.query()))) == (
+                buckets
+            )
+
+        def bucket(shift, day):
+            midnight = datetime.datetime.fromisoformat(day).replace(
+                tzinfo=ZoneInfo(TIMEZONE)
+            )
+            return shift.value, patient.person.person_id, midnight
+
+        assert buckets == {
+            bucket(Shift.NIGHT_AFTER_MIDNIGHT, "2024-12-03"): 1,
+            bucket(Shift.MORNING, "2024-12-03"): 1,
+            bucket(Shift.NIGHT_BEFORE_MIDNIGHT, "2024-12-04"): 1,
+        }
+
+    def test_daily_shift_screening_equals_temporal_shifts(self):
+        from execution_engine.util.interval import IntervalType
+
+        self.commit_patients(perioperative_cohort() + [midnight_patient()])
+
+        self.recommendation = temporal_shift_recommendation()
+        expected = recommendation_results(self.fetch_run(self.execute()))
+
+        self.recommendation = daily_shift_recommendation()
+        inline = recommendation_results(self.fetch_run(self.execute()))
+        staged = recommendation_results(self.fetch_run(self.execute(execute_staged)))
+
+        # outside of the population, the intervals are NOT_APPLICABLE in both definitions
+        assert (expected["interval_type"] == IntervalType.NOT_APPLICABLE.name).any()
+        assert (expected["interval_type"] == IntervalType.POSITIVE.name).any()
+        pd.testing.assert_frame_equal(inline, expected)
+        pd.testing.assert_frame_equal(staged, expected)
@@ -0,0 +1,121 @@
+import pytest
+from execution_engine.task.process import Interval, IntervalWithCount
+from execution_engine.util.interval import IntervalType
+
+from digipod.criterion.weighted import CountMode, TypeCombination, weighted_and
+
+POSITIVE = IntervalType.POSITIVE
+NEGATIVE = IntervalType.NEGATIVE
+NO_DATA = IntervalType.NO_DATA
+NOT_APPLICABLE = IntervalType.NOT_APPLICABLE
+
+
+def interval(interval_type, count=None):
+    if count is None:
+        return Interval(0, 10, interval_type)
+
+    return IntervalWithCount(0, 10, interval_type, count)
+
+
+def combine(operator, *intervals):
+    result = operator.count_intervals(0, 10, list(intervals))
+
+    return result.type, result.count
+
+
+@pytest.mark.parametrize(
+    "intervals,expected",
+    [
+        ((interval(POSITIVE, 1.0), interval(POSITIVE)), (POSITIVE, 1.0)),
+        ((interval(POSITIVE, 0.5), interval(NEGATIVE)), (POSITIVE, 0.4)),
+        ((interval(NEGATIVE, 0.25), interval(POSITIVE)), (POSITIVE, 0.4)),
+        ((None, interval(NEGATIVE)), (NEGATIVE, 0.0)),
+        ((interval(NOT_APPLICABLE, 0.5), interval(POSITIVE)), (POSITIVE, 0.2)),
+        # the second PI pair is not applicable: the result of the first one
+        ((interval(NEGATIVE, 0.75), interval(NOT_APPLICABLE)), (NEGATIVE, 0.75)),
+        (
+            (interval(NOT_APPLICABLE, 0.5), interval(NOT_APPLICABLE)),
+            (NOT_APPLICABLE, 0.5),
+        ),
+        ((None, interval(NOT_APPLICABLE)), (NEGATIVE, 0.0)),
+    ],
+)
+def test_recommendation_2_1(intervals, expected):
+    from digipod.recommendation.recommendation_2_1 import CombineRecommendation2_1
+
+    assert combine(CombineRecommendation2_1, *intervals) == expected
+
+
+@pytest.mark.parametrize(
+    "intervals,expected",
+    [
+        ((interval(POSITIVE), interval(POSITIVE)), (POSITIVE, 1.0)),
+        ((interval(POSITIVE), interval(NEGATIVE)), (NEGATIVE, 0.5)),
+        ((interval(NEGATIVE), interval(POSITIVE)), (NEGATIVE, 0.5)),
+        ((None, None), (NEGATIVE, 0.0)),
+        # the second PI pair is not applicable: the result of the first one (with its count)
+        ((interval(POSITIVE, 0.5), interval(NOT_APPLICABLE)), (POSITIVE, 0.5)),
+        ((interval(NEGATIVE, 0.0), interval(NOT_APPLICABLE)), (NEGATIVE, 0.0)),
+    ],
+)
+def test_recommendation_4_1(intervals, expected):
+    from digipod.recommendation.recommendation_4_1 import CombineRecommendation4_1
+
+    assert combine(CombineRecommendation4_1, *intervals) == expected
+
+
+@pytest.mark.parametrize(
+    "intervals,expected",
+    [
+        ([interval(POSITIVE, 1.0)] * 4, (POSITIVE, 1.0)),
+        (
+            [
+                interval(POSITIVE, 1.0),
+                interval(NEGATIVE, 0.0),
+                None,
+                interval(NO_DATA, 0.5),
+            ],
+            (NEGATIVE, 0.375),
+        ),
+        # the counts of NOT_APPLICABLE bundles are included
+        (
+            [interval(NOT_APPLICABLE, 1.0), interval(POSITIVE, 1.0)] * 2,
+            (POSITIVE, 1.0),
+        ),
+        ([interval(NOT_APPLICABLE, 0.0)] * 4, (NOT_APPLICABLE, 0.0)),
+    ],
+)
+def test_recommendation_4_3(intervals, expected):
+    from digipod.recommendation.recommendation_4_3 import CombineRecommendation4_3
+
+    assert combine(CombineRecommendation4_3, *intervals) == expected
+
+
+def test_weighted_and_validation():
+    with pytest.raises(ValueError):
+        weighted_and("NoWeights", module=__name__, weights=[])
+    with pytest.raises(ValueError):
+        weighted_and(
+            "CountModes", module=__name__, weights=[1, 1], counts=[CountMode.COUNT]
+        )
+    with pytest.raises(ValueError):
+        weighted_and("NegativeWeight", module=__name__, weights=[1, -1])
+    with pytest.raises(ValueError):
+        weighted_and("Optional", module=__name__, weights=[1, 1], optional=[2])
+
+
+def test_weighted_and_class():
+    Combined = weighted_and(
+        "Combined",
+        module=__name__,
+        weights=[1, 1],
+        types=TypeCombination.OR,
+        optional=[0, 1],
+    )
+
+    assert Combined.__name__ == "Combined"
+    assert Combined.__module__ == __name__
+    # all arguments are optional and not applicable
+    assert combine(
+        Combined, interval(NOT_APPLICABLE, 1.0), interval(NOT_APPLICABLE, 1.0)
+    ) == (NOT_APPLICABLE, 0.0)
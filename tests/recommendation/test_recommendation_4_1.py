@@ -0,0 +1,147 @@
+import pandas as pd
+
+from digipod.tests.criterion.test_scores import recommendation_results
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.recommendation.utils import (
+    ElderlyPatient,
+    single_pair_recommendation,
+)
+
+
+def required_items():
+    from digipod.criterion import assessments
+
+    return [
+        assessments.cardiacAssessment,
+        assessments.neurologicalAssessment,
+        assessments.cardiovascularEvaluation,
+        assessments.diabetesScreening,
+        assessments.anemiaScreening,
+        assessments.depressedMoodAssessment,
+        assessments.painAssessment,
+        assessments.anxietyAssessment,
+        assessments.cognitiveFunctionAssessment,
+        assessments.dementiaAssessment,
+        assessments.frailtyAssessment,
+        assessments.sensoryImpairmentAssessment,
+        assessments.nutritionalAssessment,
+        assessments.medicationAdministrationAssessment,
+        assessments.electrolytesMeasurement,
+        assessments.swallowingFunctionEvaluation,
+        assessments.anticholinergicBurdenScale,
+    ]
+
+
+def any_of_items():
+    from digipod.criterion import assessments
+
+    return [
+        assessments.preAnestheticAssessment,
+        assessments.dehydrationRiskAssessment,
+        assessments.impairedNutritionRiskAssessment,
+        assessments.hypovolemiaRiskAssessment,
+    ]
+
+
+def member_wise_screening():
+    """
+    The preoperative risk factor screening as the And() of its single-concept criteria (as in recommendation 4.1
+    before the checklist).
+    """
+    from execution_engine.util import logic
+
+    return logic.And(logic.And(*required_items()), logic.Or(*any_of_items()))
+
+
+def screened_patient(items) -> ElderlyPatient:
+    """
+    A patient with a surgery on 2024-12-05, in whom the given assessment items were documented three days before.
+    """
+    patient = ElderlyPatient()
+    patient.add_surgery(
+        start="2024-12-05 09:00:00+01:00", end="2024-12-05 10:30:00+01:00"
+    )
+    patient.add_inpatient_visit(
+        start="2024-12-01 10:00:00+01:00", end="2024-12-08 12:00:00+01:00"
+    )
+
+    for item in items:
+        if item.concept.domain_id == "Measurement":
+            patient.add_measurement(
+                item.concept.concept_id, "2024-12-02 10:00:00+01:00", 1
+            )
+        else:
+            patient.add_procedure(item.concept.concept_id, "2024-12-02 10:00:00+01:00")
+
+    return patient
+
+
+class TestRecommendation_4_1(TestRecommendationBase):
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_4_1
+
+        self.recommendation = recommendation_4_1.recommendation
+        super().setup_method(method)
+
+    def execute_screening(self, name, intervention_expr) -> pd.DataFrame:
+        from digipod.criterion.non_pharma_measures import (
+            PreOperativeUntilTwoHoursBeforeDayOfSurgery,
+        )
+        from digipod.criterion.patients import AgeLimitPatient
+
+        self.recommendation = single_pair_recommendation(
+            name,
+            population_expr=PreOperativeUntilTwoHoursBeforeDayOfSurgery(
+                AgeLimitPatient(min_age_years=70)
+            ),
+            intervention_expr=intervention_expr,
+        )
+
+        return recommendation_results(self.fetch_run(self.execute()))
+
+    def test_checklist_equals_member_wise(self):
+        from execution_engine.util.interval import IntervalType
+
+        from digipod.criterion.assessments import preoperativeRiskFactorScreening
+
+        self.commit_patients(
+            [
+                screened_patient(required_items() + any_of_items()[:1]),
+                # no optional item
+                screened_patient(required_items()),
+                # an undocumented required procedure
+                screened_patient(required_items()[1:] + any_of_items()),
+            ]
+        )
+
+        expected = self.execute_screening("screening-and", member_wise_screening())
+        checklist = self.execute_screening(
+            "screening-checklist", preoperativeRiskFactorScreening
+        )
+
+        assert (expected["interval_type"] == IntervalType.POSITIVE.name).any()
+        assert (expected["interval_type"] == IntervalType.NEGATIVE.name).any()
+        pd.testing.assert_frame_equal(checklist, expected)
+
+    def test_undocumented_measurement_is_no_data(self):
+        """
+        An undocumented Measurement item (without any undocumented Procedure item) yields NO_DATA, as for the And() of
+        single-concept criteria.
+        """
+        from execution_engine.util.interval import IntervalType
+
+        from digipod.criterion.assessments import (
+            diabetesScreening,
+            preoperativeRiskFactorScreening,
+        )
+
+        items = [item for item in required_items() if item is not diabetesScreening]
+        self.commit_patients([screened_patient(items + any_of_items())])
+
+        expected = self.execute_screening("screening-and", member_wise_screening())
+        checklist = self.execute_screening(
+            "screening-checklist", preoperativeRiskFactorScreening
+        )
+
+        assert (expected["interval_type"] == IntervalType.NO_DATA.name).any()
+        pd.testing.assert_frame_equal(checklist, expected)
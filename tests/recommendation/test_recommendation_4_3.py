@@ -46,6 +46,7 @@ class TestRecommendation_4_3(TestRecommendationBase):
         times = [
             "2024-12-01 11:00:00+01:00",
             "2024-12-02 11:00:00+01:00",
+            "2024-12-02 15:00:00+01:00", # second assessment of the day - counted once
             "2024-12-04 11:00:00+01:00",
             "2024-12-06 11:00:00+01:00",
             "2024-12-07 11:00:00+01:00", # > 5d postop - shouldn't be counted
@@ -3,10 +3,12 @@ import pandas as pd
 import pytest
 from execution_engine.constants import CohortCategory
 from execution_engine.omop import cohort
+from execution_engine.omop.db.celida.tables import ResultInterval
 from execution_engine.omop.db.celida.views import interval_result
 from execution_engine.util.types.timerange import TimeRange
 from sqlalchemy import select
 
+from digipod.tests.bulk_loader import load_patients
 from digipod.tests.recommendation.resultset import ResultSet
 
 
@@ -36,16 +38,11 @@ class TestRecommendationBase:
        self.recommendation.reset_state()
 
     def commit_patient(self, pat):
+        self.commit_patients([pat])
 
-        person = pat.person
-        person.person_id = None  # reset person id
-        self.db.add(person)
-        self.db.commit()
-
-        for obj in pat.yield_objects():
-            obj.person_id = person.person_id
-            self.db.add(obj)
-
+    def commit_patients(self, pats):
+        # one COPY per OMOP table for all patients (assigns the person ids)
+        load_patients(self.db.connection(), pats)
         self.db.commit()
 
     def fetch_interval_result(
@@ -91,20 +88,60 @@ class TestRecommendationBase:
 
         return df
 
-    def run_test(self) -> pd.DataFrame:
-        from execution_engine.clients import omopdb
+    def execute(self, runner=None) -> int:
+        """
+        Execute the recommendation and return the run id.
+
+        :param runner: Called as runner(engine, recommendation, start_datetime, end_datetime) and returning the run
+            id (e.g. one of the execute_* functions of digipod.runner). Defaults to the serial execution.
+        """
         from execution_engine.execution_engine import ExecutionEngine
 
         assert self.recommendation is not None, "Set recommendation first"
 
         e = ExecutionEngine(verbose=False)
 
-        self.run_id = e.execute(
+        if runner is None:
+            return e.execute(
+                self.recommendation,
+                start_datetime=self.observation_window.start,
+                end_datetime=self.observation_window.end,
+            )
+
+        return runner(
+            e,
             self.recommendation,
-            start_datetime=self.observation_window.start,
-            end_datetime=self.observation_window.end,
+            self.observation_window.start,
+            self.observation_window.end,
+        )
+
+    def fetch_run(self, run_id: int) -> pd.DataFrame:
+        """
+        Fetch all result intervals of a run (of all cohort categories, PI pairs and criteria) in a canonical order,
+        to compare the results of different runs.
+        """
+        from execution_engine.clients import omopdb
+
+        table = ResultInterval.__table__
+        columns = [
+            c for c in table.columns if not c.primary_key and c.name != "run_id"
+        ]
+
+        df = pd.read_sql(
+            select(*columns).where(table.c.run_id == run_id), omopdb.session().bind
         )
 
+        return df.sort_values(
+            by=[c.name for c in columns], ignore_index=True, na_position="first"
+        )
+
+    def run_test(self) -> pd.DataFrame:
+        from execution_engine.clients import omopdb
+
+        assert self.recommendation is not None, "Set recommendation first"
+
+        self.run_id = self.execute()
+
         df = self.fetch_interval_result(
             omopdb.session(), pi_pair_id=None, criterion_id=None, category=None
         )
@@ -5,6 +5,8 @@ from digipod import concepts as digipod_concepts
 from digipod.concepts import OMOP_GENDER_FEMALE
 from digipod.terminology import vocabulary as digipod_vocab
 from digipod.tests.functions import (
+    create_condition,
+    create_drug_exposure,
     create_measurement,
     create_observation,
     create_person,
@@ -40,6 +42,8 @@ class Patient:
         self._measurements = []
         self._procedures = []
         self._observations = []
+        self._drug_exposures = []
+        self._conditions = []
 
     @property
     def person(self):
@@ -54,6 +58,10 @@ class Patient:
             yield observation
         for procedure in self._procedures:
             yield procedure
+        for drug_exposure in self._drug_exposures:
+            yield drug_exposure
+        for condition in self._conditions:
+            yield condition
 
     def add_intensive_care_visit(self, start: str, end: str) -> None:
         """
@@ -164,6 +172,39 @@ class Patient:
             )
         )
 
+    def add_drug_exposure(
+        self,
+        concept_id: int,
+        start: str,
+        end: str,
+        quantity: float = 1,
+    ) -> None:
+        """
+        Add a drug exposure to the patient's record
+        """
+        self._drug_exposures.append(
+            create_drug_exposure(
+                person_id=self._person.person_id,
+                drug_concept_id=concept_id,
+                start_datetime=pendulum.parse(start),
+                end_datetime=pendulum.parse(end),
+                quantity=quantity,
+            )
+        )
+
+    def add_condition(self, concept_id: int, start: str, end: str) -> None:
+        """
+        Add a condition occurrence to the patient's record
+        """
+        self._conditions.append(
+            create_condition(
+                person_id=self._person.person_id,
+                condition_concept_id=concept_id,
+                condition_start_datetime=pendulum.parse(start),
+                condition_end_datetime=pendulum.parse(end),
+            )
+        )
+
     def add_MMSE(self, datetime: str, score: int) -> None:
         """
         Add a Mini-Mental State Examination (MMSE) measurement to the patient's record
@@ -290,3 +331,106 @@ class ElderlyPatient(Patient):
 
     def __init__(self):
         super().__init__(gender_concept_id=OMOP_GENDER_FEMALE, birth_date="1950-05-12")
+
+
+def perioperative_cohort() -> list[Patient]:
+    """
+    A small cohort of patients with surgeries, postoperative stays on the ICU and the normal ward, delirium screenings
+    and anxiety assessments (and one patient without surgery), to compare the results of different executions of a
+    recommendation.
+    """
+    from digipod.terminology.custom_concepts import (
+        FACES_ANXIETY_SCALE_SCORE,
+        NON_PHARMACOLOGICAL_INTERVENTION_TO_SUPPORT_THE_CIRCADIAN_RHYTHM,
+    )
+
+    icu = ElderlyPatient()
+    icu.add_surgery(
+        start="2024-12-01 09:00:00+01:00", end="2024-12-01 10:30:00+01:00"
+    )
+    icu.add_intensive_care_visit(
+        start="2024-12-01 10:30:00+01:00", end="2024-12-09 12:00:00+01:00"
+    )
+    icu.add_CAMICU("2024-12-01 11:00:00+01:00", 0)
+    icu.add_CAMICU("2024-12-01 18:00:00+01:00", 1)
+    icu.add_ICDSC("2024-12-03 23:00:00+01:00", 2)
+    icu.add_measurement(
+        FACES_ANXIETY_SCALE_SCORE.concept_id, "2024-12-02 11:00:00+01:00", 0
+    )
+    icu.add_procedure(
+        NON_PHARMACOLOGICAL_INTERVENTION_TO_SUPPORT_THE_CIRCADIAN_RHYTHM.concept_id,
+        "2024-12-02 11:00:00+01:00",
+    )
+
+    normalward = AdultPatient()
+    normalward.add_surgery(
+        start="2024-12-05 14:00:00+01:00", end="2024-12-05 16:00:00+01:00"
+    )
+    normalward.add_inpatient_visit(
+        start="2024-12-05 16:00:00+01:00", end="2024-12-12 10:00:00+01:00"
+    )
+    normalward.add_NUDESC("2024-12-05 18:00:00+01:00", 0)
+    normalward.add_NUDESC("2024-12-06 07:00:00+01:00", 0)
+    normalward.add_NUDESC("2024-12-06 23:00:00+01:00", 2)
+
+    # only the first surgery is the index surgery
+    two_surgeries = ElderlyPatient()
+    two_surgeries.add_MMSE("2024-11-29 10:00:00+01:00", 28)
+    two_surgeries.add_surgery(
+        start="2024-11-30 08:00:00+01:00", end="2024-11-30 09:00:00+01:00"
+    )
+    two_surgeries.add_surgery(
+        start="2024-12-08 08:00:00+01:00", end="2024-12-08 10:00:00+01:00"
+    )
+    two_surgeries.add_inpatient_visit(
+        start="2024-11-30 09:00:00+01:00", end="2024-12-14 12:00:00+01:00"
+    )
+    two_surgeries.add_CAM("2024-12-01 10:00:00+01:00", 0)
+    two_surgeries.add_CAM("2024-12-08 12:00:00+01:00", 0)
+    two_surgeries.add_measurement(
+        FACES_ANXIETY_SCALE_SCORE.concept_id, "2024-12-01 12:00:00+01:00", 1
+    )
+    two_surgeries.add_measurement(
+        FACES_ANXIETY_SCALE_SCORE.concept_id, "2024-12-03 12:00:00+01:00", 1
+    )
+
+    no_surgery = AdultPatient()
+    no_surgery.add_inpatient_visit(
+        start="2024-12-02 08:00:00+01:00", end="2024-12-04 12:00:00+01:00"
+    )
+    no_surgery.add_NUDESC("2024-12-03 12:00:00+01:00", 0)
+
+    return [icu, normalward, two_surgeries, no_surgery]
+
+
+def single_pair_recommendation(name: str, population_expr, intervention_expr):
+    """
+    A recommendation with a single population/intervention pair (and the scoped base criterion), to test criteria and
+    expressions outside of the DigiPOD recommendations.
+    """
+    from execution_engine.omop.cohort import (
+        PopulationInterventionPairExpr,
+        Recommendation,
+    )
+
+    from digipod.criterion.scope import ScopedPatientsActiveDuringPeriod
+    from digipod.recommendation import package_version
+
+    base_criterion = ScopedPatientsActiveDuringPeriod()
+
+    return Recommendation(
+        expr=PopulationInterventionPairExpr(
+            name=name,
+            url="",
+            base_criterion=base_criterion,
+            population_expr=population_expr,
+            intervention_expr=intervention_expr,
+        ),
+        base_criterion=base_criterion,
+        name=name,
+        title=name,
+        url=f"https://example.org/digipod/tests/{name}",
+        version="0.0.1",
+        description=name,
+        package_version=package_version,
+    )
@@ -0,0 +1,177 @@
+import functools
+
+import pandas as pd
+import pytest
+from sqlalchemy import select, text
+
+from digipod.runner import cache as result_cache
+from digipod.runner.cache import ResultCache, execute_cached, recommendation_hash
+from digipod.runner.watermark import data_watermark
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.recommendation.utils import AdultPatient, perioperative_cohort
+
+
+class TestResultCache(TestRecommendationBase):
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_0_2
+
+        self.recommendation = recommendation_0_2.rec_0_2_Delirium_Screening_double
+        super().setup_method(method)
+
+    @pytest.fixture
+    def watermark(self, monkeypatch):
+        # the cache key uses a controlled watermark (the statistics are collected asynchronously)
+        value = {"watermark": "0"}
+        monkeypatch.setattr(
+            result_cache,
+            "data_watermark",
+            lambda con, tables=None: value["watermark"],
+        )
+        return value
+
+    @staticmethod
+    def run_ids():
+        from execution_engine.clients import omopdb
+        from execution_engine.omop.db.celida.tables import ExecutionRun
+
+        with omopdb.begin() as con:
+            return set(con.execute(select(ExecutionRun.__table__.c.run_id)).scalars())
+
+    def test_recommendation_hash(self):
+        from digipod.recommendation import recommendation_0_1
+
+        assert recommendation_hash(self.recommendation) == recommendation_hash(
+            self.recommendation
+        )
+        assert recommendation_hash(self.recommendation) != recommendation_hash(
+            recommendation_0_1.rec_0_1_Delirium_Screening
+        )
+
+    def test_hit_and_miss(self, tmp_path, watermark):
+        self.commit_patients(perioperative_cohort())
+
+        cache = ResultCache(str(tmp_path / "cache.json"))
+        prepared = []
+        runner = functools.partial(
+            execute_cached, prepare=lambda: prepared.append(True)
+        )
+
+        def execute():
+            return self.execute(
+                lambda engine, rec, start, end: runner(engine, cache, rec, start, end)
+            )
+
+        run_id = execute()
+        assert prepared == [True]
+        pd.testing.assert_frame_equal(
+            self.fetch_run(run_id), self.fetch_run(self.execute())
+        )
+
+        # unchanged: the cached run is used without preparing or executing anything
+        run_ids = self.run_ids()
+        assert execute() == run_id
+        assert prepared == [True]
+        assert self.run_ids() == run_ids
+
+        # the cache is persistent
+        cache = ResultCache(str(tmp_path / "cache.json"))
+        assert execute() == run_id
+
+        # changed data: executed again, the outdated run is deleted
+        watermark["watermark"] = "1"
+        new_run_id = execute()
+
+        assert new_run_id != run_id
+        assert prepared == [True, True]
+        assert run_id not in self.run_ids()
+        assert len(cache) == 1
+
+    def test_time_dependent(self, tmp_path, watermark):
+        # the recommendation contains AdultPatients, which is evaluated at the current date
+        self.commit_patients(perioperative_cohort())
+
+        cache = ResultCache(str(tmp_path / "cache.json"))
+        start, end = self.observation_window.start, self.observation_window.end
+
+        def execute():
+            return self.execute(
+                lambda engine, rec, *_: execute_cached(engine, cache, rec, start, end)
+            )
+
+        run_id = execute()
+        assert execute() == run_id
+
+        # the adult patient (born 1990-05-12) turned 18 after an evaluation on 2008-05-11
+        (entry,) = cache._entries.values()
+        entry["evaluated_at"] = "2008-05-11T00:00:00"
+
+        new_run_id = execute()
+        assert new_run_id != run_id
+        assert execute() == new_run_id
+
+        # unknown evaluation time (e.g. entries of an older version of the cache)
+        (entry,) = cache._entries.values()
+        del entry["evaluated_at"]
+
+        assert execute() != new_run_id
+
+    def test_eviction(self, tmp_path, watermark):
+        from execution_engine.clients import omopdb
+
+        self.commit_patients(perioperative_cohort())
+
+        cache = ResultCache(str(tmp_path / "cache.json"), max_entries=1)
+        start, end = self.observation_window.start, self.observation_window.end
+
+        first = self.execute(
+            lambda engine, rec, *_: execute_cached(engine, cache, rec, start, end)
+        )
+        second = self.execute(
+            lambda engine, rec, *_: execute_cached(
+                engine, cache, rec, start, end.subtract(days=1)
+            )
+        )
+
+        assert len(cache) == 1
+        assert first not in self.run_ids()
+
+        with omopdb.begin() as con:
+            assert (
+                cache.get(con, cache.key(self.recommendation, start, end, "0")) is None
+            )
+            assert (
+                cache.get(
+                    con,
+                    cache.key(self.recommendation, start, end.subtract(days=1), "0"),
+                )
+                == second
+            )
+
+    def test_data_watermark(self, request):
+        from execution_engine.clients import omopdb
+
+        if request.config.getoption("--db-isolation") == "savepoint":
+            pytest.skip("statistics are only reported at the end of a transaction")
+
+        def watermark():
+            with omopdb.begin() as con:
+                con.execute(text("SELECT pg_stat_clear_snapshot()"))
+                return data_watermark(con)
+
+        def flush_stats():
+            self.db.execute(text("SELECT pg_stat_force_next_flush()"))
+            self.db.commit()
+
+        flush_stats()
+        before = watermark()
+        assert watermark() == before
+
+        self.commit_patient(AdultPatient())
+        flush_stats()
+        after_insert = watermark()
+        assert after_insert != before
+
+        # the counters restart at 0 after a reset, the time of the reset changes the watermark
+        with omopdb.begin() as con:
+            con.execute(text("SELECT pg_stat_reset()"))
+        assert watermark() not in (before, after_insert)
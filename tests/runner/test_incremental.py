@@ -0,0 +1,285 @@
+import datetime
+import types
+
+import pandas as pd
+import pendulum
+import pytest
+from sqlalchemy import select, text
+
+from digipod.runner.incremental import (
+    execute_incremental,
+    full_run_reason,
+    person_scope_table,
+    state_table,
+)
+from digipod.runner.watermark import time_dependent_criteria
+from digipod.terminology.vocabulary import (
+    NURSING_DELIRIUM_SCREENING_SCALE_NU_DESC_SCORE as NUDESC,
+)
+from digipod.tests.functions import create_measurement, create_procedure
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.recommendation.utils import (
+    AdultPatient,
+    perioperative_cohort,
+    single_pair_recommendation,
+)
+
+
+def screening_recommendation():
+    """
+    Recommendation 0.2 without the (time-dependent) age criterion.
+    """
+    from execution_engine.util import logic
+
+    from digipod.criterion.postop_patients import PostOperativePatientsUntilDay5
+    from digipod.criterion.shifts import DailyShiftScreening, Shift
+
+    return single_pair_recommendation(
+        "incremental-screening",
+        population_expr=PostOperativePatientsUntilDay5(),
+        intervention_expr=logic.CappedMinCount(
+            *[DailyShiftScreening(shift) for shift in Shift],
+            threshold=2,
+        ),
+    )
+
+
+def test_time_dependent_criteria():
+    from digipod.recommendation import recommendation_0_2
+
+    assert time_dependent_criteria(recommendation_0_2.rec_0_2_Delirium_Screening_double)
+    assert not time_dependent_criteria(screening_recommendation())
+
+
+STATE = {
+    "observation_start_datetime": pendulum.parse("2024-11-29 08:00:00+01:00"),
+    "observation_end_datetime": pendulum.parse("2024-12-15 08:00:00+01:00"),
+    "snapshot_xmin": (3 << 32) + 1000,
+    "frozen_xids": {"measurement": "700"},
+    "table_watermarks": {"measurement": [10, 0, 0]},
+    "stats_reset": None,
+    "evaluated_at": datetime.datetime(2024, 12, 15, 9, 0),
+}
+
+
+@pytest.mark.parametrize(
+    "change,reason",
+    [
+        ({}, None),
+        ({"snapshot_xmin": (3 << 32) + 5000}, None),
+        ({"table_watermarks": {"measurement": [12, 1, 0]}}, None),
+        ({"evaluated_at": datetime.datetime(2025, 1, 1, 9, 0)}, None),
+        (
+            {"observation_end_datetime": pendulum.parse("2024-12-16 08:00:00+01:00")},
+            "observation window changed",
+        ),
+        ({"snapshot_xmin": (4 << 32) + 10}, "transaction id epoch changed"),
+        ({"frozen_xids": {"measurement": "900"}}, "rows frozen or tables rewritten"),
+        ({"stats_reset": "2024-12-01T00:00:00+00:00"}, "statistics reset"),
+        ({"table_watermarks": {"measurement": [10, 0, 1]}}, "rows deleted"),
+    ],
+)
+def test_full_run_reason(change, reason):
+    assert full_run_reason(STATE, STATE | change, []) == reason
+
+
+def test_full_run_reason_time_dependent():
+    from digipod.criterion.patients import AgeLimitPatient
+
+    assert full_run_reason(None, STATE, []) == "no previous run"
+    assert full_run_reason(STATE, STATE, [AgeLimitPatient()]) is None
+    assert full_run_reason(STATE | {"evaluated_at": None}, STATE, [AgeLimitPatient()])
+
+
+class IncrementalBase(TestRecommendationBase):
+    @pytest.fixture(autouse=True)
+    def _incremental_state(self, request):
+        from execution_engine.clients import omopdb
+
+        if request.config.getoption("--db-isolation") == "savepoint":
+            # all rows are written by the (still running) outer transaction
+            pytest.skip("incremental runs require committed transactions")
+
+        yield
+
+        with omopdb.begin() as con:
+            state_table().drop(con, checkfirst=True)
+
+
+class TestIncrementalRecommendation_4_1(IncrementalBase):
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_4_1
+
+        self.recommendation = recommendation_4_1.recommendation
+        super().setup_method(method)
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """
+        The current time of the age criterion and the incremental runs.
+        """
+        from digipod.criterion import patients as patients_module
+        from digipod.runner import incremental as incremental_module
+
+        clock = {"now": datetime.datetime(2025, 1, 9, 12, 0)}
+
+        class FrozenDatetime(datetime.datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return clock["now"] if tz is None else clock["now"].astimezone(tz)
+
+        frozen = types.SimpleNamespace(
+            datetime=FrozenDatetime, timezone=datetime.timezone
+        )
+        monkeypatch.setattr(patients_module, "datetime", frozen)
+        monkeypatch.setattr(incremental_module, "datetime", frozen)
+
+        return clock
+
+    def test_incremental_equals_full_run(self, clock):
+        from digipod.tests.recommendation.test_recommendation_4_1 import (
+            any_of_items,
+            required_items,
+            screened_patient,
+        )
+
+        # a required item that is documented later for the changed patient
+        late_item = next(
+            item for item in required_items() if item.concept.domain_id != "Measurement"
+        )
+        items = required_items() + any_of_items()[:1]
+
+        patients = [
+            screened_patient(items),
+            screened_patient([item for item in items if item is not late_item]),
+            screened_patient(items),
+        ]
+        turning_70, changed, unchanged = patients
+
+        # 69 years old at the first run, 70 years old at the second run
+        turning_70.person.birth_datetime = datetime.datetime(1955, 1, 10)
+        turning_70.person.year_of_birth = 1955
+        turning_70.person.month_of_birth = 1
+        turning_70.person.day_of_birth = 10
+
+        self.commit_patients(patients)
+
+        run_id = self.execute(execute_incremental)
+        before = self.fetch_run(run_id)
+
+        self.db.add(
+            create_procedure(
+                person_id=changed.person.person_id,
+                procedure_concept_id=late_item.concept.concept_id,
+                start_datetime=pendulum.parse("2024-12-03 10:00:00+01:00"),
+                end_datetime=pendulum.parse("2024-12-03 10:00:00+01:00"),
+            )
+        )
+        self.db.commit()
+
+        clock["now"] = datetime.datetime(2025, 1, 11, 12, 0)
+
+        assert self.execute(execute_incremental) == run_id
+
+        with self.db.bind.connect() as con:
+            scope = set(con.execute(select(person_scope_table().c.person_id)).scalars())
+
+        assert scope == {turning_70.person.person_id, changed.person.person_id}
+
+        result = self.fetch_run(run_id)
+        pd.testing.assert_frame_equal(result, self.fetch_run(self.execute()))
+
+        assert not before.equals(result)
+
+
+class TestIncremental(IncrementalBase):
+    def setup_method(self, method):
+        self.recommendation = screening_recommendation()
+        super().setup_method(method)
+
+    @staticmethod
+    def run_ids():
+        from execution_engine.clients import omopdb
+        from execution_engine.omop.db.celida.tables import ExecutionRun
+
+        with omopdb.begin() as con:
+            return set(con.execute(select(ExecutionRun.__table__.c.run_id)).scalars())
+
+    def test_incremental_equals_full_run(self):
+        patients = perioperative_cohort()
+        self.commit_patients(patients)
+
+        run_id = self.execute(execute_incremental)
+
+        # unchanged data: the previous run is kept
+        run_ids = self.run_ids()
+        assert self.execute(execute_incremental) == run_id
+        assert self.run_ids() == run_ids
+
+        # a new patient and a new screening of an existing patient
+        pat = AdultPatient()
+        pat.add_surgery(
+            start="2024-12-03 09:00:00+01:00", end="2024-12-03 10:00:00+01:00"
+        )
+        pat.add_inpatient_visit(
+            start="2024-12-03 10:00:00+01:00", end="2024-12-10 10:00:00+01:00"
+        )
+        pat.add_NUDESC("2024-12-03 12:00:00+01:00", 0)
+        self.commit_patient(pat)
+
+        self.db.add(
+            create_measurement(
+                person_id=patients[1].person.person_id,
+                measurement_concept_id=NUDESC.concept_id,
+                measurement_datetime=pendulum.parse("2024-12-07 12:00:00+01:00"),
+                value_as_number=0,
+            )
+        )
+        self.db.commit()
+
+        assert self.execute(execute_incremental) == run_id
+
+        pd.testing.assert_frame_equal(
+            self.fetch_run(run_id), self.fetch_run(self.execute())
+        )
+
+    def test_deleted_rows_trigger_full_run(self):
+        from execution_engine.clients import omopdb
+        from execution_engine.omop.db.omop.schema import SCHEMA_NAME
+
+        patients = perioperative_cohort()
+        self.commit_patients(patients)
+
+        run_id = self.execute(execute_incremental)
+
+        self.db.execute(
+            text(f"DELETE FROM {SCHEMA_NAME}.measurement WHERE person_id = :person_id"),
+            {"person_id": patients[0].person.person_id},
+        )
+        self.db.execute(text("SELECT pg_stat_force_next_flush()"))
+        self.db.commit()
+
+        with omopdb.begin() as con:
+            con.execute(text("SELECT pg_stat_clear_snapshot()"))
+
+        new_run_id = self.execute(execute_incremental)
+
+        assert new_run_id != run_id
+        assert run_id not in self.run_ids()
+        pd.testing.assert_frame_equal(
+            self.fetch_run(new_run_id), self.fetch_run(self.execute())
+        )
+
+    def test_frozen_rows_trigger_full_run(self):
+        from execution_engine.omop.db.omop.schema import SCHEMA_NAME
+
+        self.commit_patients(perioperative_cohort())
+
+        run_id = self.execute(execute_incremental)
+
+        with self.db.bind.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as con:
+            con.execute(text(f"VACUUM (FREEZE) {SCHEMA_NAME}.measurement"))
+
+        assert self.execute(execute_incremental) != run_id
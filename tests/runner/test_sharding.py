@@ -0,0 +1,67 @@
+import functools
+
+import pandas as pd
+import pytest
+
+from digipod.runner.sharding import execute_sharded, shard_ranges
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.recommendation.utils import AdultPatient, perioperative_cohort
+
+
+class ShardingBase(TestRecommendationBase):
+    @pytest.fixture(autouse=True)
+    def _require_commits(self, request):
+        if request.config.getoption("--db-isolation") == "savepoint":
+            # the worker processes do not see the data of the outer transaction
+            pytest.skip("sharded runs require committed transactions")
+
+    @pytest.mark.parametrize("n_shards", [1, 2, 4])
+    def test_sharded_equals_serial(self, n_shards):
+        self.commit_patients(perioperative_cohort())
+
+        serial = self.fetch_run(self.execute())
+        sharded = self.fetch_run(
+            self.execute(
+                functools.partial(execute_sharded, n_shards=n_shards, n_workers=2)
+            )
+        )
+
+        assert not serial.empty
+        pd.testing.assert_frame_equal(sharded, serial)
+
+
+class TestSharding_0_2(ShardingBase):
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_0_2
+
+        self.recommendation = recommendation_0_2.rec_0_2_Delirium_Screening_double
+        super().setup_method(method)
+
+    def test_shard_ranges(self):
+        from execution_engine.clients import omopdb
+
+        patients = [AdultPatient() for _ in range(7)]
+        self.commit_patients(patients)
+        person_ids = sorted(pat.person.person_id for pat in patients)
+
+        with omopdb.begin() as con:
+            ranges = shard_ranges(con, 3)
+
+            with pytest.raises(ValueError):
+                shard_ranges(con, 0)
+
+        shards = [
+            [p for p in person_ids if first <= p <= last] for first, last in ranges
+        ]
+
+        # consecutive, disjoint ranges of (almost) equal size that cover all persons
+        assert [len(shard) for shard in shards] == [3, 2, 2]
+        assert sum(shards, []) == person_ids
+
+
+class TestSharding_4_3(ShardingBase):
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_4_3
+
+        self.recommendation = recommendation_4_3.recommendation
+        super().setup_method(method)
@@ -0,0 +1,108 @@
+import pandas as pd
+import pytest
+from sqlalchemy import select, text
+
+from digipod.runner import sink
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.recommendation.utils import perioperative_cohort
+
+TEST_INDEX = "digipod_test_result_interval_person_id"
+
+
+class SinkBase(TestRecommendationBase):
+    def test_copy_equals_insert(self, monkeypatch):
+        self.commit_patients(perioperative_cohort())
+
+        inserted = self.fetch_run(self.execute())
+
+        copied_rows = []
+        copy = sink._copy
+
+        def counting_copy(*args, **kwargs):
+            n_rows = copy(*args, **kwargs)
+            copied_rows.append(n_rows)
+            return n_rows
+
+        monkeypatch.setattr(sink, "_copy", counting_copy)
+        # the small test cohort yields fewer rows per insert than worth a COPY in production
+        monkeypatch.setattr(sink, "MIN_COPY_ROWS", 2)
+
+        with sink.copy_result_writer():
+            copied = self.fetch_run(self.execute())
+
+        assert not inserted.empty
+        # the multi-row inserts of the result intervals are written with COPY
+        assert sum(copied_rows) > 0
+        pd.testing.assert_frame_equal(copied, inserted)
+
+
+class TestSink_0_2(SinkBase):
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_0_2
+
+        self.recommendation = recommendation_0_2.rec_0_2_Delirium_Screening_double
+        super().setup_method(method)
+
+
+class TestDeferredIndexes:
+    @pytest.fixture(autouse=True)
+    def _test_index(self, db_session):
+        from execution_engine.clients import omopdb
+
+        table = sink.result_tables()[0]
+
+        with omopdb.begin() as con:
+            table_name = con.dialect.identifier_preparer.format_table(table)
+            con.execute(text(f"CREATE INDEX {TEST_INDEX} ON {table_name} (person_id)"))
+            self.indexes = sink.secondary_indexes(con, table)
+
+        yield
+
+        with omopdb.begin() as con:
+            schema = table.schema
+            con.execute(text(f"DROP INDEX IF EXISTS {schema}.{TEST_INDEX}"))
+
+    def deferred_definitions(self) -> dict[str, str]:
+        from execution_engine.clients import omopdb
+
+        table = sink.deferred_index_table()
+
+        with omopdb.begin() as con:
+            return dict(
+                con.execute(select(table.c.index_name, table.c.definition)).all()
+            )
+
+    def current_indexes(self) -> dict[str, str]:
+        from execution_engine.clients import omopdb
+
+        with omopdb.begin() as con:
+            return sink.secondary_indexes(con, sink.result_tables()[0])
+
+    def test_deferred_indexes(self):
+        assert any(TEST_INDEX in name for name in self.indexes)
+
+        with sink.deferred_indexes():
+            assert not self.current_indexes()
+            # the definitions are stored before the indexes are dropped
+            assert self.deferred_definitions() == self.indexes
+
+        assert self.current_indexes() == self.indexes
+        assert not self.deferred_definitions()
+
+    def test_interrupted_run(self):
+        from execution_engine.clients import omopdb
+
+        context = sink.deferred_indexes()
+        context.__enter__()  # e.g. the process is killed during the run
+
+        assert not self.current_indexes()
+
+        with omopdb.begin() as con:
+            assert sink.recreate_deferred_indexes(con) == len(self.indexes)
+
+        assert self.current_indexes() == self.indexes
+        assert not self.deferred_definitions()
+
+        context.__exit__(None, None, None)
+
+        assert self.current_indexes() == self.indexes
@@ -0,0 +1,105 @@
+import datetime
+import functools
+
+import pandas as pd
+import pendulum
+import pytest
+
+from digipod.runner.slicing import (
+    DEFAULT_LOOKBACK,
+    execute_sliced,
+    time_slices,
+    window_spanning_counts,
+)
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.recommendation.utils import perioperative_cohort
+
+
+def test_time_slices():
+    start = pendulum.parse("2024-11-29 08:00:00+01:00")
+    end = pendulum.parse("2025-02-15 08:00:00+01:00")
+
+    slices = time_slices(start, end, months=1)
+
+    assert [(str(s), str(e)) for s, e in slices] == [
+        ("2024-11-29T08:00:00+01:00", "2024-11-30T23:59:59+01:00"),
+        ("2024-12-01T00:00:00+01:00", "2024-12-31T23:59:59+01:00"),
+        ("2025-01-01T00:00:00+01:00", "2025-01-31T23:59:59+01:00"),
+        ("2025-02-01T00:00:00+01:00", "2025-02-15T08:00:00+01:00"),
+    ]
+    assert len(time_slices(start, end, months=2)) == 2
+
+    with pytest.raises(ValueError):
+        time_slices(start, end, months=0)
+
+
+@pytest.mark.parametrize(
+    "module,name",
+    [
+        ("recommendation_0_1", "rec_0_1_Delirium_Screening"),  # AnyTime
+        ("recommendation_3_2", "recommendation"),  # before the first dexmedetomidine
+        ("recommendation_4_1", "recommendation"),  # AnyTime
+        ("recommendation_4_3", "recommendation"),  # AnyTime
+    ],
+)
+def test_window_spanning_counts(module, name):
+    import importlib
+
+    recommendation = getattr(
+        importlib.import_module(f"digipod.recommendation.{module}"), name
+    )
+
+    assert window_spanning_counts(recommendation, DEFAULT_LOOKBACK)
+
+    with pytest.raises(ValueError, match="time slices"):
+        execute_sliced(
+            None,
+            recommendation,
+            pendulum.parse("2024-11-29 08:00:00+01:00"),
+            pendulum.parse("2024-12-15 08:00:00+01:00"),
+        )
+
+
+def test_window_spanning_counts_lookback():
+    from digipod.recommendation import recommendation_0_2, recommendation_3_1
+
+    assert not window_spanning_counts(
+        recommendation_0_2.rec_0_2_Delirium_Screening_double, DEFAULT_LOOKBACK
+    )
+    # the preoperative window before the end of surgery is up to 44 days long
+    assert not window_spanning_counts(
+        recommendation_3_1.recommendation, DEFAULT_LOOKBACK
+    )
+    assert window_spanning_counts(
+        recommendation_3_1.recommendation, datetime.timedelta(days=42)
+    )
+
+
+class SlicingBase(TestRecommendationBase):
+    def test_sliced_equals_serial(self):
+        self.commit_patients(perioperative_cohort())
+
+        serial = self.fetch_run(self.execute())
+        # the observation window spans two months (2024-11-29 - 2024-12-15)
+        sliced = self.fetch_run(
+            self.execute(functools.partial(execute_sliced, months=1))
+        )
+
+        assert not serial.empty
+        pd.testing.assert_frame_equal(sliced, serial)
+
+
+class TestSlicing_0_2(SlicingBase):
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_0_2
+
+        self.recommendation = recommendation_0_2.rec_0_2_Delirium_Screening_double
+        super().setup_method(method)
+
+
+class TestSlicing_3_1(SlicingBase):
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_3_1
+
+        self.recommendation = recommendation_3_1.recommendation
+        super().setup_method(method)
@@ -0,0 +1,46 @@
+import itertools
+
+from sqlalchemy import Column, Integer, String, func
+from sqlalchemy.orm import declarative_base
+
+from digipod.tests.bulk_loader import TableBuffer, python_default
+
+Base = declarative_base()
+
+_numbers = itertools.count(1)
+
+
+class Item(Base):
+    __tablename__ = "item"
+
+    item_id = Column(Integer, primary_key=True)
+    person_id = Column(Integer)
+    kind = Column(String, default="default-kind")
+    number = Column(Integer, default=lambda: next(_numbers))
+    created = Column(Integer, default=func.now())
+    note = Column(String)
+
+
+def test_python_default():
+    table = Item.__table__
+
+    assert python_default(table.c.kind) == "default-kind"
+    assert isinstance(python_default(table.c.number), int)
+    # left to the database
+    assert python_default(table.c.created) is None
+    assert python_default(table.c.note) is None
+
+
+def test_append_evaluates_python_defaults():
+    buffer = TableBuffer.for_object(Item())
+
+    buffer.append(Item(person_id=1))
+    buffer.append(Item(person_id=2, kind="explicit", number=None))
+
+    assert buffer.values["person_id"] == [1, 2]
+    assert buffer.values["kind"] == ["default-kind", "explicit"]
+    # an explicit None is kept (as by the ORM)
+    assert isinstance(buffer.values["number"][0], int)
+    assert buffer.values["number"][1] is None
+    assert buffer.values["created"] == [None, None]
+    assert buffer.values["note"] == [None, None]
@@ -0,0 +1,100 @@
+import pandas as pd
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from digipod.tests._fixtures.omop_fixture import outer_transaction
+from digipod.tests.recommendation.test_recommendation_base import TestRecommendationBase
+from digipod.tests.recommendation.utils import perioperative_cohort
+
+
+def omop_engine():
+    from execution_engine.clients import omopdb
+
+    with omopdb.connect() as con:
+        return con.engine
+
+
+class TestOuterTransaction(TestRecommendationBase):
+    @pytest.fixture(autouse=True)
+    def _require_truncate(self, request):
+        if request.config.getoption("--db-isolation") == "savepoint":
+            pytest.skip("the test starts its own outer transaction")
+
+    def setup_method(self, method):
+        from digipod.recommendation import recommendation_0_2
+
+        self.recommendation = recommendation_0_2.rec_0_2_Delirium_Screening_double
+        super().setup_method(method)
+
+    def execute_cohort(self) -> tuple[int, pd.DataFrame]:
+        patients = perioperative_cohort()
+        self.commit_patients(patients)
+
+        run_id = self.execute()
+        df = self.fetch_run(run_id)
+
+        # the person ids are drawn from a sequence, which is not rolled back
+        df["person_id"] = df["person_id"].map(
+            {patient.person.person_id: i for i, patient in enumerate(patients)}
+        )
+
+        return run_id, df.sort_values(
+            by=list(df.columns), ignore_index=True, na_position="first"
+        )
+
+    def test_savepoint_equals_truncate(self):
+        from execution_engine.omop.db.omop.tables import Person
+
+        engine = omop_engine()
+        db = self.db
+
+        with outer_transaction(engine):
+            self.db = Session(bind=engine)
+            try:
+                run_id, savepoint = self.execute_cohort()
+            finally:
+                self.db.close()
+                self.db = db
+
+        # everything is rolled back, including the commits of the execution engine
+        assert self.fetch_run(run_id).empty
+        with engine.connect() as con:
+            assert con.execute(select(func.count()).select_from(Person)).scalar() == 0
+
+        _, truncate = self.execute_cohort()
+
+        assert not savepoint.empty
+        pd.testing.assert_frame_equal(savepoint, truncate)
+
+    def test_interleaved_transactions(self):
+        engine = omop_engine()
+
+        def values():
+            with engine.connect() as con:
+                return con.execute(text("SELECT x FROM savepoint_test")).scalars().all()
+
+        with outer_transaction(engine):
+            with engine.begin() as con:
+                con.execute(text("CREATE TEMPORARY TABLE savepoint_test (x int)"))
+
+            first, second = engine.connect(), engine.connect()
+
+            first.execute(text("INSERT INTO savepoint_test VALUES (1)"))
+            second.execute(text("INSERT INTO savepoint_test VALUES (2)"))
+            # the release of the first savepoint is deferred until the second one is released
+            first.commit()
+            second.rollback()
+
+            assert values() == [1]
+
+            first.execute(text("INSERT INTO savepoint_test VALUES (3)"))
+            second.execute(text("INSERT INTO savepoint_test VALUES (4)"))
+            # rolling back to the first savepoint also discards the later one
+            second.commit()
+            first.rollback()
+
+            assert values() == [1]
+
+            first.close()
+            second.close()